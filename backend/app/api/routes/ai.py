@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.services.cache import get_cache
+from app.services.gemini import provider_error, streamer
+from app.services.warmer import HACKATHON_TTL, load_hackathon
+from pydantic import BaseModel, Field
+
+router = APIRouter()
+
+class SummarizeRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+
+
+async def _summary_response(text: str) -> StreamingResponse:
+    """Cached summaries replay at once; otherwise check capacity before the stream starts"""
+    cached = await streamer.cached(text)
+    if cached is None:
+        error = provider_error()
+        if error:
+            raise HTTPException(status_code=503, detail=error)
+        if streamer.saturated():
+            raise HTTPException(status_code=503, detail="Too many summaries streaming", headers={"Retry-After": "5"})
+    return StreamingResponse(
+        streamer.stream(text, cached),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# --- 1. SUMMARIZE TEXT (SSE) ---
+@router.post("/summarize", summary="Stream an AI summary of a description (Server-Sent Events)")
+async def summarize(request: SummarizeRequest):
+    """
+    Events: `token` ({"text"}) as the model generates, then `done` ({"cached", "ms"})
+    or `error` ({"detail"}).
+    Optimization: Tokens are forwarded as they arrive instead of after the whole
+    answer; finished summaries are cached by description hash (services/gemini.py).
+    """
+    return await _summary_response(request.text)
+
+
+# --- 2. HACKATHON SUMMARY (SSE) ---
+@router.get("/hackathons/{hackathon_id}/summary", summary="Stream an AI summary of a hackathon's description")
+async def hackathon_summary(hackathon_id: str):
+    """
+    Same events as /summarize; a GET so the browser's EventSource can consume it.
+    Optimization: The hackathon is read through the shared `hackathon` cache entry.
+    """
+    try:
+        hackathon = await get_cache().get_or_set(
+            "hackathon", hackathon_id,
+            lambda: load_hackathon(hackathon_id),
+            ttl=HACKATHON_TTL
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        if "404" in str(e):
+            raise HTTPException(status_code=404, detail="Hackathon not found")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    description = (hackathon.get('description') or "").strip()
+    if not description:
+        raise HTTPException(status_code=400, detail="Hackathon has no description")
+    return await _summary_response(description)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from app.services.appwrite import get_db_service, get_users_service
+from app.services.leaderboard import board
+from app.services.member_snapshots import write_through_profile
 from app.core.config import settings
-from app.models.user import UserRegister, UserLoginSync, UserUpdate, PasswordChange, UserResponse
+from app.models.user import UserRegister, UserLoginSync, ProfileUpdate, PasswordChange, UserResponse
 from appwrite.id import ID
 from appwrite.exception import AppwriteException
 import asyncio
@@ -34,22 +36,15 @@ async def register_user(user: UserRegister):
             if e.code == 409:
                 raise HTTPException(status_code=400, detail="Email already registered")
             raise HTTPException(status_code=500, detail=str(e))
+        except HTTPException:
+            raise
         except Exception as e:
             if "409" in str(e):
                 raise HTTPException(status_code=400, detail="Email already registered")
             raise HTTPException(status_code=500, detail=str(e))
 
         # B. Create DB Profile
-        profile_data = {
-            "username": user.username,
-            "account_id": auth_user['$id'],
-            "role": user.role,
-            "xp": 0,
-            "reputation_score": 0.0,
-            "skills": [],
-            "tech_stack": [],
-            "bio": f"Hi! I'm {user.name}"
-        }
+        profile_data = user.profile_document(auth_user['$id'])
 
         doc = await asyncio.to_thread(
             db_service.create_document,
@@ -58,6 +53,7 @@ async def register_user(user: UserRegister):
             document_id=auth_user['$id'],
             data=profile_data
         )
+        board.update(doc['$id'], 0, 0.0)  # new builders enter the leaderboard at 0 XP
 
         # C. Return full data
         return {
@@ -107,6 +103,8 @@ async def login_sync(user: UserLoginSync):
                 asyncio.to_thread(users_service.get, user.id),
                 return_exceptions=False
             )
+        except HTTPException:
+            raise
         except Exception:
             raise HTTPException(status_code=401, detail="User not found or Session Invalid.")
 
@@ -137,9 +135,10 @@ async def login_sync(user: UserLoginSync):
 
 # --- OPTIMIZED: UPDATE PROFILE ---
 @router.put("/profile", summary="Update Profile")
-async def update_profile(data: UserUpdate):
+async def update_profile(data: ProfileUpdate, background_tasks: BackgroundTasks):
     """
-    Optimization: Async execution for non-blocking I/O
+    Optimization: Async execution for non-blocking I/O.
+    Same write-through as PUT /api/users/{user_id} (indexes, team snapshots).
     """
     try:
         db = get_db_service()
@@ -163,9 +162,12 @@ async def update_profile(data: UserUpdate):
             document_id=data.user_id,
             data=updates
         )
+        await write_through_profile(data.user_id, updates, background_tasks)
         
         return {"success": True, "message": "Profile updated"}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -187,5 +189,7 @@ async def change_password(data: PasswordChange):
         
         return {"success": True, "message": "Password changed"}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Path, Query as QueryParam, Request, Response
+from app.core.config import settings
+from app.services.autocomplete import autocomplete
+from typing import Literal
+import json
+import zlib
+
+router = APIRouter()
+
+
+# --- 1. SUGGESTIONS ---
+@router.get("/{kind}", summary="Typeahead suggestions for skills, hackathon tags or hackathon names")
+async def suggest(
+    request: Request,
+    kind: Literal["skills", "tags", "hackathons"] = Path(...),
+    q: str = QueryParam("", max_length=100, description="What the user typed so far"),
+    limit: int = QueryParam(8, ge=1, le=20),
+):
+    """
+    Optimization: Served from the in-memory prefix index (services/autocomplete.py),
+    no database call. The response only depends on the URL, so it carries a weak
+    ETag and a public Cache-Control: a CDN or the browser answers repeated
+    keystrokes, and a revalidation that still matches gets an empty 304.
+    """
+    if not autocomplete.ready:
+        raise HTTPException(status_code=503, detail="Autocomplete index is warming up", headers={"Retry-After": "5"})
+
+    body = json.dumps(
+        {"success": True, "data": autocomplete.complete(kind, q, limit)},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode()
+    max_age = settings.AUTOCOMPLETE_MAX_AGE_SECONDS
+    headers = {
+        "ETag": f'W/"{zlib.crc32(body):08x}"',
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={max_age * 5}",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
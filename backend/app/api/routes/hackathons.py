@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query as QueryParam
 from typing import List
-from app.services.appwrite import get_db_service
+from app.services.cache import get_cache
 from app.core.config import settings
 from app.models.hackathon import HackathonCreate
+from app.services.appwrite import get_db_service, get_documents_by_ids
+from app.services.autocomplete import autocomplete
+from app.services.similarity import index as similarity
+from app.services.skill_index import index as skill_index
+from app.services.warmer import HACKATHON_TTL, TEAMS_TTL, judge_list, load_hackathon, load_hackathon_teams
+from app.utils.helpers import FIELDS_PATTERN, select_fields
 from appwrite.id import ID
 from appwrite.query import Query
 from fastapi.encoders import jsonable_encoder
@@ -34,27 +40,40 @@ async def create_hackathon(hackathon: HackathonCreate):
             document_id=ID.unique(),
             data=jsonable_encoder(hackathon)
         )
+        skill_index.set_capacity(result['$id'], result.get('max_team_size'))
+        similarity.put(result)
+        autocomplete.put_hackathon(result)
         
         return {"success": True, "data": result}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # --- 2. GET ALL HACKATHONS ---
 @router.get("/", summary="Get all Hackathons")
-async def get_hackathons():
+async def get_hackathons(fields: Optional[str] = QueryParam(None, pattern=FIELDS_PATTERN)):
+    """
+    Optimization: `fields=name,status,banner_url` is pushed upstream as
+    Query.select, so list views only transfer the attributes they render.
+    """
     try:
         db = get_db_service()
+        select = select_fields(fields)
         
         result = await asyncio.to_thread(
             db.list_documents,
             database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_HACKATHONS
+            collection_id=settings.COLLECTION_HACKATHONS,
+            queries=[Query.select(select)] if select else []
         )
         
         return {"success": True, "documents": result['documents']}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -63,17 +82,18 @@ async def get_hackathons():
 @router.get("/{hackathon_id}", summary="Get Hackathon by ID")
 async def get_hackathon(hackathon_id: str):
     try:
-        db = get_db_service()
-        
-        result = await asyncio.to_thread(
-            db.get_document,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_HACKATHONS,
-            document_id=hackathon_id
+        # Cached read-through: detail pages are hit by every participant.
+        # Kept warm around the event's start / deadline (services/warmer.py)
+        result = await get_cache().get_or_set(
+            "hackathon", hackathon_id,
+            lambda: load_hackathon(hackathon_id),
+            ttl=HACKATHON_TTL
         )
         
         return {"success": True, "data": result}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=404, detail="Hackathon not found")
 
@@ -108,27 +128,76 @@ async def get_recommendations(user_tags: List[str]):
         
         return {"success": True, "count": len(matches), "documents": matches}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # --- 5. GET HACKATHON TEAMS ---
 @router.get("/{hackathon_id}/teams", summary="Get all teams registered for a hackathon")
-async def get_hackathon_teams(hackathon_id: str):
+async def get_hackathon_teams(hackathon_id: str, fields: Optional[str] = QueryParam(None, pattern=FIELDS_PATTERN)):
     try:
-        db = get_db_service()
-        
-        result = await asyncio.to_thread(
-            db.list_documents,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_TEAMS,
-            queries=[Query.equal('hackathon_id', hackathon_id)]
-        )
+        if fields:
+            # Projections are cheap upstream reads; only the full list is cached
+            teams = await load_hackathon_teams(hackathon_id, select_fields(fields))
+        else:
+            # Shared cache only; invalidated by the team routes and snapshot patches, kept warm around event windows
+            teams = await judge_list("hackathon_teams", hackathon_id, lambda: load_hackathon_teams(hackathon_id), TEAMS_TTL)
         
-        return {"success": True, "teams": result['documents']}
+        return {"success": True, "teams": teams}
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 6. SIMILAR HACKATHONS ---
+@router.get("/{hackathon_id}/similar", summary="Hackathons similar to this one (tags + description)")
+async def get_similar_hackathons(hackathon_id: str, k: int = QueryParam(5, ge=1, le=20)):
+    """
+    Optimization: candidates come from the MinHash/LSH index
+    (services/similarity.py), so only events sharing a signature band are
+    scored instead of the whole catalogue; the cards are one batched read.
+    """
+    if not similarity.ready:
+        raise HTTPException(status_code=503, detail="Similarity index warming up", headers={"Retry-After": "5"})
+    try:
+        matches = similarity.similar(hackathon_id, k)
+        if matches is None:
+            # Not indexed yet (or no tags / description): index it from the cached doc
+            try:
+                doc = await get_cache().get_or_set(
+                    "hackathon", hackathon_id,
+                    lambda: load_hackathon(hackathon_id),
+                    ttl=HACKATHON_TTL
+                )
+            except HTTPException:
+                raise
+            except Exception as e:
+                if "404" in str(e):
+                    raise HTTPException(status_code=404, detail="Hackathon not found")
+                raise
+            similarity.put(doc)
+            matches = similarity.similar(hackathon_id, k) or []
+
+        cards = await get_documents_by_ids(
+            settings.COLLECTION_HACKATHONS, [m[0] for m in matches],
+            select=['$id', 'name', 'tags', 'status', 'start_date', 'location', 'image_url']
+        )
+        data = [
+            {**cards[doc_id], "similarity": round(score, 3)}
+            for doc_id, _, score in matches if doc_id in cards
+        ]
+        return {"success": True, "data": data}
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
 # --- UPDATE DETAILS ---
 @router.put("/{hackathon_id}", summary="Update Hackathon Details")
 async def update_hackathon(hackathon_id: str, update: HackathonUpdate):
@@ -144,7 +213,12 @@ async def update_hackathon(hackathon_id: str, update: HackathonUpdate):
             document_id=hackathon_id,
             data=data
         )
+        await asyncio.to_thread(get_cache().delete, "hackathon", hackathon_id)
+        if 'description' in data:  # name / tags can't change after creation (HackathonUpdate)
+            similarity.put(result)
         return {"success": True, "data": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -160,6 +234,9 @@ async def change_status(hackathon_id: str, status: StatusUpdate):
             document_id=hackathon_id,
             data={"status": status.status}
         )
+        await asyncio.to_thread(get_cache().delete, "hackathon", hackathon_id)
         return {"success": True, "message": f"Status changed to {status.status}"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
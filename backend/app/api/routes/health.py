@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.health import readiness
+from app.core.startup import uptime_ms
+
+router = APIRouter()
+
+
+# --- LIVENESS ---
+@router.get("/live", summary="Liveness: the process is up and the event loop answers")
+async def live():
+    """Optimization: No I/O and no checks - restart the process only if this stops answering."""
+    return {"status": "alive", "uptime_ms": round(uptime_ms(), 1)}
+
+
+# --- READINESS ---
+@router.get("/ready", summary="Readiness: cached result of the background health prober")
+async def ready():
+    """
+    Optimization: Never calls Appwrite - reports what the prober (core/health.py)
+    measured last. 200 when ready / degraded, 503 when not ready.
+    """
+    result = readiness()
+    return JSONResponse(status_code=503 if result["status"] == "not_ready" else 200, content=result)
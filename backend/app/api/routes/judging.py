@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from app.services.appwrite import get_db_service
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.services.plagiarism import checker, load_report
+from app.services.score_wal import score_id, wal
 from pydantic import BaseModel
-from appwrite.id import ID
 import asyncio
 
 router = APIRouter()
 
+
+def _require_reports():
+    if not settings.COLLECTION_PLAGIARISM:
+        raise HTTPException(status_code=503, detail="Plagiarism reports are not configured (COLLECTION_PLAGIARISM)")
+
 class ScoreSubmit(BaseModel):
     submission_id: str
     judge_id: str
@@ -18,18 +24,20 @@ class ScoreSubmit(BaseModel):
 # --- SUBMIT SCORE ---
 @router.post("/score", summary="Submit Judging Score")
 async def submit_score(score: ScoreSubmit):
+    """
+    Optimization: Write-behind. The score is appended to a local WAL and
+    acknowledged; services/score_wal.py writes it to Appwrite in batches and
+    credits the team's XP with the change in total once it lands.
+    """
     try:
-        db = get_db_service()
-        
         # Calculate total automatically
         total = score.technical_score + score.design_score + score.utility_score
+        document_id = score_id(score.submission_id, score.judge_id)
         
-        result = await asyncio.to_thread(
-            db.create_document,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_SCORES, 
-            document_id=ID.unique(),
-            data={
+        await asyncio.to_thread(
+            wal.append,
+            document_id,
+            {
                 "submission_id": score.submission_id,
                 "judge_id": score.judge_id,
                 "technical": score.technical_score,
@@ -40,7 +48,39 @@ async def submit_score(score: ScoreSubmit):
             }
         )
         
-        return {"success": True, "message": "Score submitted", "total": total}
+        return {"success": True, "message": "Score submitted", "total": total, "score_id": document_id, "queued": True}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- PLAGIARISM REPORT ---
+@router.get("/plagiarism/{hackathon_id}", summary="Suspicious submission pairs (near-duplicates, shared repos)")
+async def get_plagiarism_report(hackathon_id: str):
+    """
+    Optimization: precomputed after the deadline (services/plagiarism.py);
+    this only reads the stored report.
+    """
+    _require_reports()
+    try:
+        report, running = await load_report(hackathon_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if report is None:
+        if running or hackathon_id in checker.running:
+            return JSONResponse(status_code=202, content={"success": True, "status": "running"})
+        raise HTTPException(status_code=404, detail="No plagiarism report for this hackathon yet")
+    return {"success": True, "data": report}
+
+
+# --- RUN PLAGIARISM CHECK ---
+@router.post("/plagiarism/{hackathon_id}", status_code=202, summary="(Re)build the plagiarism report now")
+async def run_plagiarism_check(hackathon_id: str, background_tasks: BackgroundTasks):
+    _require_reports()
+    if hackathon_id not in checker.running:
+        background_tasks.add_task(checker.run, hackathon_id)
+    return {"success": True, "status": "running"}
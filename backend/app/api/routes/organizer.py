@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from app.services.appwrite import get_db_service
+from app.services import bulk_import
 from app.core.config import settings
 from appwrite.query import Query
 from appwrite.id import ID
 from pydantic import BaseModel
+from typing import Optional
 import asyncio
 from datetime import datetime
 
@@ -75,6 +78,8 @@ async def get_hackathon_stats(hackathon_id: str):
             "looking_for_team": stats[3]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -101,5 +106,44 @@ async def create_announcement(hackathon_id: str, data: AnnouncementCreate):
         
         return {"success": True, "message": "Announcement broadcasted"}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 3. BULK IMPORT (Streaming, Resumable) ---
+@router.post("/import/{kind}", summary="Bulk Import Hackathons, Teams or Users (CSV / NDJSON)")
+async def import_records(kind: str, request: Request, format: Optional[str] = None, import_id: Optional[str] = None):
+    """
+    Optimization: Rows are parsed & validated incrementally and written in
+    concurrent bounded batches; per-row results stream back as NDJSON.
+    Re-send the same file with the same import_id to resume an aborted import.
+    """
+    if kind not in bulk_import.MODELS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(bulk_import.MODELS)}")
+
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("csv" if "csv" in content_type else "ndjson")
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+
+    # Spool the upload (memory-capped, overflows to disk) before streaming results:
+    # the request body can't be read once the response has started behind our http middlewares.
+    upload = await bulk_import.spool_upload(request.stream())
+
+    import_id = import_id or ID.unique()
+    return StreamingResponse(
+        bulk_import.run_import(kind, fmt, bulk_import.iter_spooled(upload), import_id),
+        media_type="application/x-ndjson",
+        headers={"X-Import-Id": import_id}
+    )
+
+
+# --- 4. BULK IMPORT PROGRESS ---
+@router.get("/import/{import_id}", summary="Bulk Import Checkpoint")
+async def import_status(import_id: str):
+    checkpoint = await asyncio.to_thread(bulk_import.load_checkpoint, import_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return {"success": True, **checkpoint}
\ No newline at end of file
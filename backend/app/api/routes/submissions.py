@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Literal
 from app.services.appwrite import get_db_service
+from app.services.bulk_export import export_submissions
+from app.services.reputation import emit_for_team
+from app.services.warmer import SUBMISSIONS_TTL, forget_judge_list, judge_list, load_hackathon_submissions
 from app.core.config import settings
 from app.models.submission import SubmissionCreate
 from appwrite.id import ID
-from appwrite.query import Query
 from fastapi.encoders import jsonable_encoder
 import asyncio
 
@@ -12,7 +15,7 @@ router = APIRouter()
 
 # --- 1. CREATE SUBMISSION ---
 @router.post("/", summary="Submit Final Project")
-async def create_submission(submission: SubmissionCreate):
+async def create_submission(submission: SubmissionCreate, background_tasks: BackgroundTasks):
     try:
         db = get_db_service()
         
@@ -27,9 +30,15 @@ async def create_submission(submission: SubmissionCreate):
             document_id=ID.unique(),
             data=data
         )
+        await forget_judge_list("hackathon_submissions", submission.hackathon_id)
+
+        # XP for every team member, credited after the response
+        background_tasks.add_task(emit_for_team, "submission_made", submission.team_id, result['$id'])
         
         return {"success": True, "message": "Project submitted successfully", "data": result}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -40,50 +49,41 @@ async def get_hackathon_submissions(hackathon_id: str):
     """
     Optimization: Fetches submissions AND team details efficiently.
     Prevents the frontend from showing 'Team ID: 123' -> Shows 'Team Name: CodeWizards'
+    Cached read-through on a shared cache backend, kept warm ahead of the
+    submission deadline (services/warmer.py).
     """
     try:
-        db = get_db_service()
-        
-        # A. Fetch Submissions
-        submissions_result = await asyncio.to_thread(
-            db.list_documents,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_SUBMISSIONS,
-            queries=[
-                Query.equal('hackathon_id', hackathon_id),
-                Query.order_desc('$createdAt')
-            ]
+        submissions = await judge_list(
+            "hackathon_submissions", hackathon_id, lambda: load_hackathon_submissions(hackathon_id), SUBMISSIONS_TTL
         )
         
-        submissions = submissions_result['documents']
-        
-        if not submissions:
-            return {"success": True, "submissions": []}
-
-        # B. Batch Fetch Teams (The "Enrichment" Step)
-        # Extract all unique team IDs from the submissions
-        team_ids = list(set(sub['team_id'] for sub in submissions))
-        
-        if team_ids:
-            # Fetch all related teams in ONE query (Database Optimization)
-            teams_result = await asyncio.to_thread(
-                db.list_documents,
-                database_id=settings.APPWRITE_DATABASE_ID,
-                collection_id=settings.COLLECTION_TEAMS,
-                queries=[
-                    Query.equal('$id', team_ids),
-                    Query.select(['$id', 'name']) # Fetch only names to save bandwidth
-                ]
-            )
-            
-            # Create a lookup map: {'team_id_1': 'Team Alpha', ...}
-            team_map = {t['$id']: t['name'] for t in teams_result['documents']}
-            
-            # C. Merge Data
-            for sub in submissions:
-                sub['team_name'] = team_map.get(sub['team_id'], "Unknown Team")
-        
         return {"success": True, "submissions": submissions}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 3. EXPORT SUBMISSIONS (Streaming CSV / NDJSON) ---
+@router.get("/{hackathon_id}/export", summary="Export Submissions with Scores")
+async def export_hackathon_submissions(
+    hackathon_id: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False
+):
+    """
+    Streams every submission with its team name and averaged judge scores.
+    Optimization: cursor-paged with read-ahead; memory stays at one page however big the event.
+    """
+    filename = f"submissions-{hackathon_id}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        # A .gz download rather than Content-Encoding, so browsers save it compressed
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        export_submissions(hackathon_id, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,137 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from app.services.cache import get_cache
+from app.services.appwrite import get_db_service, get_users_service
+from app.core.admission import controller
+from app.core import idempotency, profiling
+from app.core.config import settings
+from app.services.membership import index as membership
+from app.services.skill_index import index as skill_index
+from app.services.deck import deck
+from app.services.similarity import index as similarity
+from app.services.plagiarism import checker as plagiarism
+from app.services.autocomplete import autocomplete
+from app.services.gemini import streamer as ai_streamer
+from app.services import member_snapshots
+from app.services.reputation import engine as reputation
+from app.services.leaderboard import board as leaderboard
+from app.services.warmer import warmer
+from app.services.score_wal import wal as score_wal
+from app.services.resolver import resolver
+import asyncio
+
+router = APIRouter()
+
+
+# --- CACHE STATS ---
+@router.get("/cache", summary="Cache hit/miss statistics per namespace")
+async def cache_stats():
+    """
+    Stats are per worker process (see "pid"); the backend itself may be shared.
+    """
+    return {"success": True, **get_cache().stats(), "warmer": warmer.snapshot()}
+
+
+
+# --- UPSTREAM RESILIENCE STATS ---
+@router.get("/upstream", summary="Retries, hedges and circuit breaker states")
+async def upstream_stats():
+    return {
+        "success": True,
+        "databases": get_db_service().snapshot(),
+        "users": get_users_service().snapshot()
+    }
+
+
+# --- DNS STATS ---
+@router.get("/dns", summary="Cached upstream addresses, per-host resolve/connect times and family wins")
+async def dns_stats():
+    return {"success": True, **resolver.snapshot()}
+
+
+# --- ADMISSION CONTROL STATS ---
+@router.get("/admission", summary="In-flight requests, shed & rate-limited counts per priority class")
+async def admission_stats():
+    return {"success": True, **controller.snapshot()}
+
+
+# --- IDEMPOTENCY STATS ---
+@router.get("/idempotency", summary="Stored, replayed, waited and mismatched Idempotency-Key requests")
+async def idempotency_stats():
+    return {
+        "success": True,
+        "backend": settings.CACHE_BACKEND,
+        "ttl_seconds": settings.IDEMPOTENCY_TTL_SECONDS,
+        **idempotency.stats,
+    }
+
+
+# --- MEMBERSHIP INDEX STATS ---
+@router.get("/membership", summary="User -> teams index size, rebuilds and fallbacks")
+async def membership_stats():
+    return {"success": True, **membership.snapshot(), "snapshots": member_snapshots.stats}
+
+
+# --- SKILL INDEX STATS ---
+@router.get("/skills", summary="Skill -> open-team index size, ranked-list cache hits and rebuilds")
+async def skill_index_stats():
+    return {"success": True, **skill_index.snapshot(), "deck": deck.snapshot()}
+
+
+# --- SIMILARITY INDEX STATS ---
+@router.get("/similarity", summary="MinHash/LSH index size, rebuild time and candidates per query")
+async def similarity_stats():
+    return {"success": True, **similarity.snapshot()}
+
+
+# --- PLAGIARISM CHECK STATS ---
+@router.get("/plagiarism", summary="Plagiarism runs, sketches, LSH candidates and reported pairs")
+async def plagiarism_stats():
+    return {"success": True, **plagiarism.snapshot()}
+
+
+# --- AUTOCOMPLETE STATS ---
+@router.get("/autocomplete", summary="Typeahead terms per kind, precomputed prefixes, queries and rebuilds")
+async def autocomplete_stats():
+    return {"success": True, **autocomplete.snapshot()}
+
+
+# --- AI SUMMARY STATS ---
+@router.get("/ai", summary="Streaming AI summaries: active streams, cache hits, cancellations, time to first token")
+async def ai_stats():
+    return {"success": True, **ai_streamer.snapshot()}
+
+
+# --- REPUTATION ENGINE STATS ---
+@router.get("/reputation", summary="XP event log position, write-back progress and errors")
+async def reputation_stats():
+    return {"success": True, **reputation.snapshot(), "leaderboard": leaderboard.snapshot()}
+
+
+# --- SCORE WRITE-BEHIND STATS ---
+@router.get("/scores", summary="Judge score WAL: backlog, flushed offset and write counts")
+async def score_wal_stats():
+    return {"success": True, **score_wal.snapshot()}
+
+
+# --- PROFILES ---
+@router.get("/profiles", summary="Stored request profiles (newest first) and profiler counters")
+async def list_profiles(request: Request):
+    """
+    Needs `X-Profile: <PROFILE_TOKEN>`; always 403 while no token is configured.
+    Optimization: Profiles are written off the request path; listing reads the small .json summaries only.
+    """
+    if not profiling.authorized(request):
+        raise HTTPException(status_code=403, detail="X-Profile token required (PROFILE_TOKEN must be set)")
+    profiles = await asyncio.to_thread(profiling.list_profiles)
+    return {"success": True, **profiling.snapshot(), "profiles": profiles}
+
+
+@router.get("/profiles/{name}", summary="Download one profile as a .pstats file")
+async def download_profile(name: str, request: Request):
+    if not profiling.authorized(request):
+        raise HTTPException(status_code=403, detail="X-Profile token required (PROFILE_TOKEN must be set)")
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{name}.pstats")
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from app.services.appwrite import get_db_service, get_users_service
+from fastapi import APIRouter, HTTPException, Query as QueryParam
+from app.services.appwrite import get_db_service, get_documents_by_ids
+from app.services.warmer import forget_judge_list
+from app.services.membership import index as membership, note_joined, user_teams
+from app.services.skill_index import index as skill_index, user_skills
+from app.services.autocomplete import autocomplete
+from app.services.deck import deck, load_seen, save_seen, seen_lock
+from app.services import member_snapshots
+from app.services.reputation import emit
 from app.core.config import settings
 from app.models.team import TeamCreate
+from app.utils.helpers import FIELDS_PATTERN, select_fields
 from pydantic import BaseModel
 from appwrite.id import ID
 from appwrite.query import Query
-from typing import Optional, List
+from typing import Literal, Optional, List
 import asyncio
 
 router = APIRouter()
@@ -22,6 +30,12 @@ class TeamRequestAction(BaseModel):
     leader_id: str
     target_user_id: str
 
+class LobbySwipe(BaseModel):
+    team_id: str
+    leader_id: str
+    candidate_id: str
+    action: Literal["like", "pass"]
+
 class TeamUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -46,13 +60,42 @@ async def _get_team(team_id: str) -> dict:
 async def _update_team(team_id: str, data: dict):
     """Update team document"""
     db = get_db_service()
-    return await asyncio.to_thread(
+    result = await asyncio.to_thread(
         db.update_document,
         database_id=settings.APPWRITE_DATABASE_ID,
         collection_id=settings.COLLECTION_TEAMS,
         document_id=team_id,
         data=data
     )
+    skill_index.put_team(result)
+    autocomplete.put_team(result)
+    await _forget_hackathon_teams(result)
+    return result
+
+
+async def _lobby_team(team_id: str, leader_id: str) -> dict:
+    """Skill index entry of a team the caller leads (one upstream read if not indexed yet)"""
+    if not skill_index.ready:
+        raise HTTPException(status_code=503, detail="Team index is warming up", headers={"Retry-After": "5"})
+    entry = skill_index.team(team_id)
+    if entry is None:
+        try:
+            skill_index.put_team(await _get_team(team_id))
+        except HTTPException:
+            raise
+        except Exception as e:
+            if "404" in str(e):
+                raise HTTPException(status_code=404, detail="Team not found")
+            raise
+        entry = skill_index.team(team_id)
+    if entry["leader_id"] != leader_id:
+        raise HTTPException(status_code=403, detail="Only leader can browse the lobby")
+    return entry
+
+
+async def _forget_hackathon_teams(team: dict):
+    """Drop the cached team list of the team's hackathon after a write"""
+    await forget_judge_list("hackathon_teams", team.get('hackathon_id'))
 
 
 # --- 1. CREATE TEAM ---
@@ -61,24 +104,9 @@ async def create_team(team: TeamCreate):
     try:
         db = get_db_service()
         
-        # Ensure leader is in members
-        members = team.members.copy() if team.members else []
-        if team.leader_id not in members:
-            members.append(team.leader_id)
-
-        data_to_save = {
-            k: v for k, v in {
-                "name": team.name,
-                "description": team.description,
-                "hackathon_id": team.hackathon_id,
-                "leader_id": team.leader_id,
-                "members": members,
-                "looking_for": team.looking_for,
-                "tech_stack": team.tech_stack,
-                "status": team.status,
-                "project_repo": team.project_repo
-            }.items() if v is not None
-        }
+        # Leader is always added to members (see TeamCreate.to_document)
+        data_to_save = team.to_document()
+        data_to_save["member_snapshots"] = await member_snapshots.build(data_to_save)
 
         result = await asyncio.to_thread(
             db.create_document,
@@ -87,9 +115,17 @@ async def create_team(team: TeamCreate):
             document_id=ID.unique(),
             data=data_to_save
         )
+        membership.put_team(result)
+        await note_joined(data_to_save["members"], result['$id'])
+        skill_index.put_team(result)
+        autocomplete.put_team(result)
+        await _forget_hackathon_teams(result)
+        await emit("team_joined", data_to_save["members"], result['$id'])
         
         return {"success": True, "data": result}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -112,6 +148,11 @@ async def delete_team(action: TeamAction):
             collection_id=settings.COLLECTION_TEAMS,
             document_id=action.team_id
         )
+        membership.drop_team(action.team_id)
+        skill_index.drop_team(action.team_id)
+        autocomplete.drop_team(action.team_id)
+        await _forget_hackathon_teams(team)
+        await emit("team_disbanded", [team['leader_id']], action.team_id)
         
         return {"success": True, "message": "Team deleted"}
 
@@ -141,11 +182,20 @@ async def leave_team(action: TeamAction):
                 collection_id=settings.COLLECTION_TEAMS,
                 document_id=action.team_id
             )
+            membership.drop_team(action.team_id)
+            skill_index.drop_team(action.team_id)
+            autocomplete.drop_team(action.team_id)
+            await _forget_hackathon_teams(team)
+            await emit("team_disbanded", [action.user_id], action.team_id)
             return {"success": True, "message": "Leader left. Team disbanded."}
 
         # Remove member and update
         current_members.remove(action.user_id)
-        await _update_team(action.team_id, {"members": current_members})
+        membership.put_team(await _update_team(action.team_id, {
+            "members": current_members,
+            "member_snapshots": await member_snapshots.build(team, members=current_members)
+        }))
+        await emit("team_left", [action.user_id], action.team_id)
         
         return {"success": True, "message": "Left team"}
 
@@ -157,75 +207,46 @@ async def leave_team(action: TeamAction):
 
 # --- 4. LIST TEAMS (OPTIMIZED) ---
 @router.get("/", summary="List All Teams")
-async def list_teams(user_id: Optional[str] = None):
+async def list_teams(
+    user_id: Optional[str] = None,
+    fields: Optional[str] = QueryParam(None, pattern=FIELDS_PATTERN),
+    enrich: bool = True
+):
+    """
+    Optimization: `fields=` projects attributes upstream (Query.select);
+    `enrich=false` skips building members_enriched / join_requests_enriched.
+    """
     try:
         db = get_db_service()
-        users_service = get_users_service()
-        
-        queries = []
-        if user_id:
-            # Filter teams where user is a member
-            # Query.equal works for array containment in Appwrite (matches if array contains value)
-            queries.append(Query.equal("members", user_id))
+        # Enrichment reads the member lists and their snapshots; the user filter reads members
+        required = ['members', 'join_requests', 'member_snapshots'] if enrich else ['members'] if user_id else []
+        select = select_fields(fields, *required)
 
         # 1. Fetch teams
-        teams_result = await asyncio.to_thread(
-            db.list_documents,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_TEAMS,
-            queries=queries
-        )
-        
-        # 2. Collect all unique user IDs
-        user_ids = set()
-        for doc in teams_result['documents']:
-            user_ids.update(doc.get('members', []))
-            user_ids.update(doc.get('join_requests', []) or [])
-            
-        # 3. Fetch users in parallel (if any)
-        user_map = {}
-        if user_ids:
-            # Limit concurrency to avoid rate limits
-            # Appwrite doesn't support bulk fetch by ID list, so we fetch individually
-            # For production, this should be cached or handled differently
-            async def fetch_user_safe(uid):
-                try:
-                    u = await asyncio.to_thread(users_service.get, uid)
-                    return u
-                except:
-                    return None
-
-            users_data = await asyncio.gather(*[fetch_user_safe(uid) for uid in user_ids])
-            
-            for u in users_data:
-                if u:
-                    user_map[u['$id']] = u['name']
+        if user_id:
+            # Membership index + the user's recent joins, batched by ID (services/membership.py)
+            documents = list((await user_teams(user_id, select=select)).values())
+            teams_result = {"total": len(documents), "documents": documents}
+        else:
+            queries = []
+            if select:
+                queries.append(Query.select(select))
+
+            teams_result = await asyncio.to_thread(
+                db.list_documents,
+                database_id=settings.APPWRITE_DATABASE_ID,
+                collection_id=settings.COLLECTION_TEAMS,
+                queries=queries
+            )
         
-        # 4. Enrich teams
-        for doc in teams_result['documents']:
-            doc.setdefault('leader_id', "")
-            
-            # Enrich members
-            doc['members_enriched'] = [
-                {
-                    "userId": m_id,
-                    "name": user_map.get(m_id, "Unknown User"),
-                    "avatar": ""
-                }
-                for m_id in doc.get('members', [])
-            ]
-            
-            # Enrich join requests
-            doc['join_requests_enriched'] = [
-                {
-                    "userId": r_id,
-                    "name": user_map.get(r_id, "Unknown User")
-                }
-                for r_id in (doc.get('join_requests') or [])
-            ]
+        # 2. Enrich from the denormalized member snapshots (no per-member lookups)
+        if enrich:
+            await member_snapshots.enrich(teams_result['documents'])
 
         return teams_result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -246,7 +267,10 @@ async def join_team(action: TeamAction):
             raise HTTPException(status_code=400, detail="Request already pending")
 
         current_requests.append(action.user_id)
-        await _update_team(action.team_id, {"join_requests": current_requests})
+        membership.put_team(await _update_team(action.team_id, {
+            "join_requests": current_requests,
+            "member_snapshots": await member_snapshots.build(team, join_requests=current_requests)
+        }))
         
         return {"success": True, "message": "Join request sent"}
 
@@ -275,10 +299,13 @@ async def approve_request(action: TeamRequestAction):
         current_requests.remove(action.target_user_id)
         current_members.append(action.target_user_id)
 
-        await _update_team(action.team_id, {
+        membership.put_team(await _update_team(action.team_id, {
             "join_requests": current_requests,
-            "members": current_members
-        })
+            "members": current_members,
+            "member_snapshots": await member_snapshots.build(team, current_members, current_requests)
+        }))
+        await note_joined([action.target_user_id], action.team_id)
+        await emit("team_joined", [action.target_user_id], action.team_id)
         
         return {"success": True, "message": "Member approved"}
         
@@ -303,7 +330,10 @@ async def reject_request(action: TeamRequestAction):
             raise HTTPException(status_code=404, detail="Request not found")
 
         current_requests.remove(action.target_user_id)
-        await _update_team(action.team_id, {"join_requests": current_requests})
+        membership.put_team(await _update_team(action.team_id, {
+            "join_requests": current_requests,
+            "member_snapshots": await member_snapshots.build(team, join_requests=current_requests)
+        }))
         
         return {"success": True, "message": "Request rejected"}
         
@@ -334,54 +364,80 @@ async def update_team_details(team_id: str, update: TeamUpdate, user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# --- 10. GET TEAM ---
+# --- 9. TEAMS THAT NEED ME (declared before /{team_id} so "needs-me" isn't read as an ID) ---
+@router.get("/needs-me", summary="Open Teams Looking For My Skills")
+async def teams_that_need_me(
+    user_id: str,
+    hackathon_id: str,
+    offset: int = QueryParam(0, ge=0),
+    limit: int = QueryParam(20, ge=1, le=100)
+):
+    """
+    Optimization: Served from the skill -> open-team index (services/skill_index.py);
+    open, non-full teams ranked by how many of their looking_for roles the user fills.
+    """
+    try:
+        if not skill_index.ready:
+            raise HTTPException(status_code=503, detail="Team index is warming up", headers={"Retry-After": "5"})
+        skills = await user_skills(user_id)
+        total, teams = skill_index.needs_me(hackathon_id, user_id, skills, offset, limit)
+        return {"success": True, "total": total, "offset": offset, "data": teams}
+    except HTTPException:
+        raise
+    except Exception as e:
+        if "404" in str(e):
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 10. LOBBY: SWIPE DECK (declared before /{team_id} so "lobby" isn't read as an ID) ---
+@router.get("/lobby", summary="Next Candidate Teammates For My Team")
+async def lobby_deck(team_id: str, leader_id: str, limit: int = QueryParam(10, ge=1, le=50)):
+    """
+    Optimization: Candidates come from the team's precomputed deck (services/deck.py);
+    swiped ones are skipped via the leader's Bloom filter. One batched profile read per page.
+    """
+    try:
+        await _lobby_team(team_id, leader_id)
+        cards = deck.next_cards(team_id, await load_seen(leader_id), limit)
+        profiles = await get_documents_by_ids(
+            settings.COLLECTION_USERS, [c["user_id"] for c in cards], select=['$id', 'username', 'avatar_url', 'bio', 'xp']
+        )
+        for card in cards:
+            card.update({k: v for k, v in (profiles.get(card["user_id"]) or {}).items() if not k.startswith('$')})
+        return {"success": True, "deck_size": deck.size(team_id), "data": cards}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 11. LOBBY: SWIPE ---
+@router.post("/lobby/swipe", summary="Like or Pass a Candidate")
+async def lobby_swipe(swipe: LobbySwipe):
+    try:
+        await _lobby_team(swipe.team_id, swipe.leader_id)
+        async with seen_lock(swipe.leader_id):
+            seen = await load_seen(swipe.leader_id)
+            if seen.add(f"{swipe.team_id}:{swipe.candidate_id}"):
+                await save_seen(swipe.leader_id, seen)
+        deck.stats["likes" if swipe.action == "like" else "passes"] += 1
+        return {"success": True, "message": f"Candidate {'liked' if swipe.action == 'like' else 'passed'}"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- 12. GET TEAM ---
 @router.get("/{team_id}", summary="Get Team Details")
 async def get_team(team_id: str):
     try:
-        db = get_db_service()
-        users_service = get_users_service()
-        
         # 1. Fetch team
         team = await _get_team(team_id)
         
-        # 2. Collect user IDs
-        user_ids = set()
-        user_ids.update(team.get('members', []))
-        user_ids.update(team.get('join_requests', []) or [])
-        
-        # 3. Fetch users in parallel
-        user_map = {}
-        if user_ids:
-            async def fetch_user_safe(uid):
-                try:
-                    u = await asyncio.to_thread(users_service.get, uid)
-                    return u
-                except:
-                    return None
-
-            users_data = await asyncio.gather(*[fetch_user_safe(uid) for uid in user_ids])
-            
-            for u in users_data:
-                if u:
-                    user_map[u['$id']] = u['name']
-            
-        # Enrich
-        team.setdefault('leader_id', "")
-        team['members_enriched'] = [
-            {
-                "userId": m_id,
-                "name": user_map.get(m_id, "Unknown User"),
-                "avatar": ""
-            }
-            for m_id in team.get('members', [])
-        ]
-        team['join_requests_enriched'] = [
-            {
-                "userId": r_id,
-                "name": user_map.get(r_id, "Unknown User")
-            }
-            for r_id in (team.get('join_requests') or [])
-        ]
+        # 2. Enrich from the denormalized member snapshot (no per-member lookups)
+        await member_snapshots.enrich([team])
         
         return team
     except HTTPException:
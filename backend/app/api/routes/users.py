@@ -1,14 +1,66 @@
-from fastapi import APIRouter, HTTPException
-from app.services.appwrite import get_db_service, get_users_service
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query as QueryParam
+from app.services.appwrite import get_db_service, get_users_service, get_documents_by_ids
+from app.services.membership import user_teams
+from app.services.member_snapshots import write_through_profile
+from app.services.leaderboard import board
 from app.core.config import settings
 from app.models.user import UserResponse, UserUpdate
-from appwrite.query import Query
 import asyncio
 
 
 router = APIRouter()
 
 
+def _require_leaderboard():
+    if not board.ready:
+        raise HTTPException(status_code=503, detail="Leaderboard is warming up", headers={"Retry-After": "5"})
+
+
+async def _with_profiles(entries: list) -> list:
+    """Adds username / avatar_url to leaderboard entries (one batched fetch per page)"""
+    profiles = await get_documents_by_ids(
+        settings.COLLECTION_USERS, [e["user_id"] for e in entries], select=['$id', 'username', 'avatar_url']
+    )
+    for entry in entries:
+        profile = profiles.get(entry["user_id"]) or {}
+        entry["username"] = profile.get('username')
+        entry["avatar_url"] = profile.get('avatar_url')
+    return entries
+
+
+# --- GLOBAL LEADERBOARD (declared before /{user_id} so "leaderboard" isn't read as an ID) ---
+@router.get("/leaderboard", summary="Global XP Leaderboard")
+async def get_leaderboard(offset: int = QueryParam(0, ge=0), limit: int = QueryParam(50, ge=1, le=100)):
+    """
+    Optimization: Served from the in-memory leaderboard (services/leaderboard.py)
+    instead of sorting the users collection per request.
+    """
+    try:
+        _require_leaderboard()
+        entries = await _with_profiles(board.page(offset, limit))
+        return {"success": True, "total": len(board), "offset": offset, "leaderboard": entries}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# --- USER RANK ("#1,234 of 80k builders") ---
+@router.get("/{user_id}/rank", summary="Get User's Leaderboard Rank")
+async def get_user_rank(user_id: str, window: int = QueryParam(5, ge=0, le=50)):
+    try:
+        _require_leaderboard()
+        rank = board.rank(user_id)
+        if rank is None:
+            raise HTTPException(status_code=404, detail="User not ranked")
+        around = await _with_profiles(board.around(user_id, window)) if window else []
+        return {"success": True, "rank": rank, "total": len(board), "around": around}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # --- OPTIMIZED: GET USER PROFILE ---
 @router.get("/{user_id}", response_model=UserResponse, summary="Get User Profile")
 async def get_user_profile(user_id: str):
@@ -52,6 +104,8 @@ async def get_user_profile(user_id: str):
                 "updated_at": doc['$updatedAt']
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             if "404" in str(e):
                 raise HTTPException(status_code=404, detail="User not found")
@@ -65,9 +119,10 @@ async def get_user_profile(user_id: str):
 
 # --- OPTIMIZED: UPDATE USER PROFILE ---
 @router.put("/{user_id}", response_model=UserResponse, summary="Update User Profile")
-async def update_user_profile(user_id: str, user_update: UserUpdate):
+async def update_user_profile(user_id: str, user_update: UserUpdate, background_tasks: BackgroundTasks):
     """
-    Optimization: Parallel updates and cleaner error handling
+    Optimization: Parallel updates and cleaner error handling.
+    Name / avatar changes are fanned out to the user's team snapshots after the response.
     """
     try:
         db = get_db_service()
@@ -101,9 +156,12 @@ async def update_user_profile(user_id: str, user_update: UserUpdate):
         # Execute all updates concurrently
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Return updated profile
-        return await get_user_profile(user_id)
+
+        # Return updated profile; cached name, search indexes and team snapshots follow it
+        profile = await get_user_profile(user_id)
+        changes = {**update_data, "name": name_update} if name_update else update_data
+        await write_through_profile(user_id, changes, background_tasks, profile)
+        return profile
 
     except HTTPException:
         raise
@@ -115,46 +173,35 @@ async def update_user_profile(user_id: str, user_update: UserUpdate):
 @router.get("/{user_id}/hackathons", summary="Get User's Hackathons")
 async def get_user_hackathons(user_id: str):
     """
-    Optimization: Eliminated sequential queries - fetches teams and hackathons in parallel
+    Optimization: teams come from the membership index (plus the user's recent
+    joins), hackathons from ONE batched fetch by ID.
     """
     try:
-        db = get_db_service()
-        
-        # Step 1: Fetch user's teams
-        teams_result = await asyncio.to_thread(
-            db.list_documents,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_TEAMS,
-            queries=[Query.equal('members', user_id)]
-        )
+        hackathon_fields = [
+            '$id', 
+            'name', 
+            'tagline', 
+            'image_url', 
+            'start_date', 
+            'location', 
+            'mode', 
+            'prize_pool', 
+            'status'
+        ]
 
-        if not teams_result['documents']:
+        # Step 1: User's teams (index + recent joins, services/membership.py)
+        teams = await user_teams(user_id)
+        if not teams:
             return {"success": True, "hackathons": []}
 
         # Step 2: Extract hackathon IDs and create map
-        hackathon_team_map = {team['hackathon_id']: team for team in teams_result['documents']}
-        hackathon_ids = list(hackathon_team_map.keys())
-        
-        # Step 3: Fetch hackathon details (already optimized - single query with multiple IDs)
-        hackathons_result = await asyncio.to_thread(
-            db.list_documents,
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.COLLECTION_HACKATHONS,
-            queries=[
-                Query.equal('$id', hackathon_ids),
-                Query.select([
-                    '$id', 
-                    'name', 
-                    'tagline', 
-                    'image_url', 
-                    'start_date', 
-                    'location', 
-                    'mode', 
-                    'prize_pool', 
-                    'status'
-                ])
-            ]
+        hackathon_team_map = {team['hackathon_id']: team for team in teams.values() if team.get('hackathon_id')}
+
+        # Step 3: Fetch hackathon details (chunked batch by ID)
+        hackathons = await get_documents_by_ids(
+            settings.COLLECTION_HACKATHONS, hackathon_team_map.keys(), select=hackathon_fields
         )
+        hackathon_docs = list(hackathons.values())
         
         # Step 4: Combine results
         combined_results = [
@@ -162,10 +209,12 @@ async def get_user_hackathons(user_id: str):
                 **hackathon,
                 "my_team": hackathon_team_map.get(hackathon['$id'])
             }
-            for hackathon in hackathons_result['documents']
+            for hackathon in hackathon_docs
         ]
         
         return {"success": True, "hackathons": combined_results}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+# Admission control: decide at the door whether a request gets served.
+#
+# Without this, a 50x spike is accepted in full and queues inside the thread
+# pool until everything times out. Here every request is classified, checked
+# against a per-client token bucket, and admitted only while in-flight work is
+# under the share of capacity its priority class may use:
+#
+#   critical  judging / submission writes             up to 100% of ADMISSION_MAX_IN_FLIGHT
+#   normal    auth, team actions, other writes        up to ADMISSION_NORMAL_SHARE
+#   low       catalogue browsing (GETs)               up to ADMISSION_LOW_SHARE
+#
+# Rejections are cheap and early: 429 (client over its rate) or 503 (server
+# over capacity), both with Retry-After.
+
+EXEMPT_PREFIXES = ("/docs", "/redoc", "/openapi.json", "/api/system", "/health")
+
+
+def classify(method: str, path: str) -> str:
+    if method == "GET":
+        return "low"
+    if path.startswith("/api/judging") or path.startswith("/api/submissions"):
+        return "critical"
+    return "normal"
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, rate: float, burst: float) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, shares: dict, rate: float, burst: float,
+                 critical_wait: float = 0.0, max_clients: int = 100000):
+        self.max_in_flight = max_in_flight
+        self.limits = {cls: max(1, int(max_in_flight * share)) for cls, share in shares.items()}
+        self.rate = rate
+        self.burst = burst
+        self.critical_wait = critical_wait
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._buckets = OrderedDict()
+        self._released = asyncio.Event()
+        self.stats = defaultdict(lambda: defaultdict(int))
+
+    # -- rate limiting --
+    def check_rate(self, client: str) -> float:
+        if not self.rate:
+            return 0.0
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.take(self.rate, self.burst)
+
+    # -- concurrency --
+    def try_acquire(self, cls: str) -> bool:
+        if self.in_flight >= self.limits.get(cls, self.max_in_flight):
+            return False
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return True
+
+    async def acquire(self, cls: str) -> bool:
+        if self.try_acquire(cls):
+            return True
+        if cls != "critical" or not self.critical_wait:
+            return False
+        # Critical writes may wait briefly for a slot instead of failing outright
+        deadline = time.monotonic() + self.critical_wait
+        while (left := deadline - time.monotonic()) > 0:
+            self._released.clear()
+            try:
+                await asyncio.wait_for(self._released.wait(), timeout=left)
+            except asyncio.TimeoutError:
+                break
+            if self.try_acquire(cls):
+                return True
+        return False
+
+    def release(self):
+        self.in_flight -= 1
+        self._released.set()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "limits": self.limits,
+            "tracked_clients": len(self._buckets),
+            "classes": {cls: dict(counters) for cls, counters in self.stats.items()}
+        }
+
+
+controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    shares={
+        "critical": 1.0,
+        "normal": settings.ADMISSION_NORMAL_SHARE,
+        "low": settings.ADMISSION_LOW_SHARE,
+    },
+    rate=settings.RATE_LIMIT_PER_SECOND,
+    burst=settings.RATE_LIMIT_BURST,
+    critical_wait=settings.ADMISSION_CRITICAL_WAIT_MS / 1000,
+)
+
+
+_proxy_warned = False
+
+
+def _warn_untrusted_proxy(scope):
+    """Once: X-Forwarded-For arrives but TRUSTED_PROXY_HOPS=0, so a proxy's clients may all share its bucket"""
+    global _proxy_warned
+    if any(name == b"x-forwarded-for" for name, _ in scope["headers"]):
+        _proxy_warned = True
+        client = scope.get("client")
+        print(
+            f"⚠️ rate limit: requests carry X-Forwarded-For but TRUSTED_PROXY_HOPS=0, so they are keyed on the peer "
+            f"({client[0] if client else 'unknown'}). Behind a reverse proxy every client shares one bucket; "
+            f"set TRUSTED_PROXY_HOPS to the number of proxies in front of the app."
+        )
+
+
+def client_key(scope) -> str:
+    """
+    The socket peer, unless TRUSTED_PROXY_HOPS proxies sit in front: then the
+    address the outermost of them saw, i.e. the entry it appended to
+    X-Forwarded-For (counted from the right). Entries further left are sent by
+    the client and never trusted - rotating them must not dodge the rate limit.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if not hops and not _proxy_warned:
+        _warn_untrusted_proxy(scope)
+    if hops:
+        entries = [
+            entry.strip()
+            for name, value in scope["headers"] if name == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",") if entry.strip()
+        ]
+        if entries:
+            return entries[-min(hops, len(entries))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _reject(status: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+    )
+
+
+class AdmissionMiddleware:
+    """
+    A plain ASGI middleware: the slot is held until the response body has been
+    sent, so streamed responses (export, import, SSE) count against the limit
+    for as long as they run, not only until their headers are out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path, method = scope["path"], scope["method"]
+        if path == "/" or path.startswith(EXEMPT_PREFIXES) or method == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        cls = classify(method, path)
+        stats = controller.stats[cls]
+
+        wait = controller.check_rate(client_key(scope))
+        if wait:
+            stats["rate_limited"] += 1
+            return await _reject(429, "Too many requests", wait)(scope, receive, send)
+
+        if not await controller.acquire(cls):
+            stats["shed"] += 1
+            return await _reject(503, "Server busy, please retry", 1)(scope, receive, send)
+
+        stats["admitted"] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
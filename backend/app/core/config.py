@@ -20,5 +20,140 @@ class Settings:
     COLLECTION_ANNOUNCEMENTS: str = os.getenv("COLLECTION_ANNOUNCEMENTS")
     COLLECTION_SUBMISSIONS: str = os.getenv("COLLECTION_SUBMISSIONS")
     COLLECTION_SCORES: str = os.getenv("COLLECTION_SCORES")
+    COLLECTION_PLAGIARISM: str = os.getenv("COLLECTION_PLAGIARISM")
+
+    # Cache ("memory" | "sqlite" | "network")
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_PATH: str = os.getenv("CACHE_PATH", "/tmp/hackconnect/cache.sqlite3")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_DEFAULT_TTL: float = float(os.getenv("CACHE_DEFAULT_TTL", "60"))
+    CACHE_NETWORK_LATENCY_MS: float = float(os.getenv("CACHE_NETWORK_LATENCY_MS", "1"))
+
+    # Health prober (core/health.py): /health/ready serves its last result
+    HEALTH_PROBE_SECONDS: float = float(os.getenv("HEALTH_PROBE_SECONDS", "10"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "3"))
+    HEALTH_MAX_LATENCY_MS: float = float(os.getenv("HEALTH_MAX_LATENCY_MS", "1500"))  # above -> "degraded"
+
+    # Upstream DNS cache & happy-eyeballs connects (services/resolver.py)
+    DNS_TTL_SECONDS: float = float(os.getenv("DNS_TTL_SECONDS", "60"))
+    DNS_STALE_SECONDS: float = float(os.getenv("DNS_STALE_SECONDS", "300"))  # serve the last answer while lookups fail
+    DNS_REFRESH_AHEAD_SECONDS: float = float(os.getenv("DNS_REFRESH_AHEAD_SECONDS", "10"))
+    DNS_DISABLE_IPV6: bool = os.getenv("DNS_DISABLE_IPV6", "false").lower() == "true"
+    DNS_FAMILY_PENALTY_SECONDS: float = float(os.getenv("DNS_FAMILY_PENALTY_SECONDS", "60"))
+    HAPPY_EYEBALLS_DELAY_MS: float = float(os.getenv("HAPPY_EYEBALLS_DELAY_MS", "250"))
+
+    # Response compression (responses below GZIP_MIN_BYTES are sent as-is)
+    GZIP_MIN_BYTES: int = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))
+
+    # Idempotency-Key on create endpoints (core/idempotency.py): how long responses are replayable,
+    # how long a duplicate waits on an unfinished first request, and the record store (CACHE_BACKEND kind)
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_CLAIM_SECONDS: float = float(os.getenv("IDEMPOTENCY_CLAIM_SECONDS", "60"))
+    IDEMPOTENCY_CACHE_PATH: str = os.getenv("IDEMPOTENCY_CACHE_PATH", "/tmp/hackconnect/idempotency.sqlite3")
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "100000"))
+
+    # Predictive cache warmer (services/warmer.py); runs only on a shared CACHE_BACKEND (sqlite / network)
+    WARM_ENABLED: bool = os.getenv("WARM_ENABLED", "true").lower() == "true"
+    WARM_INTERVAL_SECONDS: float = float(os.getenv("WARM_INTERVAL_SECONDS", "20"))  # keep below the 30s hot-read TTLs
+    WARM_LEAD_MINUTES: float = float(os.getenv("WARM_LEAD_MINUTES", "30"))
+    WARM_RATE_PER_SECOND: float = float(os.getenv("WARM_RATE_PER_SECOND", "5"))
+    WARM_YIELD_LOAD: float = float(os.getenv("WARM_YIELD_LOAD", "0.5"))  # pause above this share of the low admission limit
+
+    # Upstream resilience (services/resilience.py)
+    REQUEST_DEADLINE_SECONDS: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+    UPSTREAM_ATTEMPT_TIMEOUT_SECONDS: float = float(os.getenv("UPSTREAM_ATTEMPT_TIMEOUT_SECONDS", "5"))
+    UPSTREAM_RETRIES: int = int(os.getenv("UPSTREAM_RETRIES", "2"))
+    UPSTREAM_RETRY_BASE_MS: float = float(os.getenv("UPSTREAM_RETRY_BASE_MS", "50"))
+    UPSTREAM_BREAKER_THRESHOLD: int = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+    UPSTREAM_BREAKER_RESET_SECONDS: float = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "10"))
+    UPSTREAM_HEDGE_DELAY_MS: float = float(os.getenv("UPSTREAM_HEDGE_DELAY_MS", "0"))  # 0 = hedging off
+    UPSTREAM_MAX_WORKERS: int = int(os.getenv("UPSTREAM_MAX_WORKERS", "64"))
+    UPSTREAM_SINGLE_FLIGHT: bool = os.getenv("UPSTREAM_SINGLE_FLIGHT", "true").lower() == "true"
+    UPSTREAM_MICROCACHE_MS: float = float(os.getenv("UPSTREAM_MICROCACHE_MS", "0"))  # 0 = coalesce in-flight reads only
+
+    # Admission control & rate limiting (core/admission.py)
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+    ADMISSION_NORMAL_SHARE: float = float(os.getenv("ADMISSION_NORMAL_SHARE", "0.85"))
+    ADMISSION_LOW_SHARE: float = float(os.getenv("ADMISSION_LOW_SHARE", "0.6"))
+    ADMISSION_CRITICAL_WAIT_MS: float = float(os.getenv("ADMISSION_CRITICAL_WAIT_MS", "250"))
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PER_SECOND", "10"))  # 0 = off
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", "20"))
+    TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))  # proxies appending X-Forwarded-For; 0 = use the peer address
+
+    # Bulk import (services/bulk_import.py)
+    BULK_IMPORT_DIR: str = os.getenv("BULK_IMPORT_DIR", "/tmp/hackconnect/imports")
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "100"))
+    BULK_IMPORT_CONCURRENCY: int = int(os.getenv("BULK_IMPORT_CONCURRENCY", "8"))
+
+    # User -> teams membership index (services/membership.py)
+    MEMBERSHIP_REFRESH_SECONDS: float = float(os.getenv("MEMBERSHIP_REFRESH_SECONDS", "300"))
+
+    # Skill -> open-team index (services/skill_index.py)
+    SKILL_INDEX_REFRESH_SECONDS: float = float(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "300"))
+
+    # Similar hackathons (services/similarity.py)
+    SIMILARITY_REFRESH_SECONDS: float = float(os.getenv("SIMILARITY_REFRESH_SECONDS", "3600"))
+    SIMILARITY_POOL_MIN_DOCS: int = int(os.getenv("SIMILARITY_POOL_MIN_DOCS", "20000"))  # sign on a process pool from this size
+    SIMILARITY_WORKERS: int = int(os.getenv("SIMILARITY_WORKERS", "0"))  # 0 = os.cpu_count()
+
+    # Submission plagiarism check (services/plagiarism.py)
+    PLAGIARISM_SCAN_SECONDS: float = float(os.getenv("PLAGIARISM_SCAN_SECONDS", "600"))
+    PLAGIARISM_LOOKBACK_HOURS: float = float(os.getenv("PLAGIARISM_LOOKBACK_HOURS", "72"))  # deadlines this recent get a report
+    PLAGIARISM_MIN_SIMILARITY: float = float(os.getenv("PLAGIARISM_MIN_SIMILARITY", "0.5"))
+    PLAGIARISM_HISTORY_HACKATHONS: int = int(os.getenv("PLAGIARISM_HISTORY_HACKATHONS", "50"))
+    PLAGIARISM_MAX_PAIRS: int = int(os.getenv("PLAGIARISM_MAX_PAIRS", "500"))
+    PLAGIARISM_SKETCH_TTL_SECONDS: float = float(os.getenv("PLAGIARISM_SKETCH_TTL_SECONDS", "2592000"))
+    PLAGIARISM_POOL_MIN_DOCS: int = int(os.getenv("PLAGIARISM_POOL_MIN_DOCS", "2000"))  # sketch on a process pool from this size
+    PLAGIARISM_WORKERS: int = int(os.getenv("PLAGIARISM_WORKERS", "0"))  # 0 = os.cpu_count()
+
+    # Typeahead (services/autocomplete.py)
+    AUTOCOMPLETE_REFRESH_SECONDS: float = float(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", "600"))
+    AUTOCOMPLETE_TOP_K: int = int(os.getenv("AUTOCOMPLETE_TOP_K", "10"))  # suggestions kept per heavy prefix
+    AUTOCOMPLETE_SCAN_LIMIT: int = int(os.getenv("AUTOCOMPLETE_SCAN_LIMIT", "256"))  # prefixes matching more terms keep a top list
+    AUTOCOMPLETE_MAX_AGE_SECONDS: int = int(os.getenv("AUTOCOMPLETE_MAX_AGE_SECONDS", "60"))  # Cache-Control max-age
+
+    # Lobby swipe deck (services/deck.py)
+    DECK_SIZE: int = int(os.getenv("DECK_SIZE", "500"))
+    DECK_MAX_TEAMS: int = int(os.getenv("DECK_MAX_TEAMS", "1000"))
+    DECK_SEEN_CAPACITY: int = int(os.getenv("DECK_SEEN_CAPACITY", "1000"))
+    DECK_SEEN_ERROR_RATE: float = float(os.getenv("DECK_SEEN_ERROR_RATE", "0.01"))
+    DECK_SEEN_TTL_SECONDS: float = float(os.getenv("DECK_SEEN_TTL_SECONDS", "2592000"))
+
+    # Denormalized member snapshots on teams (services/member_snapshots.py)
+    SNAPSHOT_FANOUT_BATCH: int = int(os.getenv("SNAPSHOT_FANOUT_BATCH", "10"))
+    SNAPSHOT_SWEEP_SECONDS: float = float(os.getenv("SNAPSHOT_SWEEP_SECONDS", "3600"))
+
+    # XP & reputation engine (services/reputation.py)
+    REPUTATION_LOG_PATH: str = os.getenv("REPUTATION_LOG_PATH", "/tmp/hackconnect/reputation.log")
+    REPUTATION_FLUSH_SECONDS: float = float(os.getenv("REPUTATION_FLUSH_SECONDS", "5"))
+    REPUTATION_WRITE_CONCURRENCY: int = int(os.getenv("REPUTATION_WRITE_CONCURRENCY", "8"))
+
+    # XP leaderboard (services/leaderboard.py): one bucket per xp value up to this, the rest share the top bucket
+    LEADERBOARD_MAX_XP: int = int(os.getenv("LEADERBOARD_MAX_XP", "1000000"))
+    LEADERBOARD_REFRESH_SECONDS: float = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "600"))  # picks up XP written by other hosts
+
+    # Judge scores write-behind (services/score_wal.py)
+    SCORE_WAL_PATH: str = os.getenv("SCORE_WAL_PATH", "/tmp/hackconnect/scores.wal")
+    SCORE_WAL_FSYNC: bool = os.getenv("SCORE_WAL_FSYNC", "true").lower() == "true"
+    SCORE_WAL_COMPACT_BYTES: int = int(os.getenv("SCORE_WAL_COMPACT_BYTES", str(1 << 20)))
+    SCORE_FLUSH_MS: float = float(os.getenv("SCORE_FLUSH_MS", "250"))
+    SCORE_FLUSH_BATCH: int = int(os.getenv("SCORE_FLUSH_BATCH", "100"))
+    SCORE_WRITE_CONCURRENCY: int = int(os.getenv("SCORE_WRITE_CONCURRENCY", "8"))
+
+    # On-demand request profiling (core/profiling.py)
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")  # X-Profile header value; empty = header ignored
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # share of requests profiled
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "/tmp/hackconnect/profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "50"))  # newest profiles kept
+    PROFILE_TOP_FUNCTIONS: int = int(os.getenv("PROFILE_TOP_FUNCTIONS", "25"))
+
+    # Streaming AI summaries (services/gemini.py)
+    AI_SUMMARY_PROVIDER: str = os.getenv("AI_SUMMARY_PROVIDER", "gemini")  # gemini | stub (local generator)
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-pro")
+    AI_SUMMARY_TTL_SECONDS: float = float(os.getenv("AI_SUMMARY_TTL_SECONDS", "604800"))
+    AI_MAX_STREAMS: int = int(os.getenv("AI_MAX_STREAMS", "16"))  # concurrent streams per worker
+    AI_STUB_TOKEN_MS: float = float(os.getenv("AI_STUB_TOKEN_MS", "30"))
+    AI_STUB_TOKENS: int = int(os.getenv("AI_STUB_TOKENS", "60"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from app.core.admission import controller
+from app.core.config import settings
+from app.core.startup import PREWARM_STATUS, background_status
+from app.services.reputation import engine as reputation
+from app.services.resilience import deadline_scope, get_upstream_executor
+from app.services.score_wal import wal as score_wal
+
+# Background health prober.
+#
+# Load balancers poll health constantly, so probe endpoints must not do I/O
+# and their latency must not track Appwrite's. Every HEALTH_PROBE_SECONDS this
+# task measures, and caches in HEALTH:
+#   upstream  one list_documents(limit 1, $id only) round-trip, open breakers
+#   pools     upstream executor / asyncio default pool: threads, queued work
+#   load      admission in-flight vs capacity, event-loop lag
+#   jobs      background task liveness, score WAL backlog, reputation write-back
+# /health/ready only reads HEALTH: "ready" / "degraded" answer 200, "not_ready" 503.
+
+HEALTH = {"status": "starting", "checked_at": None, "reasons": [], "checks": {}}
+
+
+def _pool(executor) -> dict:
+    if executor is None:
+        return {"threads": 0, "max_workers": None, "queued": 0}
+    # ThreadPoolExecutor has no public gauges; these attributes are stable since 3.8
+    return {
+        "threads": len(getattr(executor, "_threads", ())),
+        "max_workers": getattr(executor, "_max_workers", None),
+        "queued": executor._work_queue.qsize() if hasattr(executor, "_work_queue") else 0,
+    }
+
+
+def _probe_upstream() -> float:
+    from appwrite.query import Query
+    from app.services.appwrite import get_db_service
+
+    start = time.perf_counter()
+    get_db_service().list_documents(
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_HACKATHONS,
+        queries=[Query.limit(1), Query.select(['$id'])]
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+async def _check_upstream() -> dict:
+    from app.services.appwrite import get_db_service
+
+    try:
+        with deadline_scope(settings.HEALTH_PROBE_TIMEOUT_SECONDS, reset=True):
+            latency = await asyncio.to_thread(_probe_upstream)
+        result = {"reachable": True, "latency_ms": round(latency, 1), "error": None}
+    except Exception as e:
+        result = {"reachable": False, "latency_ms": None, "error": str(e) or type(e).__name__}
+    breakers = get_db_service().snapshot()["breakers"]
+    result["open_breakers"] = sorted(key for key, b in breakers.items() if b["state"] != "closed")
+    return result
+
+
+def _check_jobs() -> dict:
+    scores = score_wal.snapshot()
+    return {
+        "tasks": background_status(),
+        "score_wal_backlog_bytes": scores["log_bytes"] - scores["flushed_offset"] if scores["writer"] else None,
+        "reputation_dirty_users": len(reputation.dirty),
+    }
+
+
+async def probe(loop_lag_ms: float = 0.0):
+    upstream = await _check_upstream()
+    pools = {
+        "upstream": _pool(get_upstream_executor()),
+        "default": _pool(getattr(asyncio.get_running_loop(), "_default_executor", None)),
+    }
+    load = {
+        "in_flight": controller.in_flight,
+        "max_in_flight": controller.max_in_flight,
+        "loop_lag_ms": round(loop_lag_ms, 1),
+    }
+    jobs = _check_jobs()
+
+    reasons = []
+    if not upstream["reachable"]:
+        reasons.append("upstream unreachable")
+    elif upstream["latency_ms"] > settings.HEALTH_MAX_LATENCY_MS:
+        reasons.append("upstream slow")
+    if upstream["open_breakers"]:
+        reasons.append("circuit open: " + ", ".join(upstream["open_breakers"]))
+    for name, pool in pools.items():
+        if pool["max_workers"] and pool["queued"] >= pool["max_workers"]:
+            reasons.append(f"{name} pool saturated")
+    if load["in_flight"] >= load["max_in_flight"]:
+        reasons.append("at admission capacity")
+    if loop_lag_ms > settings.HEALTH_MAX_LATENCY_MS:
+        reasons.append("event loop lagging")
+    crashed = [name for name, state in jobs["tasks"].items() if state == "cancelled" or state.startswith("failed")]
+    if crashed:
+        reasons.append("background task stopped: " + ", ".join(crashed))
+
+    HEALTH.update({
+        "status": "not_ready" if not upstream["reachable"] else "degraded" if reasons else "ready",
+        "checked_at": time.time(),
+        "reasons": reasons,
+        "checks": {"upstream": upstream, "pools": pools, "load": load, "jobs": jobs, "prewarm": PREWARM_STATUS["state"]},
+    })
+
+
+def readiness() -> dict:
+    """The cached probe result; a result older than 3 intervals counts as not ready"""
+    checked_at = HEALTH["checked_at"]
+    age = time.time() - checked_at if checked_at else None
+    stale = age is None or age > settings.HEALTH_PROBE_SECONDS * 3 + settings.HEALTH_PROBE_TIMEOUT_SECONDS
+    status = "not_ready" if stale else HEALTH["status"]
+    reasons = HEALTH["reasons"] if not stale else ["no recent probe" if checked_at else "first probe pending"]
+    return {**HEALTH, "status": status, "reasons": reasons, "age_s": round(age, 1) if age is not None else None}
+
+
+async def maintain_health():
+    """Lifespan task: probe every HEALTH_PROBE_SECONDS; sleep overshoot is reported as event-loop lag"""
+    loop = asyncio.get_running_loop()
+    lag = 0.0
+    while True:
+        try:
+            await probe(lag)
+        except Exception as e:
+            print(f"⚠️ health probe failed: {e}")
+        start = loop.time()
+        await asyncio.sleep(settings.HEALTH_PROBE_SECONDS)
+        lag = max(0.0, (loop.time() - start - settings.HEALTH_PROBE_SECONDS) * 1000)
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import re
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.services.cache import get_idempotency_cache
+
+# Idempotency-Key support for the create endpoints.
+#
+# A client retrying a POST on a flaky network used to create a second
+# hackathon / team / submission / score (every create uses ID.unique()). With
+# an `Idempotency-Key` header the first request runs, and its response is kept
+# for IDEMPOTENCY_TTL_SECONDS in the idempotency cache (get_idempotency_cache:
+# the CACHE_BACKEND kind in a store of its own, bounded by IDEMPOTENCY_MAX_ENTRIES,
+# so read-cache churn can't evict a record; shared by the workers of a host on
+# sqlite, per worker on memory). Nothing here calls Appwrite, so keyed creates
+# behave the same during an upstream outage:
+#   - the first request claims the key with an atomic add of a "running" marker
+#   - a replay gets the stored response (`Idempotent-Replayed: true`)
+#   - a duplicate arriving while the first is in flight waits for it and replays
+#     its response; if the first ends without storing one (5xx, crash), the
+#     duplicate claims the key and runs itself. A marker whose owner died
+#     expires after IDEMPOTENCY_CLAIM_SECONDS
+#   - the same key with a different body -> 422
+#   - 5xx responses are not stored, so the client can retry them
+
+IDEMPOTENT_ROUTES = [re.compile(pattern) for pattern in (
+    r"^/api/auth/register$",
+    r"^/api/hackathons/?$",
+    r"^/api/teams/?$",
+    r"^/api/submissions/?$",
+    r"^/api/judging/score$",
+    r"^/api/organizer/[^/]+/announce$",
+)]
+
+POLL_SECONDS = 0.025
+_SKIP_HEADERS = {"content-length", "x-process-time"}
+stats = {"stored": 0, "replayed": 0, "waited": 0, "mismatched": 0}
+
+
+def _applies(request: Request) -> bool:
+    return request.method == "POST" and any(p.match(request.url.path) for p in IDEMPOTENT_ROUTES)
+
+
+def _error(status_code: int, detail: str, headers: dict = None) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+
+
+def _replay(record: dict) -> Response:
+    stats["replayed"] += 1
+    response = Response(record["body"], status_code=record["status"], headers=dict(record["headers"]))
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+# --- CLAIM ---
+async def _claim(record_key: str, fingerprint: str):
+    """
+    None once this request owns the key, else the response to send (replay or
+    error). Waits while another request holds the key, for at most IDEMPOTENCY_CLAIM_SECONDS.
+    """
+    cache = get_idempotency_cache()
+    waited = False
+    deadline = time.monotonic() + settings.IDEMPOTENCY_CLAIM_SECONDS
+    while True:
+        record = await asyncio.to_thread(cache.get, "idempotency", record_key)
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                break
+            return _replay(record)
+        if await asyncio.to_thread(cache.add, "idempotency_running", record_key, fingerprint, settings.IDEMPOTENCY_CLAIM_SECONDS):
+            return None
+        running = await asyncio.to_thread(cache.get, "idempotency_running", record_key)
+        if running is not None and running != fingerprint:
+            break
+        if not waited:
+            waited = True
+            stats["waited"] += 1
+        if time.monotonic() > deadline:
+            return _error(503, "A request with this Idempotency-Key is still in progress", {"Retry-After": "1"})
+        await asyncio.sleep(POLL_SECONDS)
+    stats["mismatched"] += 1
+    return _error(422, "Idempotency-Key was already used with a different request body")
+
+
+async def idempotency(request: Request, call_next):
+    key = request.headers.get("Idempotency-Key")
+    if not key or not _applies(request):
+        return await call_next(request)
+    if len(key) > 255:
+        return _error(400, "Idempotency-Key must be at most 255 characters")
+
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+    record_key = f"{request.url.path}:{key}"
+    answer = await _claim(record_key, fingerprint)
+    if answer is not None:
+        return answer
+
+    cache = get_idempotency_cache()
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS]
+        if response.status_code < 500:
+            await asyncio.to_thread(cache.set, "idempotency", record_key, {
+                "fingerprint": fingerprint,
+                "status": response.status_code,
+                "headers": headers,
+                "body": body,
+            })
+            stats["stored"] += 1
+    finally:
+        # Stored (waiters replay it) or not (5xx / error: the next waiter runs the request)
+        await asyncio.to_thread(cache.delete, "idempotency_running", record_key)
+    response = Response(body, status_code=response.status_code, headers=dict(headers))
+    response.headers["Idempotent-Replayed"] = "false"
+    return response
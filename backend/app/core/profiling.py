@@ -0,0 +1,195 @@
+import asyncio
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import time
+from contextvars import ContextVar
+
+from app.core.admission import controller
+from app.core.config import settings
+
+# On-demand request profiling.
+#
+# A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` (header
+# disabled while the token is empty) or is picked by PROFILE_SAMPLE_RATE. For
+# it we record:
+#   - Python CPU time on the event loop thread (cProfile with a thread CPU-time
+#     clock), saved as a .pstats file (`python -m pstats`, snakeviz)
+#   - awaited upstream time: every Appwrite call made for the request, timed by
+#     the resilience proxy (services/resilience.py) through a ContextVar that
+#     asyncio.to_thread carries into the worker thread
+# plus a .json summary (wall / CPU / upstream ms, top functions). Both go to
+# PROFILE_DIR, which keeps the newest PROFILE_MAX_FILES profiles; they are
+# listed at GET /api/system/profiles, which needs the token (sampling without a
+# token set still writes profiles, read them from PROFILE_DIR on the host).
+#
+# cProfile sees everything run on the event loop thread while it is on, so
+# coroutines of concurrent requests show up too ("concurrent" in the summary
+# says how many there were). One profile runs at a time per worker.
+#
+# A plain ASGI middleware rather than @app.middleware("http"): when a request
+# isn't profiled, the cost is one header scan (only with a token set) and one
+# random() (only with a sample rate set).
+
+_upstream: ContextVar = ContextVar("profile_upstream", default=None)
+_NAME = re.compile(r"^[\w.-]+$")
+_busy = False
+stats = {"profiled": 0, "requested": 0, "sampled": 0, "skipped_busy": 0, "write_errors": 0}
+
+
+def profiling_upstream() -> bool:
+    """Is the current request being profiled? (the resilience proxy only times calls then)"""
+    return _upstream.get() is not None
+
+
+def record_upstream(method: str, collection: str, seconds: float):
+    """Called by the resilience proxy after every upstream call"""
+    calls = _upstream.get()
+    if calls is not None:
+        calls.append((method, collection, seconds))
+
+
+def _requested(scope) -> bool:
+    token = settings.PROFILE_TOKEN
+    if token:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, token.encode())
+    return False
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = _requested(scope)
+        rate = settings.PROFILE_SAMPLE_RATE
+        if not requested and not (rate and random.random() < rate):
+            return await self.app(scope, receive, send)
+        if scope["path"].startswith("/api/system/profiles"):
+            return await self.app(scope, receive, send)  # the token also authorizes reading profiles
+        return await _profile(self.app, scope, receive, send, "header" if requested else "sample")
+
+
+async def _profile(app, scope, receive, send, trigger: str):
+    global _busy
+    if _busy:
+        stats["skipped_busy"] += 1
+        return await app(scope, receive, _with_header(send, b"x-profile", b"busy"))
+
+    _busy = True
+    stats["profiled"] += 1
+    stats["requested" if trigger == "header" else "sampled"] += 1
+    name = f"{int(time.time() * 1000)}-{os.getpid()}-{scope['method']}-{re.sub(r'[^A-Za-z0-9]+', '_', scope['path']).strip('_')[:60]}"
+    status, calls = [None], []
+
+    async def send_profiled(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+        await send(message)
+
+    summary = {
+        "name": name, "method": scope["method"], "path": scope["path"], "trigger": trigger,
+        "concurrent": max(0, controller.in_flight - 1), "started_at": time.time(),
+    }
+    reset = _upstream.set(calls)
+    profiler = cProfile.Profile(time.thread_time)  # CPU time: the loop idling in epoll costs ~0
+    wall, cpu = time.perf_counter(), time.thread_time()
+    profiler.enable()
+    try:
+        await app(scope, receive, _with_header(send_profiled, b"x-profile-id", name.encode()))
+    finally:
+        profiler.disable()
+        summary["wall_ms"] = round((time.perf_counter() - wall) * 1000, 2)
+        summary["cpu_ms"] = round((time.thread_time() - cpu) * 1000, 2)
+        _upstream.reset(reset)
+        _busy = False
+        summary["status"] = status[0]
+        summary["upstream_ms"] = round(sum(seconds for _, _, seconds in calls) * 1000, 2)
+        summary["upstream_calls"] = [
+            {"method": method, "collection": collection, "ms": round(seconds * 1000, 2)}
+            for method, collection, seconds in calls[:100]
+        ]
+        asyncio.get_running_loop().run_in_executor(None, _write, profiler, summary)
+
+
+def _with_header(send, name: bytes, value: bytes):
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), (name, value)]}
+        await send(message)
+    return wrapped
+
+
+def _write(profiler: cProfile.Profile, summary: dict):
+    """Worker thread: .pstats + .json summary, then drop the oldest profiles past PROFILE_MAX_FILES"""
+    try:
+        directory = settings.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, summary["name"])
+        profiler.dump_stats(base + ".pstats")
+        entries = pstats.Stats(profiler).stats  # (file, line, function) -> (calls, primitive, tottime, cumtime, callers)
+        top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:settings.PROFILE_TOP_FUNCTIONS]
+        summary["top_functions"] = [
+            {"function": f"{os.path.basename(file)}:{line}({function})", "calls": calls,
+             "tottime_ms": round(tottime * 1000, 2), "cumtime_ms": round(cumtime * 1000, 2)}
+            for (file, line, function), (_, calls, tottime, cumtime, _) in top
+        ]
+        with open(base + ".json", "w") as f:
+            json.dump(summary, f)
+
+        summaries = sorted((e for e in os.scandir(directory) if e.name.endswith(".json")), key=lambda e: e.name)
+        for old in summaries[:max(0, len(summaries) - settings.PROFILE_MAX_FILES)]:
+            for suffix in (".json", ".pstats"):
+                try:
+                    os.remove(old.path[:-len(".json")] + suffix)
+                except FileNotFoundError:
+                    pass
+    except Exception as e:
+        stats["write_errors"] += 1
+        print(f"⚠️ profile write failed: {e}")
+
+
+def list_profiles() -> list:
+    """Stored profile summaries, newest first (blocking I/O: run it in a thread)"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    out = []
+    for entry in sorted(os.scandir(settings.PROFILE_DIR), key=lambda e: e.name, reverse=True):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path) as f:
+                    out.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # pruned or still being written
+    return out
+
+
+def profile_path(name: str):
+    """Path of a stored .pstats file, or None (names are checked: no path traversal)"""
+    if not _NAME.match(name):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, name + ".pstats")
+    return path if os.path.isfile(path) else None
+
+
+def authorized(request) -> bool:
+    """Listing / download need the X-Profile token; with no token configured nobody can read profiles"""
+    token = settings.PROFILE_TOKEN
+    return bool(token) and hmac.compare_digest(request.headers.get("x-profile", "").encode(), token.encode())
+
+
+def snapshot() -> dict:
+    return {
+        "header_enabled": bool(settings.PROFILE_TOKEN),
+        "sample_rate": settings.PROFILE_SAMPLE_RATE,
+        "busy": _busy,
+        **stats,
+    }
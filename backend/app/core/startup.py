@@ -0,0 +1,121 @@
+import asyncio
+import importlib
+import time
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+# Captured as early as possible so "time to first request" covers the imports
+PROCESS_START = time.perf_counter()
+
+# Filled in by prewarm_upstream() - read_root reports this instead of doing live I/O
+PREWARM_STATUS = {
+    "state": "pending",
+    "started_at": None,
+    "finished_at": None,
+    "duration_ms": None,
+    "error": None,
+}
+
+_background_tasks = {}
+
+# First builds of the in-memory indexes (membership, skills, similarity,
+# autocomplete, leaderboard, plagiarism scan) each page through a whole
+# collection. They start once the pre-warm is done and run one at a time, so a
+# cold worker's first requests don't queue behind all of those scans at once
+# (until its index is ready a route queries Appwrite directly or answers 503 +
+# Retry-After).
+_prewarmed = asyncio.Event()
+_cold_builds = asyncio.Lock()
+
+
+def lazy_import(module_name: str):
+    """
+    Imports a heavy optional module on first use instead of at app import.
+    Optimization: keeps google.generativeai & friends off the cold-start path.
+    """
+    return importlib.import_module(module_name)
+
+
+async def cold_build(build):
+    """Run `build()` (an index's first build) after the pre-warm, one index at a time"""
+    await _prewarmed.wait()
+    async with _cold_builds:
+        return await build()
+
+
+def uptime_ms() -> float:
+    return (time.perf_counter() - PROCESS_START) * 1000
+
+
+def start_background(name: str, coro):
+    """Schedule a long-running coroutine that lives for the whole app lifespan"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks[name] = task
+    return task
+
+
+def background_status() -> dict:
+    """name -> "running" / "done" / "cancelled" / "failed: <error>" for every start_background() task"""
+    status = {}
+    for name, task in _background_tasks.items():
+        if not task.done():
+            status[name] = "running"
+        elif task.cancelled():
+            status[name] = "cancelled"
+        elif task.exception() is not None:
+            status[name] = f"failed: {task.exception()}"
+        else:
+            status[name] = "done"  # one-shot tasks (pre-warm, leaderboard build)
+    return status
+
+
+async def stop_background():
+    """Cancel every task registered with start_background()"""
+    tasks = list(_background_tasks.values())
+    _background_tasks.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _prewarm_sync():
+    # 1. Pay for the Appwrite SDK import (~0.6s cold) & client construction off the request path
+    from app.services.appwrite import get_db_service, get_users_service
+    db = get_db_service()
+    get_users_service()
+
+    # 2. Resolve the upstream host into the DNS cache so the first handler doesn't block on it
+    endpoint = urlparse(settings.APPWRITE_ENDPOINT or "")
+    if endpoint.hostname:
+        from app.services.resolver import resolver
+        resolver.resolve(endpoint.hostname, endpoint.port or (80 if endpoint.scheme == "http" else 443))
+
+    # 3. One cheap round-trip: loads the TLS trust store & warms Appwrite's edge for this project
+    if settings.APPWRITE_DATABASE_ID and settings.COLLECTION_HACKATHONS:
+        from appwrite.query import Query
+        db.list_documents(
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=settings.COLLECTION_HACKATHONS,
+            queries=[Query.limit(1), Query.select(['$id'])]
+        )
+
+
+async def prewarm_upstream():
+    """
+    Runs once in the background at startup. The server starts accepting
+    requests immediately; this just makes the first real request cheap.
+    """
+    PREWARM_STATUS["state"] = "running"
+    PREWARM_STATUS["started_at"] = round(uptime_ms(), 1)
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(_prewarm_sync)
+        PREWARM_STATUS["state"] = "ready"
+    except Exception as e:
+        PREWARM_STATUS["state"] = "failed"
+        PREWARM_STATUS["error"] = str(e)
+    finally:
+        PREWARM_STATUS["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        PREWARM_STATUS["finished_at"] = round(uptime_ms(), 1)
+        _prewarmed.set()
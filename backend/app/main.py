@@ -1,44 +1,110 @@
+from app.core.startup import PREWARM_STATUS, prewarm_upstream, start_background, stop_background, uptime_ms # <--- FIRST: starts the cold-start clock
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-import socket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings
-
-from app.services.appwrite import get_db_service # <--- NEW IMPORT
+from app.services.resilience import deadline_scope
+from app.core.admission import AdmissionMiddleware
+from app.core.idempotency import idempotency
+from app.core.profiling import ProfilingMiddleware
+from app.core.health import maintain_health, readiness
+from app.services.resolver import maintain_resolver, resolver
+from app.services.membership import maintain_index
+from app.services.skill_index import maintain_skill_index
+from app.services.similarity import maintain_similarity
+from app.services.plagiarism import maintain_plagiarism
+from app.services.autocomplete import maintain_autocomplete
+from app.services.member_snapshots import maintain_snapshots
+from app.services.reputation import maintain_reputation
+from app.services.leaderboard import maintain_leaderboard
+from app.services.warmer import maintain_warmer
+from app.services.score_wal import maintain_score_wal
 
 import time
-from app.api.routes import hackathons, auth, users, teams, submissions, organizer, judging
+from app.api.routes import hackathons, auth, users, teams, submissions, organizer, judging, system, health, autocomplete, ai
+
+# --- 🌐 UPSTREAM DNS ---
+# Cached lookups + happy-eyeballs connects (services/resolver.py). A broken IPv6
+# path on Cloud used to cost a 30s timeout; now it costs one HAPPY_EYEBALLS_DELAY_MS
+# and IPv4 goes first until IPv6 recovers. DNS_DISABLE_IPV6=true restores IPv4-only.
+resolver.install()
 
-# --- 🚀 FIX: FORCE IPV4 (Paste this at the top) ---
-# This forces Python to ignore IPv6, fixing the 30s timeout on Cloud.
-def force_ipv4():
-    old_getaddrinfo = socket.getaddrinfo
-    def new_getaddrinfo(*args, **kwargs):
-        responses = old_getaddrinfo(*args, **kwargs)
-        return [r for r in responses if r[0] == socket.AF_INET]
-    socket.getaddrinfo = new_getaddrinfo
 
-force_ipv4() # <--- Run it immediately
+# --- ❄️ COLD START: background work kicked off once the server is up ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Don't await: the first request must not wait for upstream warm-up
+    start_background("prewarm_upstream", prewarm_upstream())
+    start_background("health", maintain_health())
+    start_background("dns_refresh", maintain_resolver())
+    start_background("membership_index", maintain_index())
+    start_background("skill_index", maintain_skill_index())
+    start_background("similarity_index", maintain_similarity())
+    start_background("plagiarism", maintain_plagiarism())
+    start_background("autocomplete", maintain_autocomplete())
+    start_background("member_snapshots", maintain_snapshots())
+    start_background("reputation", maintain_reputation())
+    start_background("leaderboard", maintain_leaderboard())
+    start_background("score_wal", maintain_score_wal())
+    if settings.WARM_ENABLED:
+        start_background("cache_warmer", maintain_warmer())
+    yield
+    await stop_background()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 # --- 1. PERFORMANCE TIMER (Add This Block) ---
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     start_time = time.time()
-    
+
     # Run the request
     response = await call_next(request)
-    
+
     # Calculate time
     process_time = time.time() - start_time
-    
+
     # Add it to the response headers (so Frontend can see it)
     response.headers["X-Process-Time"] = str(process_time)
-    
+
     # Print to your console
     print(f"⏱️ API LOG: {request.method} {request.url.path} completed in {process_time:.4f} seconds")
-    
+
     return response
 
+# --- 2. REQUEST DEADLINE ---
+# Every upstream call made while handling the request shares this budget
+# (services/resilience.py). Clients may ask for less via X-Request-Timeout (seconds).
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    budget = settings.REQUEST_DEADLINE_SECONDS
+    requested = request.headers.get("X-Request-Timeout")
+    if requested:
+        try:
+            budget = min(budget, max(0.05, float(requested)))
+        except ValueError:
+            pass
+
+    with deadline_scope(budget):
+        return await call_next(request)
+
+# --- 3. IDEMPOTENCY-KEY ---
+# Retried creates replay the first response instead of writing again (core/idempotency.py)
+app.middleware("http")(idempotency)
+
+# --- 4. ON-DEMAND PROFILING ---
+# X-Profile: <PROFILE_TOKEN> or PROFILE_SAMPLE_RATE: cProfile + upstream time per request (core/profiling.py)
+app.add_middleware(ProfilingMiddleware)
+
+# --- 5. ADMISSION CONTROL ---
+# Outermost of our middlewares: shed load / rate-limit before any work is done
+app.add_middleware(AdmissionMiddleware)
+
+# --- 6. RESPONSE COMPRESSION ---
+# List views are JSON arrays: gzip cuts them ~5-10x. Small bodies aren't worth the CPU.
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_BYTES, compresslevel=settings.GZIP_LEVEL)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -50,20 +116,25 @@ app.add_middleware(
 
 @app.get("/")
 def read_root():
-    status = "Checking..."
-    try:
-        # CORRECT METHOD: list_documents (Plural)
-        get_db_service().list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID, 
-            collection_id=settings.COLLECTION_HACKATHONS
-        )
+    """
+    Optimization: No upstream I/O here - reports the last result of the
+    background health prober (core/health.py) and the pre-warm.
+    """
+    upstream = readiness()["checks"].get("upstream")
+    if upstream and upstream["reachable"]:
         status = "✅ Connected to Appwrite"
-    except Exception as e:
-        status = f"❌ Connection Failed: {str(e)}"
+    elif upstream:
+        status = f"❌ Connection Failed: {upstream['error']}"
+    elif PREWARM_STATUS["state"] == "failed":
+        status = f"❌ Connection Failed: {PREWARM_STATUS['error']}"
+    else:
+        status = "Checking..."
 
     return {
         "status": status,
-        "docs": "http://localhost:8000/docs"
+        "docs": "http://localhost:8000/docs",
+        "uptime_ms": round(uptime_ms(), 1),
+        "prewarm": PREWARM_STATUS
     }
 
 # Register Routes
@@ -74,4 +145,8 @@ app.include_router(users.router, prefix="/api/users", tags=["Users"])
 
 app.include_router(submissions.router, prefix="/api/submissions", tags=["Submissions"])
 app.include_router(organizer.router, prefix="/api/organizer", tags=["Organizer"])
-app.include_router(judging.router, prefix="/api/judging", tags=["Judging"])
\ No newline at end of file
+app.include_router(judging.router, prefix="/api/judging", tags=["Judging"])
+app.include_router(autocomplete.router, prefix="/api/autocomplete", tags=["Autocomplete"])
+app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
+app.include_router(system.router, prefix="/api/system", tags=["System"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
\ No newline at end of file
@@ -0,0 +1,164 @@
+import sys
+
+# Compact in-memory records for cached users, teams and hackathons.
+#
+# A document as the Appwrite SDK returns it is a dict with its own copy of every
+# key string, `$`-prefixed system keys ($permissions, $databaseId, ...) and
+# lists for skills / tags: several KB per document once resident. A record keeps
+# only the fields of the matching *Response model, in __slots__ (no per-object
+# dict), with:
+#   - IDs, enums, skills, tech stack and tags interned: each distinct string
+#     exists once per process, however many records share it
+#   - list fields stored as tuples (immutable; the empty tuple is a singleton)
+#   - pickling as one flat tuple, so records are also smaller in the shared cache
+#
+#   record = UserRecord.from_document(doc)   # Appwrite document or API dict
+#   record.to_api()        # UserResponse shape: id / created_at / updated_at
+#   record.to_document()   # Appwrite shape: $id / $createdAt / $updatedAt
+#
+# Records are read-only snapshots: rebuild one from the new document on writes.
+
+_SYSTEM = {"id": "$id", "created_at": "$createdAt", "updated_at": "$updatedAt"}
+
+# Field kinds
+_ID = 0     # short string repeated across documents: interned
+_TEXT = 1   # free text / URLs / timestamps: kept as is
+_LIST = 2   # list of short strings: tuple of interned strings
+_VALUE = 3  # numbers, booleans
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Record:
+    __slots__ = ()
+    FIELDS = ()  # ((name, kind, default), ...) in slot order
+
+    @classmethod
+    def from_document(cls, doc: dict):
+        """From an Appwrite document ($id, $createdAt...) or an API dict (id, created_at...)"""
+        row = []
+        for name, kind, default in cls.FIELDS:
+            if name in _SYSTEM:
+                value = doc.get(name, doc.get(_SYSTEM[name], default))
+            else:
+                value = doc.get(name, default)
+            row.append(value)
+        return cls._from_row(row)
+
+    @classmethod
+    def _from_row(cls, row):
+        record = cls.__new__(cls)
+        for (kind, set_slot), value in zip(cls._SETTERS, row):
+            if kind == _ID:
+                value = _intern(value)
+            elif kind == _LIST:
+                value = tuple([_intern(v) for v in value]) if value else ()
+            set_slot(record, value)  # the slot descriptor: bypasses the read-only __setattr__
+        return record
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._SETTERS = tuple((kind, getattr(cls, name).__set__) for name, kind, _ in cls.FIELDS)
+
+    def to_api(self) -> dict:
+        """The *Response model's shape (id / created_at / updated_at)"""
+        return {
+            name: list(getattr(self, name)) if kind == _LIST else getattr(self, name)
+            for name, kind, _ in self.FIELDS
+        }
+
+    def to_document(self) -> dict:
+        """The Appwrite document's shape ($id / $createdAt / $updatedAt), without permissions & co."""
+        return {
+            _SYSTEM.get(name, name): list(getattr(self, name)) if kind == _LIST else getattr(self, name)
+            for name, kind, _ in self.FIELDS
+        }
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self):
+        return self._from_row, ([getattr(self, name) for name, _, _ in self.FIELDS],)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name, _, _ in self.FIELDS
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r})"
+
+
+def _slots(fields) -> tuple:
+    return tuple(name for name, _, _ in fields)
+
+
+class UserRecord(_Record):
+    """Cached shape of UserResponse"""
+    FIELDS = (
+        ("id", _ID, None),
+        ("username", _TEXT, None),
+        ("email", _TEXT, None),
+        ("name", _TEXT, None),
+        ("role", _ID, "participant"),
+        ("bio", _TEXT, None),
+        ("avatar_url", _TEXT, None),
+        ("github_url", _TEXT, None),
+        ("portfolio_url", _TEXT, None),
+        ("skills", _LIST, ()),
+        ("tech_stack", _LIST, ()),
+        ("xp", _VALUE, 0),
+        ("reputation_score", _VALUE, 0.0),
+        ("account_id", _ID, None),
+        ("created_at", _TEXT, None),
+        ("updated_at", _TEXT, None),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class TeamRecord(_Record):
+    """Cached shape of TeamResponse"""
+    FIELDS = (
+        ("id", _ID, None),
+        ("hackathon_id", _ID, None),
+        ("name", _TEXT, None),
+        ("description", _TEXT, ""),
+        ("leader_id", _ID, None),
+        ("members", _LIST, ()),
+        ("join_requests", _LIST, ()),
+        ("looking_for", _LIST, ()),
+        ("tech_stack", _LIST, ()),
+        ("status", _ID, "open"),
+        ("project_repo", _TEXT, None),
+        ("created_at", _TEXT, None),
+    )
+    __slots__ = _slots(FIELDS)
+
+
+class HackathonRecord(_Record):
+    """Cached shape of HackathonResponse (dates kept as the ISO strings Appwrite returns)"""
+    FIELDS = (
+        ("id", _ID, None),
+        ("name", _TEXT, None),
+        ("description", _TEXT, ""),
+        ("start_date", _TEXT, None),
+        ("end_date", _TEXT, None),
+        ("location", _ID, None),
+        ("tags", _LIST, ()),
+        ("organizer_id", _ID, None),
+        ("prize_pool", _TEXT, None),
+        ("registration_link", _TEXT, None),
+        ("image_url", _TEXT, None),
+        ("status", _ID, "draft"),
+        ("min_team_size", _VALUE, 1),
+        ("max_team_size", _VALUE, 4),
+        ("mode", _ID, "online"),
+        ("tagline", _TEXT, None),
+        ("created_at", _TEXT, None),
+        ("updated_at", _TEXT, None),
+    )
+    __slots__ = _slots(FIELDS)
@@ -15,7 +15,26 @@ class TeamBase(BaseModel):
     project_repo: Optional[str] = None
 
 class TeamCreate(TeamBase):
-    pass # We use the Base for creation
+
+    def to_document(self) -> dict:
+        """Appwrite payload: leader is always a member, unset optionals dropped"""
+        members = self.members.copy() if self.members else []
+        if self.leader_id not in members:
+            members.append(self.leader_id)
+
+        return {
+            k: v for k, v in {
+                "name": self.name,
+                "description": self.description,
+                "hackathon_id": self.hackathon_id,
+                "leader_id": self.leader_id,
+                "members": members,
+                "looking_for": self.looking_for,
+                "tech_stack": self.tech_stack,
+                "status": self.status,
+                "project_repo": self.project_repo
+            }.items() if v is not None
+        }
 
 class TeamResponse(TeamBase):
     id: str
@@ -23,6 +23,19 @@ class UserRegister(BaseModel):
     username: str
     role: str = "participant"
 
+    def profile_document(self, account_id: str) -> dict:
+        """Initial DB profile created alongside the auth account"""
+        return {
+            "username": self.username,
+            "account_id": account_id,
+            "role": self.role,
+            "xp": 0,
+            "reputation_score": 0.0,
+            "skills": [],
+            "tech_stack": [],
+            "bio": f"Hi! I'm {self.name}"
+        }
+
 # --- 3. LOGIN INPUT ---
 class UserLoginSync(BaseModel):
     id: str
@@ -38,6 +51,10 @@ class UserUpdate(BaseModel):
     portfolio_url: Optional[str] = None    
     avatar_url: Optional[str] = None
 
+# PUT /api/auth/profile names the user in the body
+class ProfileUpdate(UserUpdate):
+    user_id: str
+
 # --- 5. CHANGE PASSWORD INPUT ---
 class PasswordChange(BaseModel):
     user_id: str
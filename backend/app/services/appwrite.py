@@ -1,28 +1,92 @@
-from appwrite.client import Client
-from appwrite.services.databases import Databases
-from appwrite.services.users import Users
 from app.core.config import settings
+from app.services.resilience import ResilientService, get_upstream_executor, install_http_timeouts
+from app.utils.helpers import chunked
+from appwrite.query import Query
 from functools import lru_cache
+import asyncio
+
+# NOTE: The Appwrite SDK client pulls in every response model on import (~0.6s cold).
+# Imports live inside the factories so `import app.main` stays cheap; the
+# startup pre-warm (app/core/startup.py) pays for them in the background.
 
 @lru_cache()
 def get_appwrite_client():
+    from appwrite.client import Client
+
+    install_http_timeouts()  # each upstream attempt's budget becomes its HTTP timeout
     client = Client()
     client.set_endpoint(settings.APPWRITE_ENDPOINT)
     client.set_project(settings.APPWRITE_PROJECT_ID)
     client.set_key(settings.APPWRITE_API_KEY)
-    
-    # ⚡ OPTIMIZATION TIP: 
+
+    # ⚡ OPTIMIZATION TIP:
     # If using Cloud, try setting this to True temporarily to see if it speeds up the handshake.
-    # client.set_self_signed(True) 
-    
+    # client.set_self_signed(True)
+
     return client
 
 @lru_cache()
 def get_db_service():
+    from appwrite.services.databases import Databases
+
     client = get_appwrite_client()
-    return Databases(client)
+    # Deadlines, retries, per-collection circuit breakers & hedging (services/resilience.py)
+    return ResilientService(
+        Databases(client), "databases", get_upstream_executor(),
+        hedge_collections=(settings.COLLECTION_HACKATHONS, settings.COLLECTION_USERS)
+    )
 
 @lru_cache()
 def get_users_service():
+    from appwrite.services.users import Users
+
     client = get_appwrite_client()
-    return Users(client)
\ No newline at end of file
+    return ResilientService(Users(client), "users", get_upstream_executor())
+
+# --- PAGING / BATCH HELPERS ---
+async def iter_documents(collection_id: str, queries=None, page_size: int = 100):
+    """
+    Cursor-paginate a whole collection (async generator of pages).
+    Cursor pagination stays O(page) per call, unlike offset which rescans.
+    """
+    db = get_db_service()
+    cursor = None
+    while True:
+        page_queries = list(queries or []) + [Query.limit(page_size)]
+        if cursor:
+            page_queries.append(Query.cursor_after(cursor))
+        result = await asyncio.to_thread(
+            db.list_documents,
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=collection_id,
+            queries=page_queries
+        )
+        documents = result['documents']
+        if documents:
+            yield documents
+        if len(documents) < page_size:
+            return
+        cursor = documents[-1]['$id']
+
+
+async def get_documents_by_ids(collection_id: str, ids, select=None, chunk_size: int = 100) -> dict:
+    """
+    Fetch many documents by ID -> {id: doc}.
+    Query.equal('$id', [...]) is capped at 100 values, so IDs go in chunks fetched in parallel.
+    """
+    db = get_db_service()
+
+    async def fetch(chunk):
+        queries = [Query.equal('$id', chunk), Query.limit(len(chunk))]
+        if select:
+            queries.append(Query.select(select))
+        result = await asyncio.to_thread(
+            db.list_documents,
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=collection_id,
+            queries=queries
+        )
+        return result['documents']
+
+    pages = await asyncio.gather(*[fetch(chunk) for chunk in chunked(dict.fromkeys(ids), chunk_size)])
+    return {doc['$id']: doc for page in pages for doc in page}
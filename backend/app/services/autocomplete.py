@@ -0,0 +1,287 @@
+import asyncio
+import bisect
+import heapq
+import time
+from collections import Counter
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import iter_documents
+from app.services.skill_index import normalize
+
+# Typeahead for skills, hackathon tags and hackathon names (GET /api/autocomplete/{kind}).
+#
+# Per kind, the distinct terms sit in one sorted list of normalized keys, so the
+# terms starting with a prefix are a contiguous slice (two bisects). Terms are
+# ranked by popularity:
+#   skills      users listing it in skills / tech_stack + teams looking for it
+#   tags        hackathons tagged with it
+#   hackathons  1 + teams registered for it
+# Ranking a slice means scanning it, so prefixes matching more than
+# AUTOCOMPLETE_SCAN_LIMIT terms ("r", "re", ...) keep their top AUTOCOMPLETE_TOP_K
+# precomputed: a query reads a stored list or scans at most AUTOCOMPLETE_SCAN_LIMIT keys.
+#
+# Writes go through from the profile, team and hackathon routes. Each source (a
+# user, team or hackathon) remembers the terms it contributed, so an edit is a
+# diff of weights. Stored lists hold 2 x AUTOCOMPLETE_TOP_K terms (the exact
+# best of their prefix): a term gaining weight is merged in; one losing weight
+# is re-sorted, or dropped once it falls behind the list's last term (something
+# outside could now beat it). Only a list worn below TOP_K is recomputed, on its
+# next query. A full rebuild runs at startup and every AUTOCOMPLETE_REFRESH_SECONDS.
+
+KINDS = ("skills", "tags", "hackathons")
+_END = "\U0010ffff"  # sorts after any character: prefix + _END bounds the prefix's slice
+_ID_SEP = "\x00"  # hackathon keys are "<normalized name>\x00<id>": same names stay distinct
+
+
+class _Vocab:
+    __slots__ = ("keys", "labels", "weights", "tops")
+
+    def __init__(self):
+        self.keys = []  # sorted normalized keys
+        self.labels = {}  # key -> label shown (first spelling seen)
+        self.weights = {}  # key -> popularity
+        self.tops = {}  # heavy prefix -> [key] best first; None = recompute on next query
+
+    def _rank(self, key):
+        return -self.weights[key], key
+
+    @staticmethod
+    def _stored():
+        return 2 * settings.AUTOCOMPLETE_TOP_K
+
+    def _slice(self, prefix: str) -> list:
+        lo = bisect.bisect_left(self.keys, prefix)
+        return self.keys[lo:bisect.bisect_left(self.keys, prefix + _END, lo)]
+
+    def build_tops(self):
+        """Top-K of every prefix matching more than AUTOCOMPLETE_SCAN_LIMIT keys, level by level"""
+        keys, k, limit = self.keys, self._stored(), settings.AUTOCOMPLETE_SCAN_LIMIT
+        self.tops = {}
+        level, depth = [("", 0, len(keys))], 0
+        while level:
+            below = []
+            for prefix, lo, hi in level:
+                if hi - lo <= limit:
+                    continue
+                self.tops[prefix] = heapq.nsmallest(k, keys[lo:hi], key=self._rank)
+                i = lo
+                while i < hi:
+                    if len(keys[i]) <= depth:
+                        i += 1  # the prefix itself is a term
+                        continue
+                    child = keys[i][:depth + 1]
+                    j = bisect.bisect_left(keys, child + _END, i, hi)
+                    below.append((child, i, j))
+                    i = j
+            level, depth = below, depth + 1
+
+    def complete(self, prefix: str, limit: int) -> list:
+        top = self.tops.get(prefix, False)
+        if top is False:
+            keys = self._slice(prefix)
+            if len(keys) <= settings.AUTOCOMPLETE_SCAN_LIMIT:
+                return heapq.nsmallest(limit, keys, key=self._rank)
+            top = None  # grown heavy since the last rebuild: keep its list from now on
+        if top is None:
+            top = self.tops[prefix] = heapq.nsmallest(self._stored(), self._slice(prefix), key=self._rank)
+        return top[:limit]
+
+    def add(self, key: str, label: str, delta: int):
+        weight = self.weights.get(key, 0) + delta
+        if key not in self.weights:
+            if weight <= 0:
+                return
+            bisect.insort(self.keys, key)
+            self.labels[key] = label or key.split(_ID_SEP)[0]
+        if weight <= 0:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+            del self.weights[key], self.labels[key]
+        else:
+            self.weights[key] = weight
+        for i in range(len(key) + 1):
+            top = self.tops.get(key[:i])
+            if not top:
+                continue
+            if key in top:
+                top.remove(key)
+                if weight > 0 and (delta > 0 or not top or self._rank(key) < self._rank(top[-1])):
+                    bisect.insort(top, key, key=self._rank)
+                elif len(top) < settings.AUTOCOMPLETE_TOP_K:
+                    self.tops[key[:i]] = None
+            elif delta > 0 and self._rank(key) < self._rank(top[-1]):
+                bisect.insort(top, key, key=self._rank)
+                del top[self._stored():]
+
+
+def _terms(kind: str, values) -> list:
+    """[(kind, normalized key, label)], one per distinct key"""
+    out = {}
+    for value in values or []:
+        key = normalize(value)
+        if key and key not in out:
+            out[key] = (kind, key, " ".join(str(value).split()))
+    return list(out.values())
+
+
+def hackathon_key(hackathon_id: str, name: str) -> str:
+    return f"{normalize(name)}{_ID_SEP}{hackathon_id}"
+
+
+def _hackathon_entries(hackathon: dict) -> tuple:
+    """(entries, its key in "hackathons" or None)"""
+    entries = _terms("tags", hackathon.get('tags'))
+    name = " ".join(str(hackathon.get('name') or "").split())
+    if not name:
+        return entries, None
+    key = hackathon_key(hackathon['$id'], name)
+    return entries + [("hackathons", key, name)], key
+
+
+def _team_entries(team: dict, hackathon_key_of) -> list:
+    entries = _terms("skills", team.get('looking_for'))
+    key = hackathon_key_of(team.get('hackathon_id'))
+    if key:
+        entries.append(("hackathons", key, None))  # one more team registered for it
+    return entries
+
+
+class Autocomplete:
+    def __init__(self):
+        self.ready = False
+        self._vocabs = {kind: _Vocab() for kind in KINDS}
+        self._sources = {}  # "user:<id>" / "team:<id>" / "hackathon:<id>" -> ((kind, key, label), ...)
+        self._journal = None
+        self.stats = {"rebuilds": 0, "last_rebuild_ms": None, "queries": 0, "writes": 0}
+
+    # -- writes (called by the routes after a successful upstream write) --
+    def put_user(self, user_id: str, skills, tech_stack):
+        self._set(f"user:{user_id}", _terms("skills", (skills or []) + (tech_stack or [])))
+
+    def put_team(self, team: dict):
+        self._set(f"team:{team['$id']}", _team_entries(team, self._hackathon_key))
+
+    def drop_team(self, team_id: str):
+        self._set(f"team:{team_id}", ())
+
+    def put_hackathon(self, hackathon: dict):
+        """On creation (name and tags can't be updated afterwards)"""
+        entries, _ = _hackathon_entries(hackathon)
+        self._set(f"hackathon:{hackathon['$id']}", entries)
+
+    def _hackathon_key(self, hackathon_id: str):
+        for kind, key, _ in self._sources.get(f"hackathon:{hackathon_id}", ()):
+            if kind == "hackathons":
+                return key
+        return None
+
+    def _set(self, source: str, entries):
+        entries = tuple(entries)
+        if self._journal is not None:
+            self._journal.append((source, entries))
+        old = self._sources.pop(source, ())
+        if entries:
+            self._sources[source] = entries
+        for kind, key, label in old:
+            self._vocabs[kind].add(key, label, -1)
+        for kind, key, label in entries:
+            self._vocabs[kind].add(key, label, 1)
+        self.stats["writes"] += 1
+
+    # -- reads --
+    def complete(self, kind: str, prefix: str, limit: int = 8) -> list:
+        """[{"value", "count"(, "id")}] best first"""
+        vocab = self._vocabs[kind]
+        self.stats["queries"] += 1
+        out = []
+        for key in vocab.complete(normalize(prefix), min(limit, settings.AUTOCOMPLETE_TOP_K)):
+            item = {"value": vocab.labels[key], "count": vocab.weights[key]}
+            if kind == "hackathons":
+                item["id"] = key.rsplit(_ID_SEP, 1)[1]
+            out.append(item)
+        return out
+
+    # -- rebuild --
+    async def rebuild(self):
+        start = time.perf_counter()
+        self._journal = []
+
+        async def collect(collection, select):
+            docs = []
+            async for page in iter_documents(collection, [Query.select(select)]):
+                docs.extend(page)
+            return docs
+
+        try:
+            hackathons, teams, users = await asyncio.gather(
+                collect(settings.COLLECTION_HACKATHONS, ['$id', 'name', 'tags']),
+                collect(settings.COLLECTION_TEAMS, ['$id', 'hackathon_id', 'looking_for']),
+                collect(settings.COLLECTION_USERS, ['$id', 'skills', 'tech_stack']),
+            )
+            built = await asyncio.to_thread(self._build, hackathons, teams, users)
+        except Exception:
+            self._journal = None
+            raise
+
+        journal, self._journal = self._journal, None
+        self._vocabs, self._sources = built
+        # Route edits that landed while we were paging / building are newer than what we read
+        for source, entries in journal:
+            self._set(source, entries)
+
+        self.ready = True
+        self.stats["rebuilds"] += 1
+        self.stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    @staticmethod
+    def _build(hackathons: list, teams: list, users: list):
+        """Sources counted in bulk, then one sort and one top-list pass per kind"""
+        sources, hackathon_keys = {}, {}
+        for hackathon in hackathons:
+            entries, key = _hackathon_entries(hackathon)
+            if key:
+                hackathon_keys[hackathon['$id']] = key
+            sources[f"hackathon:{hackathon['$id']}"] = tuple(entries)
+        for team in teams:
+            sources[f"team:{team['$id']}"] = tuple(_team_entries(team, hackathon_keys.get))
+        for user in users:
+            sources[f"user:{user['$id']}"] = tuple(
+                _terms("skills", (user.get('skills') or []) + (user.get('tech_stack') or []))
+            )
+
+        vocabs = {kind: _Vocab() for kind in KINDS}
+        counts = {kind: Counter() for kind in KINDS}
+        for entries in sources.values():
+            for kind, key, label in entries:
+                counts[kind][key] += 1
+                if label is not None:
+                    vocabs[kind].labels.setdefault(key, label)
+        for kind, vocab in vocabs.items():
+            vocab.weights = dict(counts[kind])
+            vocab.keys = sorted(vocab.weights)
+            vocab.build_tops()
+        return vocabs, {source: entries for source, entries in sources.items() if entries}
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "terms": {kind: len(vocab.keys) for kind, vocab in self._vocabs.items()},
+            "heavy_prefixes": {kind: len(vocab.tops) for kind, vocab in self._vocabs.items()},
+            "sources": len(self._sources),
+            **self.stats,
+        }
+
+
+autocomplete = Autocomplete()
+
+
+async def maintain_autocomplete():
+    """Lifespan task: build the index at startup, then refresh it periodically"""
+    while True:
+        try:
+            await (autocomplete.rebuild() if autocomplete.ready else cold_build(autocomplete.rebuild))
+        except Exception as e:
+            print(f"⚠️ autocomplete rebuild failed: {e}")
+        await asyncio.sleep(settings.AUTOCOMPLETE_REFRESH_SECONDS if autocomplete.ready else 5)
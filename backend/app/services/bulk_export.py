@@ -0,0 +1,135 @@
+import asyncio
+import csv
+import io
+import json
+import zlib
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.services.appwrite import get_documents_by_ids, iter_documents
+from app.services.resilience import deadline_scope
+from app.utils.helpers import chunked
+
+# Streaming export of a hackathon's submissions for judges & sponsors.
+#
+# Pages through submissions with a cursor, and for each page (in parallel):
+#   - resolves team names in chunks of <= 100 IDs (Appwrite's Query.equal limit)
+#   - aggregates scores from COLLECTION_SCORES for the page's submissions
+# then writes the rows out immediately. The next page is prefetched while the
+# current one is enriched, and only one page is held in memory at a time.
+
+COLUMNS = [
+    "submission_id", "team_id", "team_name", "project_title", "description",
+    "repo_links", "demo_video_url", "created_at",
+    "score_count", "score_avg_total", "score_avg_technical", "score_avg_design", "score_avg_utility",
+]
+
+# Team names seen so far; bounded so a huge export can't grow it without limit
+_TEAM_NAME_CAP = 50000
+
+
+async def _aggregate_scores(submission_ids) -> dict:
+    totals = {}
+
+    async def fetch(chunk):
+        # Several judges per submission -> page within the chunk
+        async for page in iter_documents(
+            settings.COLLECTION_SCORES,
+            [Query.equal('submission_id', chunk),
+             Query.select(['$id', 'submission_id', 'total', 'technical', 'design', 'utility'])]
+        ):
+            for score in page:
+                agg = totals.setdefault(score['submission_id'], [0, 0, 0, 0, 0])
+                agg[0] += 1
+                agg[1] += score.get('total') or 0
+                agg[2] += score.get('technical') or 0
+                agg[3] += score.get('design') or 0
+                agg[4] += score.get('utility') or 0
+
+    await asyncio.gather(*[fetch(chunk) for chunk in chunked(submission_ids, 100)])
+    return totals
+
+
+def _row(sub: dict, team_names: dict, scores: dict) -> dict:
+    count, total, technical, design, utility = scores.get(sub['$id'], (0, 0, 0, 0, 0))
+    avg = lambda v: round(v / count, 2) if count else None
+    return {
+        "submission_id": sub['$id'],
+        "team_id": sub.get('team_id'),
+        "team_name": team_names.get(sub.get('team_id'), "Unknown Team"),
+        "project_title": sub.get('project_title'),
+        "description": sub.get('description'),
+        "repo_links": sub.get('repo_links') or [],
+        "demo_video_url": sub.get('demo_video_url'),
+        "created_at": sub.get('$createdAt'),
+        "score_count": count,
+        "score_avg_total": avg(total),
+        "score_avg_technical": avg(technical),
+        "score_avg_design": avg(design),
+        "score_avg_utility": avg(utility),
+    }
+
+
+def _encode(rows, fmt: str, header: bool) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(r, default=str) + "\n" for r in rows).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    if header:
+        writer.writeheader()
+    for r in rows:
+        writer.writerow({**r, "repo_links": "|".join(r["repo_links"])})
+    return out.getvalue().encode()
+
+
+async def _pages(hackathon_id: str, page_size: int):
+    """Submission pages with one page of read-ahead"""
+    pages = iter_documents(
+        settings.COLLECTION_SUBMISSIONS,
+        [Query.equal('hackathon_id', hackathon_id), Query.order_asc('$createdAt')],
+        page_size=page_size
+    )
+
+    def fetch_next():
+        # The task copies the context now: give the read-ahead its own fresh budget
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+            return asyncio.ensure_future(anext(pages, None))
+
+    pending = fetch_next()
+    try:
+        while (page := await pending) is not None:
+            pending = fetch_next()
+            yield page
+    finally:
+        pending.cancel()
+
+
+async def export_submissions(hackathon_id: str, fmt: str = "csv", gzip: bool = False, page_size: int = 100):
+    """Async generator of encoded (optionally gzipped) chunks, one per page"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None  # wbits=31 -> gzip container
+    team_names = {}
+    first = True  # CSV header goes out with the first page
+
+    async for page in _pages(hackathon_id, page_size):
+        # Fresh upstream budget per page - the request deadline would cut a long export short
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+            missing = {s['team_id'] for s in page if s.get('team_id') and s['team_id'] not in team_names}
+            teams, scores = await asyncio.gather(
+                get_documents_by_ids(settings.COLLECTION_TEAMS, missing, select=['$id', 'name']),
+                _aggregate_scores([s['$id'] for s in page])
+            )
+
+        if len(team_names) > _TEAM_NAME_CAP:
+            team_names.clear()
+        team_names.update({tid: t.get('name') for tid, t in teams.items()})
+
+        chunk = _encode([_row(s, team_names, scores) for s in page], fmt, header=first)
+        first = False
+        yield compressor.compress(chunk) if compressor else chunk
+
+    if first and fmt == "csv":
+        chunk = _encode([], fmt, header=True)  # no submissions: still a valid CSV
+        yield compressor.compress(chunk) if compressor else chunk
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,266 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import time
+from typing import AsyncIterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.hackathon import HackathonCreate
+from app.models.team import TeamCreate
+from app.models.user import UserRegister
+from app.services.appwrite import get_db_service, get_users_service
+from app.services.resilience import deadline_scope
+from app.utils.helpers import deterministic_id, is_conflict
+
+# Streaming bulk import (CSV / NDJSON) for organizers migrating from other platforms.
+#
+#   upload (spooled to disk) -> rows (incremental parse) -> pydantic validation
+#       -> batches of BULK_IMPORT_BATCH_SIZE written with BULK_IMPORT_CONCURRENCY
+#       -> one NDJSON result line per row, streamed back as each batch finishes
+#
+# Memory is bounded by one batch regardless of file size.
+#
+# Resumable: document IDs are derived from (import_id, row number), and a
+# checkpoint file records the highest row N such that rows 1..N are all done.
+# Re-uploading the same file with the same import_id skips rows <= N; rows
+# written just before a crash come back as 409 and are reported "exists".
+
+MODELS = {
+    "hackathons": HackathonCreate,
+    "teams": TeamCreate,
+    "users": UserRegister,
+}
+
+# CSV cells for these fields hold several values: "AI|Web3" or a JSON array
+LIST_FIELDS = {"tags", "members", "join_requests", "looking_for", "tech_stack"}
+
+
+# --- UPLOAD SPOOLING ---
+async def spool_upload(chunks: AsyncIterator[bytes]):
+    """Copy the request body into a temp file that stays in memory up to 1 MB"""
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    async for chunk in chunks:
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+async def iter_spooled(upload, chunk_size: int = 64 * 1024):
+    try:
+        while chunk := await asyncio.to_thread(upload.read, chunk_size):
+            yield chunk
+    finally:
+        upload.close()
+
+
+# --- PARSING ---
+async def _lines(chunks: AsyncIterator[bytes]):
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+def _csv_value(field: str, value: str):
+    if value == "":
+        return None
+    if field in LIST_FIELDS:
+        if value.startswith("["):
+            return json.loads(value)
+        return [v.strip() for v in value.split("|") if v.strip()]
+    return value
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], fmt: str):
+    """Yields (row_number, dict | parse error string). Row numbers start at 1 (header excluded)."""
+    row_number = 0
+    if fmt == "ndjson":
+        async for line in _lines(chunks):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"Invalid JSON: {e}"
+        return
+
+    header = None
+    pending = ""
+    async for line in _lines(chunks):
+        # A quoted cell may contain newlines: keep joining until quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        try:
+            yield row_number, {
+                field: value for field, value in
+                ((f, _csv_value(f, v)) for f, v in zip(header, values))
+                if value is not None
+            }
+        except json.JSONDecodeError as e:
+            yield row_number, f"Invalid JSON list: {e}"
+
+
+# --- CHECKPOINTS ---
+def _checkpoint_path(import_id: str) -> str:
+    safe = "".join(c for c in import_id if c.isalnum() or c in "-_")
+    return os.path.join(settings.BULK_IMPORT_DIR, f"{safe}.json")
+
+
+def load_checkpoint(import_id: str) -> Optional[dict]:
+    try:
+        with open(_checkpoint_path(import_id)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save_checkpoint(checkpoint: dict):
+    os.makedirs(settings.BULK_IMPORT_DIR, exist_ok=True)
+    path = _checkpoint_path(checkpoint["import_id"])
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)  # atomic: a crash never leaves a torn checkpoint
+
+
+# --- WRITERS ---
+def _create(collection_id: str, document_id: str, data: dict) -> str:
+    try:
+        get_db_service().create_document(
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=collection_id,
+            document_id=document_id,
+            data=data
+        )
+        return "created"
+    except Exception as e:
+        if is_conflict(e):
+            return "exists"
+        raise
+
+
+def _write_hackathon(doc_id: str, model: HackathonCreate) -> str:
+    return _create(settings.COLLECTION_HACKATHONS, doc_id, jsonable_encoder(model))
+
+
+def _write_team(doc_id: str, model: TeamCreate) -> str:
+    return _create(settings.COLLECTION_TEAMS, doc_id, model.to_document())
+
+
+def _write_user(doc_id: str, model: UserRegister) -> str:
+    users_service = get_users_service()
+    try:
+        users_service.create(user_id=doc_id, email=model.email, password=model.password, name=model.name)
+    except Exception as e:
+        if not is_conflict(e):
+            raise
+        # 409: either our own account from an earlier attempt, or the email is taken
+        try:
+            users_service.get(doc_id)
+        except Exception:
+            raise ValueError("Email already registered")
+    return _create(settings.COLLECTION_USERS, doc_id, model.profile_document(doc_id))
+
+
+WRITERS = {
+    "hackathons": _write_hackathon,
+    "teams": _write_team,
+    "users": _write_user,
+}
+
+
+# --- PIPELINE ---
+async def run_import(kind: str, fmt: str, chunks: AsyncIterator[bytes], import_id: str):
+    """Async generator of NDJSON lines (bytes): a header, one line per row, a summary."""
+    model_cls, writer = MODELS[kind], WRITERS[kind]
+    checkpoint = load_checkpoint(import_id) or {
+        "import_id": import_id, "kind": kind, "watermark": 0, "created_at": time.time()
+    }
+    if checkpoint["kind"] != kind:
+        yield _line({"error": f"import_id '{import_id}' belongs to a '{checkpoint['kind']}' import"})
+        return
+
+    resume_from = checkpoint["watermark"]
+    counts = {}  # this run only; rows re-attempted after a crash report "exists"
+    contiguous = True  # watermark only advances while every earlier row is done
+    semaphore = asyncio.Semaphore(settings.BULK_IMPORT_CONCURRENCY)
+    yield _line({"import_id": import_id, "kind": kind, "resume_from": resume_from})
+
+    async def write(row_number, model):
+        async with semaphore:
+            try:
+                status = await asyncio.to_thread(writer, deterministic_id(import_id, row_number), model)
+                return {"row": row_number, "status": status}
+            except Exception as e:
+                return {"row": row_number, "status": "failed", "error": str(e)}
+
+    async def flush(batch):
+        nonlocal contiguous
+        # Fresh budget per batch - the request-level deadline would cut a long import short
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS * 3, reset=True):
+            written = await asyncio.gather(*[write(n, m) for n, m, _ in batch if m is not None])
+        results = {r["row"]: r for r in written}
+        out = []
+        for row_number, _, error in batch:
+            result = results.get(row_number) or {"row": row_number, "status": "invalid", "errors": error}
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            if result["status"] == "failed":
+                contiguous = False
+            elif contiguous:
+                checkpoint["watermark"] = row_number
+            out.append(result)
+        checkpoint["counts"] = counts
+        checkpoint["updated_at"] = time.time()
+        await asyncio.to_thread(_save_checkpoint, checkpoint)
+        return out
+
+    batch = []
+    async for row_number, row in iter_rows(chunks, fmt):
+        if row_number <= resume_from:
+            continue
+        if isinstance(row, str):
+            batch.append((row_number, None, [row]))
+        else:
+            try:
+                batch.append((row_number, model_cls.model_validate(row), None))
+            except ValidationError as e:
+                batch.append((row_number, None, [
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ]))
+
+        if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+            for result in await flush(batch):
+                yield _line(result)
+            batch = []
+
+    if batch:
+        for result in await flush(batch):
+            yield _line(result)
+
+    yield _line({"done": True, "import_id": import_id, "watermark": checkpoint["watermark"], "counts": counts})
+
+
+def _line(obj: dict) -> bytes:
+    return (json.dumps(obj, default=str) + "\n").encode()
@@ -0,0 +1,463 @@
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+
+# Cache layer shared by all routes/services.
+#
+#   cache = get_cache()
+#   doc = await cache.get_or_set("hackathon", hackathon_id, load_fn, ttl=30)
+#   cache.invalidate("hackathon")            # drops the whole namespace
+#   await cache.warm("hackathon", hackathon_id, load_fn, ttl=30)  # ahead of demand (services/warmer.py)
+#
+# Backends are interchangeable (CACHE_BACKEND in .env):
+#   memory  -> per-process LRU (default, fastest, duplicated per worker)
+#   sqlite  -> one file shared by every worker on the host (WAL mode)
+#   network -> local stand-in for a networked cache (Redis/Memcached-like
+#              semantics + simulated round-trip), for testing scale-out behaviour
+
+_MISSING = object()
+
+
+# --- BACKENDS ---
+class CacheBackend:
+    """Byte store with TTLs. Every method must be thread-safe (called via asyncio.to_thread)."""
+    name = "base"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set only if absent (used for cross-worker stampede locks)"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def counter(self, key: str) -> int:
+        """Counters live outside the LRU so they are never evicted"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU bounded by entry count"""
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] and entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key, value, ttl):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (not entry[0] or entry[0] >= time.monotonic()):
+                return False
+            self.set(key, value, ttl)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            n = self._counters.get(key, 0) + 1
+            self._counters[key] = n
+            return n
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    One SQLite file per host, shared by all uvicorn/gunicorn workers.
+    WAL mode lets readers run concurrently with a single writer.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads -> one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] and row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl):
+        expires_at = time.time() + ttl if ttl else 0
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, value, expires_at),
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._prune(conn)
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        conn = self._conn()
+        # Replace only if missing or expired - a single statement, so atomic across workers
+        cur = conn.execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at != 0 AND cache.expires_at < ?",
+            (key, value, now + ttl if ttl else 0, now),
+        )
+        return cur.rowcount == 1
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key):
+        row = self._conn().execute(
+            "INSERT INTO counters (key, n) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET n = n + 1 RETURNING n",
+            (key,),
+        ).fetchone()
+        return row[0]
+
+    def counter(self, key):
+        row = self._conn().execute("SELECT n FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache")
+        conn.execute("DELETE FROM counters")
+
+    def _prune(self, conn):
+        conn.execute("DELETE FROM cache WHERE expires_at != 0 AND expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY rowid ASC LIMIT max(0, (SELECT count(*) FROM cache) - ?))",
+            (self.max_entries,),
+        )
+
+
+class NetworkBackend(CacheBackend):
+    """
+    Local stand-in for a networked cache: every call pays a simulated round-trip
+    and values cross a serialization boundary, like they would over a socket.
+    Use it to see how hit rates / latency behave before wiring up Redis.
+    """
+    name = "network"
+
+    def __init__(self, latency_ms: float = 1.0, max_entries: int = 100000):
+        self.latency = latency_ms / 1000
+        self._server = MemoryBackend(max_entries)
+
+    def _rtt(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, key):
+        self._rtt()
+        value = self._server.get(key)
+        return bytes(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._rtt()
+        self._server.set(key, bytes(value), ttl)
+
+    def add(self, key, value, ttl):
+        self._rtt()
+        return self._server.add(key, bytes(value), ttl)
+
+    def delete(self, key):
+        self._rtt()
+        self._server.delete(key)
+
+    def incr(self, key):
+        self._rtt()
+        return self._server.incr(key)
+
+    def counter(self, key):
+        self._rtt()
+        return self._server.counter(key)
+
+    def clear(self):
+        self._server.clear()
+
+
+# --- CACHE FACADE ---
+class Cache:
+    """
+    Namespaced cache with TTLs, stampede protection and per-namespace stats.
+
+    Invalidation uses a generation counter per namespace: invalidate(ns) bumps
+    it, so every old key becomes unreachable at once (and ages out via LRU/TTL).
+    """
+
+    def __init__(self, backend: CacheBackend, default_ttl: float = 60, lock_ttl: float = 10):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.lock_ttl = lock_ttl
+        self._locks = {}  # (namespace, key) -> [asyncio.Lock, callers holding or waiting on it]
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._warmed = OrderedDict()  # (namespace, key) loaded by warm() and not reloaded on demand since
+        self._max_warmed = settings.CACHE_MAX_ENTRIES
+
+    @property
+    def shared(self) -> bool:
+        """Every worker on the host sees the same entries (and the same deletes)"""
+        return not isinstance(self.backend, MemoryBackend)
+
+    # -- keys --
+    def _key(self, namespace: str, key: str) -> str:
+        gen = self.backend.counter(f"__gen__:{namespace}")
+        return f"{namespace}:{gen}:{key}"
+
+    # -- sync API (safe to call from worker threads) --
+    def get(self, namespace: str, key: str, default=None):
+        raw = self.backend.get(self._key(namespace, key))
+        if raw is None:
+            self._stats[namespace]["misses"] += 1
+            return default
+        self._stats[namespace]["hits"] += 1
+        if (namespace, key) in self._warmed:
+            self._stats[namespace]["warm_hits"] += 1
+        return pickle.loads(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        self.backend.set(
+            self._key(namespace, key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            self.default_ttl if ttl is None else ttl,
+        )
+        self._stats[namespace]["sets"] += 1
+
+    def add(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if absent; True if this call stored the value (atomic on every backend)"""
+        added = self.backend.add(
+            self._key(namespace, key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            self.default_ttl if ttl is None else ttl,
+        )
+        if added:
+            self._stats[namespace]["sets"] += 1
+        return added
+
+    def delete(self, namespace: str, key: str):
+        self.backend.delete(self._key(namespace, key))
+        self._warmed.pop((namespace, key), None)
+        self._stats[namespace]["deletes"] += 1
+
+    def invalidate(self, namespace: str):
+        self.backend.incr(f"__gen__:{namespace}")
+        self._stats[namespace]["invalidations"] += 1
+
+    # -- async read-through with stampede protection --
+    async def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ):
+        """
+        Returns the cached value or awaits loader() exactly once per key:
+        - concurrent callers in this worker wait on an asyncio.Lock
+        - other workers (shared backends) wait on a short-lived lock key
+        """
+        value = await asyncio.to_thread(self._get_raw, namespace, key)
+        if value is not _MISSING:
+            return value
+
+        lock_id = (namespace, key)
+        entry = self._locks.get(lock_id)
+        if entry is None:
+            entry = self._locks[lock_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            async with entry[0]:
+                value = await asyncio.to_thread(self._get_raw, namespace, key, False)
+                if value is not _MISSING:
+                    self._stats[namespace]["coalesced"] += 1
+                    return value
+
+                if isinstance(self.backend, MemoryBackend):
+                    return await self._load(namespace, key, loader, ttl)
+
+                # Shared backend: only one worker on the host loads
+                lock_key = f"__lock__:{self._key(namespace, key)}"
+                if await asyncio.to_thread(self.backend.add, lock_key, b"1", self.lock_ttl):
+                    try:
+                        return await self._load(namespace, key, loader, ttl)
+                    finally:
+                        await asyncio.to_thread(self.backend.delete, lock_key)
+
+                deadline = time.monotonic() + self.lock_ttl
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.02)
+                    value = await asyncio.to_thread(self._get_raw, namespace, key, False)
+                    if value is not _MISSING:
+                        self._stats[namespace]["coalesced"] += 1
+                        return value
+                # Lock holder died or is too slow - load it ourselves
+                return await self._load(namespace, key, loader, ttl)
+        finally:
+            # Drop the lock only once nobody holds or waits on it: a waiter
+            # queued on a dropped lock would run alongside a fresh one
+            entry[1] -= 1
+            if not entry[1]:
+                self._locks.pop(lock_id, None)
+
+    async def _load(self, namespace, key, loader, ttl):
+        self._stats[namespace]["loads"] += 1
+        value = await loader()
+        await asyncio.to_thread(self.set, namespace, key, value, ttl)
+        self._warmed.pop((namespace, key), None)
+        return value
+
+    # -- pre-warming --
+    async def warm(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        refresh: bool = True,
+        claim_ttl: float = 0,
+    ):
+        """
+        Load a value ahead of demand. Returns the value, or None when skipped:
+        - refresh=False skips keys that are already cached
+        - claim_ttl > 0 lets only one worker warm the key per claim_ttl seconds (shared backends)
+        Later hits on the entry count as "warm_hits".
+        """
+        if not refresh and await asyncio.to_thread(self.backend.get, self._key(namespace, key)) is not None:
+            return None
+        if claim_ttl and not isinstance(self.backend, MemoryBackend):
+            claim = f"__warm__:{self._key(namespace, key)}"
+            if not await asyncio.to_thread(self.backend.add, claim, b"1", claim_ttl):
+                return None
+        value = await loader()
+        await asyncio.to_thread(self.set, namespace, key, value, ttl)
+        self._warmed[(namespace, key)] = None
+        self._warmed.move_to_end((namespace, key))
+        while len(self._warmed) > self._max_warmed:
+            self._warmed.popitem(last=False)
+        self._stats[namespace]["warmed"] += 1
+        return value
+
+    def _get_raw(self, namespace, key, count=True):
+        raw = self.backend.get(self._key(namespace, key))
+        if raw is None:
+            if count:
+                self._stats[namespace]["misses"] += 1
+            return _MISSING
+        if count:
+            self._stats[namespace]["hits"] += 1
+            if (namespace, key) in self._warmed:
+                self._stats[namespace]["warm_hits"] += 1
+        return pickle.loads(raw)
+
+    # -- stats --
+    def stats(self) -> dict:
+        namespaces = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else None,
+            }
+            if counters.get("warmed"):
+                # Share of lookups answered by an entry the warmer loaded
+                namespaces[namespace]["warm_hit_ratio"] = round(counters.get("warm_hits", 0) / lookups, 4) if lookups else None
+        return {"backend": self.backend.name, "pid": os.getpid(), "namespaces": namespaces}
+
+
+def build_backend(kind: str, path: Optional[str] = None, max_entries: Optional[int] = None) -> CacheBackend:
+    max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+    if kind == "sqlite":
+        return SQLiteBackend(path or settings.CACHE_PATH, max_entries)
+    if kind == "network":
+        return NetworkBackend(settings.CACHE_NETWORK_LATENCY_MS, max_entries)
+    return MemoryBackend(max_entries)
+
+
+@lru_cache()
+def get_cache() -> Cache:
+    return Cache(build_backend(settings.CACHE_BACKEND), default_ttl=settings.CACHE_DEFAULT_TTL)
+
+
+@lru_cache()
+def get_idempotency_cache() -> Cache:
+    """
+    Idempotency-Key records on the same backend kind as get_cache(), but in their
+    own store (IDEMPOTENCY_CACHE_PATH, IDEMPOTENCY_MAX_ENTRIES): hot read entries
+    never evict a stored response before IDEMPOTENCY_TTL_SECONDS.
+    """
+    backend = build_backend(settings.CACHE_BACKEND, settings.IDEMPOTENCY_CACHE_PATH, settings.IDEMPOTENCY_MAX_ENTRIES)
+    return Cache(backend, default_ttl=settings.IDEMPOTENCY_TTL_SECONDS)
@@ -0,0 +1,305 @@
+import asyncio
+import base64
+import bisect
+import hashlib
+import heapq
+import json
+import math
+import time
+from collections import OrderedDict
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.services.appwrite import get_db_service
+from app.services.membership import index as membership
+from app.services.skill_index import index as skill_index
+
+# Swipe deck for the Team Finder lobby (/api/teams/lobby).
+#
+# For a team leader, candidates are ranked by how well they complement the
+# team, from the skill index (services/skill_index.py):
+#   score = 10 x roles of `looking_for` they fill + up to 5 skills the team doesn't have yet
+# The top DECK_SIZE candidates of a team are computed once and kept (LRU of
+# DECK_MAX_TEAMS decks). They refresh incrementally:
+#   - a candidate's profile change re-scores just that user in every kept deck
+#   - a change to the team itself, or a member's skills, rebuilds that deck
+#   - a skill index rebuild invalidates every deck
+# Swiped and already-teamed candidates are skipped when cards are served. Once
+# a page comes up short, or more than half the deck is skipped, the deck is
+# rebuilt with those candidates left out (refill). That repeats until every
+# candidate with a positive score has been ranked.
+#
+# Swiped candidates go into a per-leader Bloom filter: ~1.2 KB per 1000 swipes at
+# a 1% false-positive rate, stored on the leader's user document (`deck_seen`,
+# JSON) so every worker and host reads the same one and nothing evicts it. A
+# false positive only hides a card. The filter starts over DECK_SEEN_TTL_SECONDS
+# after its first swipe. Swipes are serialized per leader within a worker; two
+# swipes by the same leader landing on different workers within one round trip
+# can drop one of them (that card comes back once).
+
+
+SCORE_PER_ROLE = 10
+MAX_BREADTH = 5
+
+
+class BloomFilter:
+    """
+    Scalable Bloom filter: when a layer is full a new one is added, twice the
+    size with half the error rate, so the overall rate stays below error_rate.
+    """
+
+    def __init__(self, capacity: int = 1000, error_rate: float = 0.01, layers=None, created_at: float = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.layers = layers or []  # [bits: bytearray, m bits, k hashes, items, layer capacity]
+        self.created_at = time.time() if created_at is None else created_at
+
+    def _add_layer(self):
+        i = len(self.layers)
+        capacity = self.capacity * (2 ** i)
+        p = self.error_rate * (0.5 ** (i + 1))
+        m = math.ceil(-capacity * math.log(p) / (math.log(2) ** 2))
+        k = max(1, round(m / capacity * math.log(2)))
+        self.layers.append([bytearray((m + 7) // 8), m, k, 0, capacity])
+
+    @staticmethod
+    def _hashes(item: str):
+        # Double hashing (Kirsch-Mitzenmacher) over one 128-bit digest, shared by all layers
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def _contains(self, h1: int, h2: int) -> bool:
+        for bits, m, k, _, _ in self.layers:
+            for i in range(k):
+                pos = (h1 + i * h2) % m
+                if not bits[pos >> 3] & (1 << (pos & 7)):
+                    break
+            else:
+                return True
+        return False
+
+    def __contains__(self, item: str) -> bool:
+        return self._contains(*self._hashes(item))
+
+    def add(self, item: str) -> bool:
+        """False if the item was (probably) there already"""
+        h1, h2 = self._hashes(item)
+        if self._contains(h1, h2):
+            return False
+        if not self.layers or self.layers[-1][3] >= self.layers[-1][4]:
+            self._add_layer()
+        layer = self.layers[-1]
+        bits, m, k = layer[0], layer[1], layer[2]
+        for i in range(k):
+            pos = (h1 + i * h2) % m
+            bits[pos >> 3] |= 1 << (pos & 7)
+        layer[3] += 1
+        return True
+
+    def __len__(self):
+        return sum(layer[3] for layer in self.layers)
+
+    def nbytes(self) -> int:
+        return sum(len(layer[0]) for layer in self.layers)
+
+    # JSON (bit arrays base64) for the user document's deck_seen attribute
+    def dumps(self) -> str:
+        return json.dumps({
+            "capacity": self.capacity, "error_rate": self.error_rate, "created_at": self.created_at,
+            "layers": [[base64.b64encode(bits).decode(), m, k, n, cap] for bits, m, k, n, cap in self.layers],
+        }, separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, raw: str) -> "BloomFilter":
+        state = json.loads(raw)
+        layers = [[bytearray(base64.b64decode(bits)), m, k, n, cap] for bits, m, k, n, cap in state["layers"]]
+        return cls(state["capacity"], state["error_rate"], layers, state["created_at"])
+
+
+class _Deck:
+    __slots__ = ("entry", "generation", "team_skills", "ranked", "scores", "complete")
+
+    def __init__(self, entry: dict, generation: int, team_skills: frozenset):
+        self.entry = entry
+        self.generation = generation
+        self.team_skills = team_skills
+        self.ranked = []  # sorted [(-score, user_id)]
+        self.scores = {}  # user_id -> score, for every user in ranked
+        self.complete = False  # ranked holds every candidate with a positive score (nothing left to refill)
+
+
+class DeckService:
+    def __init__(self):
+        self._decks = OrderedDict()  # team_id -> _Deck
+        self.stats = {
+            "builds": 0, "last_build_ms": None, "refills": 0, "rescored": 0, "invalidated": 0,
+            "served": 0, "skipped_seen": 0, "likes": 0, "passes": 0,
+        }
+
+    def _team_skills(self, entry: dict) -> frozenset:
+        skills = set()
+        for uid in entry["members"]:
+            skills |= skill_index.skills_of(uid) or frozenset()
+        return frozenset(skills)
+
+    @staticmethod
+    def _score(deck: _Deck, user_id: str, skills: frozenset) -> int:
+        entry = deck.entry
+        if user_id in entry["members"] or user_id in entry["requests"] or not skills:
+            return 0
+        roles, team_skills = entry["roles"], deck.team_skills
+        fills = sum(1 for skill in skills if skill in roles)
+        breadth = sum(1 for skill in skills if skill not in roles and skill not in team_skills)
+        return fills * SCORE_PER_ROLE + min(breadth, MAX_BREADTH)
+
+    def _build(self, entry: dict, skip=None) -> _Deck:
+        """Top DECK_SIZE candidates; `skip(user_id)` leaves out ones already served (refill)"""
+        start = time.perf_counter()
+        deck = _Deck(entry, skill_index.generation, self._team_skills(entry))
+        # Anyone filling a role outscores everyone who doesn't: start from the role postings
+        fillers = set()
+        for role in entry["roles"]:
+            fillers.update(skill_index.users_with(role))
+        scored = [(-self._score(deck, uid, skill_index.skills_of(uid)), uid) for uid in fillers]
+        scored = [s for s in scored if s[0] < 0 and not (skip and skip(s[1]))]
+        if len(scored) < settings.DECK_SIZE:
+            # Not enough role fillers: rank everyone on breadth too
+            scored = (
+                s for s in ((-self._score(deck, uid, skills), uid) for uid, skills in skill_index.users())
+                if s[0] < 0 and not (skip and skip(s[1]))
+            )
+        deck.ranked = heapq.nsmallest(settings.DECK_SIZE, scored)  # already sorted
+        deck.scores = {uid: -neg_score for neg_score, uid in deck.ranked}
+        deck.complete = len(deck.ranked) < settings.DECK_SIZE
+        self.stats["builds"] += 1
+        self.stats["last_build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return deck
+
+    def deck(self, team_id: str):
+        """The team's kept deck, rebuilt if the team or the index changed; None for an unknown team"""
+        entry = skill_index.team(team_id)
+        if entry is None:
+            self._decks.pop(team_id, None)
+            return None
+        deck = self._decks.get(team_id)
+        if deck is None or deck.entry is not entry or deck.generation != skill_index.generation:
+            deck = self._decks[team_id] = self._build(entry)
+            if len(self._decks) > settings.DECK_MAX_TEAMS:
+                self._decks.popitem(last=False)
+        self._decks.move_to_end(team_id)
+        return deck
+
+    def on_user_change(self, user_id: str):
+        """Skill index listener: re-score one user in every kept deck"""
+        skills = skill_index.skills_of(user_id) or frozenset()
+        for team_id, deck in list(self._decks.items()):
+            if user_id in deck.entry["members"]:
+                # The team's own skills changed: every score moves
+                del self._decks[team_id]
+                self.stats["invalidated"] += 1
+                continue
+            old = deck.scores.pop(user_id, None)
+            if old is not None:
+                del deck.ranked[bisect.bisect_left(deck.ranked, (-old, user_id))]
+            score = self._score(deck, user_id, skills)
+            if score > 0 and (len(deck.ranked) < settings.DECK_SIZE or (-score, user_id) < deck.ranked[-1]):
+                bisect.insort(deck.ranked, (-score, user_id))
+                deck.scores[user_id] = score
+                if len(deck.ranked) > settings.DECK_SIZE:
+                    _, dropped = deck.ranked.pop()
+                    del deck.scores[dropped]
+            self.stats["rescored"] += 1
+
+    def next_cards(self, team_id: str, seen: BloomFilter, limit: int) -> list:
+        """Up to `limit` best candidates not swiped yet and not already in a team of this hackathon"""
+        deck = self.deck(team_id)
+        if deck is None:
+            return []
+        hackathon_id = deck.entry["hackathon_id"]
+
+        def served(uid: str) -> bool:
+            return f"{team_id}:{uid}" in seen or hackathon_id in membership.hackathons_of(uid)
+
+        cards, skipped = self._walk(deck, served, limit)
+        if not deck.complete and (len(cards) < limit or skipped > len(deck.ranked) // 2):
+            # Running low on unseen candidates: rank the next DECK_SIZE past the served ones
+            deck = self._decks[team_id] = self._build(deck.entry, skip=served)
+            self.stats["refills"] += 1
+            cards, _ = self._walk(deck, served, limit)
+        self.stats["served"] += len(cards)
+        return cards
+
+    def _walk(self, deck: _Deck, served, limit: int):
+        """(cards, candidates skipped) from the top of the deck"""
+        cards, skipped = [], 0
+        for neg_score, uid in deck.ranked:
+            if served(uid):
+                skipped += 1
+                continue
+            skills = skill_index.skills_of(uid) or frozenset()
+            cards.append({
+                "user_id": uid,
+                "score": -neg_score,
+                "fills": sorted(label for role, label in deck.entry["roles"].items() if role in skills),
+                "adds": sorted(s for s in skills if s not in deck.entry["roles"] and s not in deck.team_skills)[:MAX_BREADTH],
+            })
+            if len(cards) >= limit:
+                break
+        self.stats["skipped_seen"] += skipped
+        return cards, skipped
+
+    def size(self, team_id: str) -> int:
+        deck = self._decks.get(team_id)
+        return len(deck.ranked) if deck else 0
+
+    def snapshot(self) -> dict:
+        return {"decks": len(self._decks), "deck_size": settings.DECK_SIZE, **self.stats}
+
+
+deck = DeckService()
+skill_index.on_user_change(deck.on_user_change)
+
+_seen_locks = {}
+
+
+def seen_lock(viewer_id: str) -> asyncio.Lock:
+    """Serializes read-modify-write of one viewer's filter within this worker"""
+    lock = _seen_locks.get(viewer_id)
+    if lock is None:
+        if len(_seen_locks) > settings.DECK_MAX_TEAMS:
+            for key in [k for k, v in _seen_locks.items() if not v.locked()]:
+                del _seen_locks[key]
+        lock = _seen_locks[viewer_id] = asyncio.Lock()
+    return lock
+
+
+async def load_seen(viewer_id: str) -> BloomFilter:
+    """The viewer's swipe filter from their user document (empty if none yet, or expired)"""
+    try:
+        user = await asyncio.to_thread(
+            get_db_service().get_document,
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=settings.COLLECTION_USERS,
+            document_id=viewer_id,
+            queries=[Query.select(['$id', 'deck_seen'])]
+        )
+    except Exception as e:
+        if getattr(e, "code", None) != 404:
+            raise
+        user = {}
+    if user.get('deck_seen'):
+        seen = BloomFilter.loads(user['deck_seen'])
+        if time.time() - seen.created_at < settings.DECK_SEEN_TTL_SECONDS:
+            return seen
+    return BloomFilter(settings.DECK_SEEN_CAPACITY, settings.DECK_SEEN_ERROR_RATE)
+
+
+async def save_seen(viewer_id: str, seen: BloomFilter):
+    await asyncio.to_thread(
+        get_db_service().update_document,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_USERS,
+        document_id=viewer_id,
+        data={'deck_seen': seen.dumps()}
+    )
@@ -1,22 +1,177 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.core.startup import lazy_import
+from app.services.cache import get_cache
+
 load_dotenv()
 
+# Streaming summaries (POST /api/ai/summarize, GET /api/ai/hackathons/{id}/summary).
+#
+# The Gemini SDK is synchronous: with stream=True it returns an iterator that
+# blocks until the next chunk arrives. A producer thread pulls the chunks and
+# hands each one to the event loop, which forwards it as an SSE event right
+# away - the client sees the first words after the model's first chunk, not
+# after the whole answer.
+#
+# Cancellation: when the client disconnects Starlette cancels the response
+# generator, which sets `stop`; the producer sees it as soon as its current
+# chunk returns and closes the iterator, dropping the upstream stream.
+# A stream that ran to the end is cached under sha256(description) for
+# AI_SUMMARY_TTL_SECONDS, so the next request for it replays in one event.
+#
+# Streams are long-lived, so they get their own pool of AI_MAX_STREAMS threads
+# (they would otherwise hold asyncio's small default pool) and a request beyond
+# that gets 503. AI_SUMMARY_PROVIDER=stub swaps Gemini for a local generator.
+
+SUMMARY_NS = "ai_summary"
+_PROMPT = "Summarize this hackathon description in 2 exciting sentences for students: {text}"
+_DONE = object()
+
+
 def get_gemini_summary(text: str):
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         return "⚠️ AI Error: GEMINI_API_KEY is missing in .env"
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
-        # Simple Prompt Engineering
-        prompt = f"Summarize this hackathon description in 2 exciting sentences for students: {text}"
-        
-        response = model.generate_content(prompt)
+        response = _model(api_key).generate_content(_PROMPT.format(text=text))
         return response.text
     except Exception as e:
-        return f"AI Error: {str(e)}"
\ No newline at end of file
+        return f"AI Error: {str(e)}"
+
+
+def _model(api_key: str):
+    # Lazy: google.generativeai (+ grpc/protobuf) is only imported on first AI call
+    genai = lazy_import("google.generativeai")
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(settings.GEMINI_MODEL)
+
+
+def summary_key(text: str) -> str:
+    """Cache key of a description; whitespace differences don't matter"""
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()
+
+
+def provider_error():
+    """Why summaries can't be generated right now, or None"""
+    if settings.AI_SUMMARY_PROVIDER == "gemini" and not os.getenv("GEMINI_API_KEY"):
+        return "GEMINI_API_KEY is missing in .env"
+    return None
+
+
+def _gemini_chunks(text: str):
+    for chunk in _model(os.getenv("GEMINI_API_KEY")).generate_content(_PROMPT.format(text=text), stream=True):
+        if chunk.text:
+            yield chunk.text
+
+
+def _stub_chunks(text: str):
+    """Local stand-in for Gemini: the description's first words, one every AI_STUB_TOKEN_MS"""
+    for word in text.split()[:settings.AI_STUB_TOKENS]:
+        time.sleep(settings.AI_STUB_TOKEN_MS / 1000)
+        yield word + " "
+
+
+@lru_cache()
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=settings.AI_MAX_STREAMS, thread_name_prefix="ai-stream")
+
+
+def _event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _produce(chunks, loop, queue, stop: threading.Event):
+    """Producer thread: chunk -> queue until the end, an error, or `stop`"""
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # loop closed (shutdown)
+
+    try:
+        for part in chunks:
+            if stop.is_set():
+                break
+            put(part)
+        put(_DONE)
+    except Exception as e:
+        put(e)
+    finally:
+        chunks.close()
+
+
+class SummaryStreamer:
+    def __init__(self):
+        self.active = 0
+        self.stats = {
+            "streams": 0, "cache_hits": 0, "completed": 0, "cancelled": 0, "errors": 0, "rejected": 0,
+            "last_ttfb_ms": None, "last_stream_ms": None,
+        }
+
+    def saturated(self) -> bool:
+        if self.active >= settings.AI_MAX_STREAMS:
+            self.stats["rejected"] += 1
+            return True
+        return False
+
+    async def cached(self, text: str):
+        return await asyncio.to_thread(get_cache().get, SUMMARY_NS, summary_key(text))
+
+    async def stream(self, text: str, cached: str = None):
+        """SSE frames for the summary of `text`: "token" events, then "done" (or "error")"""
+        start = time.perf_counter()
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            yield _event("token", {"text": cached})
+            yield _event("done", {"cached": True, "ms": round((time.perf_counter() - start) * 1000, 1)})
+            return
+
+        loop, queue, stop = asyncio.get_running_loop(), asyncio.Queue(), threading.Event()
+        chunks = _stub_chunks(text) if settings.AI_SUMMARY_PROVIDER == "stub" else _gemini_chunks(text)
+        self.active += 1
+        self.stats["streams"] += 1
+        parts = []
+        try:
+            loop.run_in_executor(_executor(), _produce, chunks, loop, queue, stop)
+            while True:
+                part = await queue.get()
+                if part is _DONE:
+                    break
+                if isinstance(part, Exception):
+                    self.stats["errors"] += 1
+                    yield _event("error", {"detail": str(part)})
+                    return
+                if not parts:
+                    self.stats["last_ttfb_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                parts.append(part)
+                yield _event("token", {"text": part})
+        except (asyncio.CancelledError, GeneratorExit):
+            self.stats["cancelled"] += 1  # client went away: don't cache a partial summary
+            raise
+        finally:
+            stop.set()
+            self.active -= 1
+
+        summary = "".join(parts)
+        if summary:
+            await asyncio.to_thread(get_cache().set, SUMMARY_NS, summary_key(text), summary, settings.AI_SUMMARY_TTL_SECONDS)
+        self.stats["completed"] += 1
+        self.stats["last_stream_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        yield _event("done", {"cached": False, "ms": self.stats["last_stream_ms"]})
+
+    def snapshot(self) -> dict:
+        return {"provider": settings.AI_SUMMARY_PROVIDER, "active": self.active, "max_streams": settings.AI_MAX_STREAMS, **self.stats}
+
+
+streamer = SummaryStreamer()
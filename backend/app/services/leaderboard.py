@@ -0,0 +1,192 @@
+import asyncio
+import time
+from bisect import bisect_left, insort
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import iter_documents
+from app.services.reputation import engine
+
+# Global XP leaderboard: an order-statistics structure in memory.
+#
+# Users are ordered by xp desc, then reputation_score desc, then user ID.
+#   - one bucket per xp value (xp above LEADERBOARD_MAX_XP shares the top bucket),
+#     bucket 0 = highest xp so that rank order == bucket order
+#   - a Fenwick tree of bucket sizes: "how many users rank above bucket b" and
+#     "which bucket holds rank r" are both O(log MAX_XP)
+#   - inside a bucket, a sorted list of (-xp, -reputation, user_id) keys
+#
+# rank / top-N / around-me are O(log n + page); an update is O(log n) plus a
+# list insert in its bucket. Built from COLLECTION_USERS, plus the changes the
+# reputation engine hasn't written back yet; every worker then applies the
+# changes its host's event log records as they are folded. XP earned through
+# other hosts shows up at the next rebuild (LEADERBOARD_REFRESH_SECONDS).
+
+
+class Leaderboard:
+    def __init__(self, max_xp: int):
+        self.max_xp = max_xp
+        self.size = max_xp + 1
+        self._tree = [0] * (self.size + 1)  # 1-based Fenwick tree over buckets
+        self._buckets = {}  # bucket -> sorted [(-xp, -rep, user_id)]
+        self._keys = {}  # user_id -> its key
+        self._top_bit = 1 << (self.size.bit_length() - 1)
+        self.ready = False
+        self.stats = {"rebuilds": 0, "last_rebuild_ms": None, "updates": 0}
+
+    def __len__(self):
+        return len(self._keys)
+
+    # -- Fenwick tree --
+    def _bucket(self, xp: int) -> int:
+        return self.max_xp - min(max(xp, 0), self.max_xp)
+
+    def _add(self, bucket: int, delta: int):
+        i = bucket + 1
+        tree, size = self._tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def _above(self, bucket: int) -> int:
+        """Users in buckets < bucket"""
+        total, i, tree = 0, bucket, self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, rank: int):
+        """(bucket, users above it) for the bucket holding 1-based `rank`"""
+        pos, remaining, step, tree, size = 0, rank, self._top_bit, self._tree, self.size
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] < remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return pos, rank - remaining  # pos is the 0-based bucket
+
+    # -- updates --
+    def update(self, user_id: str, xp: int, reputation: float):
+        key = (-int(xp), -round(reputation, 2), user_id)
+        old = self._keys.get(user_id)
+        if old == key:
+            return
+        if old is not None:
+            self._discard(old)
+        bucket = self._bucket(-key[0])
+        insort(self._buckets.setdefault(bucket, []), key)
+        self._add(bucket, 1)
+        self._keys[user_id] = key
+        self.stats["updates"] += 1
+
+    def add_many(self, changes: dict):
+        """Reputation engine listener: {user_id: (xp change, reputation change)}, floored at 0 like the documents"""
+        for user_id, (xp, reputation) in changes.items():
+            key = self._keys.get(user_id)
+            if key is not None:
+                xp, reputation = xp - key[0], reputation - key[1]
+            self.update(user_id, max(0, xp), max(0.0, reputation))
+
+    def remove(self, user_id: str):
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            self._discard(key)
+
+    def _discard(self, key):
+        bucket = self._bucket(-key[0])
+        entries = self._buckets[bucket]
+        del entries[bisect_left(entries, key)]
+        if not entries:
+            del self._buckets[bucket]
+        self._add(bucket, -1)
+
+    def load(self, users):
+        self.install(self.build(users))
+
+    def build(self, users):
+        """Bulk build from (user_id, xp, reputation): one sort + O(buckets) tree construction"""
+        keys = {uid: (-int(xp or 0), -round(rep or 0.0, 2), uid) for uid, xp, rep in users}
+        buckets = {}
+        for key in sorted(keys.values()):
+            buckets.setdefault(self._bucket(-key[0]), []).append(key)
+        tree = [0] * (self.size + 1)
+        for bucket, entries in buckets.items():
+            tree[bucket + 1] = len(entries)
+        for i in range(1, self.size + 1):  # linear-time Fenwick construction
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        return keys, buckets, tree
+
+    def install(self, state):
+        """Swap in a built state (call on the event loop, never concurrently with reads)"""
+        self._keys, self._buckets, self._tree = state
+
+    # -- queries --
+    def rank(self, user_id: str):
+        """1-based rank, None if unknown"""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        bucket = self._bucket(-key[0])
+        return self._above(bucket) + bisect_left(self._buckets[bucket], key) + 1
+
+    def page(self, offset: int, limit: int) -> list:
+        """Entries at ranks offset+1 .. offset+limit: [{"rank", "user_id", "xp", "reputation_score"}]"""
+        out = []
+        rank = offset + 1
+        total = len(self._keys)
+        while len(out) < limit and rank <= total:
+            bucket, above = self._find(rank)
+            entries = self._buckets[bucket]
+            for key in entries[rank - above - 1: rank - above - 1 + limit - len(out)]:
+                out.append({"rank": rank, "user_id": key[2], "xp": -key[0], "reputation_score": -key[1]})
+                rank += 1
+        return out
+
+    def around(self, user_id: str, window: int) -> list:
+        """`window` entries either side of the user (clipped at the top)"""
+        rank = self.rank(user_id)
+        if rank is None:
+            return []
+        start = max(1, rank - window)
+        return self.page(start - 1, rank + window - start + 1)
+
+    def snapshot(self) -> dict:
+        return {"ready": self.ready, "users": len(self._keys), "buckets": len(self._buckets), **self.stats}
+
+
+board = Leaderboard(settings.LEADERBOARD_MAX_XP)
+
+
+async def rebuild():
+    start = time.perf_counter()
+    users = []
+    async for page in iter_documents(settings.COLLECTION_USERS, [Query.select(['$id', 'xp', 'reputation_score'])]):
+        users.extend((u['$id'], u.get('xp') or 0, u.get('reputation_score') or 0.0) for u in page)
+    state = await asyncio.to_thread(board.build, users)
+    unsent = await asyncio.to_thread(engine.unsent)
+    board.install(state)
+    # Changes in the log that the documents don't have yet
+    board.add_many(unsent)
+    board.ready = True
+    board.stats["rebuilds"] += 1
+    board.stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def maintain_leaderboard():
+    """Lifespan task: build from the users collection (retrying until it succeeds), then rebuild periodically"""
+    engine.listeners.append(board.add_many)
+    while True:
+        try:
+            await (rebuild() if board.ready else cold_build(rebuild))
+        except Exception as e:
+            print(f"⚠️ leaderboard rebuild failed: {e}")
+            if not board.ready:
+                await asyncio.sleep(5)
+                continue
+        await asyncio.sleep(settings.LEADERBOARD_REFRESH_SECONDS)
@@ -0,0 +1,251 @@
+import asyncio
+import json
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.services.appwrite import get_db_service, get_documents_by_ids, get_users_service, iter_documents
+from app.services.autocomplete import autocomplete
+from app.services.cache import get_cache
+from app.services.membership import index as membership
+from app.services.resilience import deadline_scope
+from app.services.skill_index import index as skill_index
+from app.utils.helpers import chunked
+
+# Denormalized member snapshots on team documents.
+#
+# Each team carries `member_snapshots`, a JSON string attribute:
+#   {"<user_id>": {"name": "Ada", "avatar": "https://..."}, ...}
+# covering its members and pending join requests. Team views render names and
+# avatars from it with zero per-member lookups.
+#
+# Kept fresh three ways:
+#   - write-through: the team routes rebuild it whenever members / requests change
+#   - fan-out: a profile name / avatar change patches all of that user's teams
+#     (membership index), SNAPSHOT_FANOUT_BATCH teams at a time
+#   - sweep: a periodic pass over all teams repairs any drift (concurrent writes,
+#     other workers, teams created before this attribute existed)
+
+USER_NAME_TTL = 300
+stats = {"fanouts": 0, "fanout_teams": 0, "sweeps": 0, "swept_teams": 0, "repaired": 0, "fallback_lookups": 0}
+
+
+# --- NAMES & AVATARS ---
+async def load_user_name(uid: str, users_service=None) -> str:
+    u = await asyncio.to_thread((users_service or get_users_service()).get, uid)
+    return u['name']
+
+
+async def get_user_names(user_ids) -> dict:
+    """
+    Resolve user IDs -> display names (cached, parallel).
+    Appwrite doesn't support bulk fetch by ID list, so misses are fetched individually.
+    """
+    users_service = get_users_service()
+    cache = get_cache()
+
+    async def fetch_name(uid):
+        try:
+            return await cache.get_or_set(
+                "user_names", uid,
+                lambda: load_user_name(uid, users_service),
+                ttl=USER_NAME_TTL
+            )
+        except Exception:
+            return None
+
+    uids = list(user_ids)
+    names = await asyncio.gather(*[fetch_name(uid) for uid in uids])
+    return {uid: name for uid, name in zip(uids, names) if name}
+
+
+async def load_profiles(user_ids) -> dict:
+    """{uid: {"name", "avatar"}}: names from auth accounts, avatars from profile documents (batched)"""
+    uids = list(dict.fromkeys(user_ids))
+    if not uids:
+        return {}
+    names, profiles = await asyncio.gather(
+        get_user_names(uids),
+        get_documents_by_ids(settings.COLLECTION_USERS, uids, select=['$id', 'avatar_url'])
+    )
+    return {
+        uid: {"name": names[uid], "avatar": (profiles.get(uid) or {}).get('avatar_url') or ""}
+        for uid in uids if uid in names
+    }
+
+
+# --- SNAPSHOT FIELD ---
+def parse(team: dict) -> dict:
+    raw = team.get('member_snapshots')
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+
+
+def _member_ids(team: dict) -> list:
+    return list(dict.fromkeys((team.get('members') or []) + (team.get('join_requests') or [])))
+
+
+async def build(team: dict, members=None, join_requests=None) -> str:
+    """
+    Snapshot for `team` with the given members / requests (default: the team's own).
+    Entries already in the team's snapshot are reused; only newcomers are looked up.
+    """
+    previous = parse(team)
+    ids = _member_ids({
+        "members": team.get('members') if members is None else members,
+        "join_requests": team.get('join_requests') if join_requests is None else join_requests
+    })
+    loaded = await load_profiles(uid for uid in ids if uid not in previous)
+    return _dump({uid: previous.get(uid) or loaded[uid] for uid in ids if uid in previous or uid in loaded})
+
+
+def _dump(snapshot: dict) -> str:
+    return json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False)
+
+
+async def enrich(teams: list):
+    """
+    Adds members_enriched / join_requests_enriched from each team's snapshot.
+    Users missing from a snapshot (teams not swept yet) are resolved in one batched lookup.
+    """
+    snapshots = [parse(team) for team in teams]
+    missing = {uid for team, snap in zip(teams, snapshots) for uid in _member_ids(team) if uid not in snap}
+    fallback = {}
+    if missing:
+        stats["fallback_lookups"] += len(missing)
+        fallback = {uid: {"name": name, "avatar": ""} for uid, name in (await get_user_names(missing)).items()}
+
+    for team, snap in zip(teams, snapshots):
+        team.pop('member_snapshots', None)  # served as the enriched lists below
+        team.setdefault('leader_id', "")
+        profile = lambda uid: snap.get(uid) or fallback.get(uid) or {"name": "Unknown User", "avatar": ""}
+        team['members_enriched'] = [
+            {"userId": m_id, "name": profile(m_id)["name"], "avatar": profile(m_id)["avatar"]}
+            for m_id in team.get('members', [])
+        ]
+        team['join_requests_enriched'] = [
+            {"userId": r_id, "name": profile(r_id)["name"]}
+            for r_id in (team.get('join_requests') or [])
+        ]
+
+
+# --- FAN-OUT ---
+async def _patch(team: dict, snapshot: dict):
+    await asyncio.to_thread(
+        get_db_service().update_document,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_TEAMS,
+        document_id=team['$id'],
+        data={"member_snapshots": _dump(snapshot)}
+    )
+    # The hackathon's cached team list (services/warmer.py) carries the old snapshot
+    if team.get('hackathon_id'):
+        await asyncio.to_thread(get_cache().delete, "hackathon_teams", team['hackathon_id'])
+
+
+async def _teams_of(user_id: str) -> list:
+    if membership.ready:
+        return membership.teams_of(user_id, include_requests=True)
+    team_ids = []
+    for field in ('members', 'join_requests'):
+        async for page in iter_documents(settings.COLLECTION_TEAMS, [Query.equal(field, user_id), Query.select(['$id'])]):
+            team_ids.extend(t['$id'] for t in page)
+    return list(dict.fromkeys(team_ids))
+
+
+async def propagate_profile(user_id: str, changes: dict):
+    """
+    Background task after a profile update: patch `changes` ({"name"} / {"avatar"})
+    into the snapshot of every team the user is in or has asked to join.
+    """
+    stats["fanouts"] += 1
+    with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+        team_ids = await _teams_of(user_id)
+
+    for batch in chunked(team_ids, settings.SNAPSHOT_FANOUT_BATCH):
+        # Fresh budget per batch; the request that triggered this has already returned
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+            teams = await get_documents_by_ids(
+                settings.COLLECTION_TEAMS, batch, select=['$id', 'hackathon_id', 'members', 'join_requests', 'member_snapshots']
+            )
+            updates = []
+            for team in teams.values():
+                snapshot = parse(team)
+                # No entry yet (team not swept): readers fall back to a lookup, the sweep fills it in
+                if user_id in snapshot and user_id in _member_ids(team):
+                    snapshot[user_id] = {**snapshot[user_id], **changes}
+                    updates.append(_patch(team, snapshot))
+            results = await asyncio.gather(*updates, return_exceptions=True)
+        stats["fanout_teams"] += sum(1 for r in results if not isinstance(r, Exception))
+
+
+async def write_through_profile(user_id: str, changes: dict, background_tasks, profile: dict = None):
+    """
+    After any write to a user's profile (PUT /api/users/{id}, PUT /api/auth/profile):
+    drops the cached name, keeps the skill / autocomplete indexes in step and
+    queues the snapshot fan-out for name / avatar changes. `profile` saves a
+    fetch when the caller already has the updated skills and tech_stack.
+    """
+    if "name" in changes:
+        await asyncio.to_thread(get_cache().delete, "user_names", user_id)
+
+    snapshot_changes = {}
+    if "name" in changes:
+        snapshot_changes["name"] = changes["name"]
+    if "avatar_url" in changes:
+        snapshot_changes["avatar"] = changes["avatar_url"] or ""
+    if snapshot_changes:
+        background_tasks.add_task(propagate_profile, user_id, snapshot_changes)
+
+    if "skills" in changes or "tech_stack" in changes:
+        if profile is None:
+            profile = (await get_documents_by_ids(
+                settings.COLLECTION_USERS, [user_id], select=['$id', 'skills', 'tech_stack']
+            )).get(user_id, {})
+        skill_index.put_user(user_id, profile.get("skills"), profile.get("tech_stack"))
+        autocomplete.put_user(user_id, profile.get("skills") or [], profile.get("tech_stack") or [])
+
+
+# --- CONSISTENCY SWEEP ---
+async def sweep():
+    """One pass over all teams: rebuild each snapshot from current profiles, write only the ones that drifted"""
+    semaphore = asyncio.Semaphore(settings.SNAPSHOT_FANOUT_BATCH)
+
+    async def repair(team, snapshot):
+        async with semaphore:
+            await _patch(team, snapshot)
+            stats["repaired"] += 1
+
+    async for page in iter_documents(
+        settings.COLLECTION_TEAMS,
+        [Query.select(['$id', 'hackathon_id', 'members', 'join_requests', 'member_snapshots'])]
+    ):
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS * 3, reset=True):
+            profiles = await load_profiles(uid for team in page for uid in _member_ids(team))
+            repairs = []
+            for team in page:
+                current = parse(team)
+                # A profile that failed to load keeps its old entry rather than being dropped
+                expected = {
+                    uid: profiles.get(uid) or current[uid]
+                    for uid in _member_ids(team) if uid in profiles or uid in current
+                }
+                if expected != current:
+                    repairs.append(repair(team, expected))
+            await asyncio.gather(*repairs, return_exceptions=True)
+        stats["swept_teams"] += len(page)
+    stats["sweeps"] += 1
+
+
+async def maintain_snapshots():
+    """Lifespan task: periodic consistency sweep"""
+    while True:
+        await asyncio.sleep(settings.SNAPSHOT_SWEEP_SECONDS)
+        try:
+            await sweep()
+        except Exception as e:
+            print(f"⚠️ member snapshot sweep failed: {e}")
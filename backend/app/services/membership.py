@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections import defaultdict
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import get_db_service, get_documents_by_ids, iter_documents
+from app.services.cache import get_cache
+
+# User -> teams membership index.
+#
+# "My teams" / "my hackathons" used to run an array-containment query on
+# `members` and then a second, sequential query for the hackathons. With this
+# index both become one parallel fetch of known IDs (get_documents_by_ids).
+#
+# Kept exact in this worker by the team routes (create / join / approve /
+# reject / leave / delete), rebuilt from the teams collection at startup and
+# every MEMBERSHIP_REFRESH_SECONDS to pick up writes made by other workers.
+# Pending join requests are indexed too (roles "member" / "request").
+#
+# Between rebuilds the index misses teams created / joined through another
+# worker. The join routes record the new member's team in the cache
+# ("membership_recent", note_joined) for two refresh intervals, and the
+# user-facing lists (user_teams) fetch those IDs along with the indexed ones,
+# so a user sees their own join on every worker (with a shared cache backend;
+# the memory backend only covers the worker that handled the join).
+
+RECENT_MAX = 50  # recent joins remembered per user
+
+
+class MembershipIndex:
+    def __init__(self):
+        self.ready = False
+        self._teams = {}  # team_id -> {"hackathon_id", "members": set, "requests": set}
+        self._by_user = defaultdict(dict)  # user_id -> {team_id: role}
+        self._journal = None  # edits made while a rebuild is paging; replayed after the swap
+        self.stats = {"rebuilds": 0, "last_rebuild_ms": None, "last_rebuild_at": None, "lookups": 0, "fallbacks": 0, "recent_joins": 0}
+
+    # -- writes (called by the team routes after a successful upstream write) --
+    def put_team(self, team: dict):
+        """Index (or re-index) a team document after it was created / updated"""
+        self._apply("put", team["$id"], team.get("hackathon_id"), team.get("members") or [], team.get("join_requests") or [])
+
+    def drop_team(self, team_id: str):
+        self._apply("drop", team_id)
+
+    def _apply(self, op, team_id, hackathon_id=None, members=(), requests=()):
+        if self._journal is not None:
+            self._journal.append((op, team_id, hackathon_id, list(members), list(requests)))
+        self._unlink(team_id)
+        if op == "put":
+            self._link(team_id, hackathon_id, members, requests)
+
+    def _link(self, team_id, hackathon_id, members, requests):
+        self._teams[team_id] = {"hackathon_id": hackathon_id, "members": set(members), "requests": set(requests)}
+        for uid in requests:
+            self._by_user[uid][team_id] = "request"
+        for uid in members:
+            self._by_user[uid][team_id] = "member"
+
+    def _unlink(self, team_id):
+        entry = self._teams.pop(team_id, None)
+        if not entry:
+            return
+        for uid in entry["members"] | entry["requests"]:
+            teams = self._by_user.get(uid)
+            if teams is not None:
+                teams.pop(team_id, None)
+                if not teams:
+                    del self._by_user[uid]
+
+    # -- reads --
+    def teams_of(self, user_id: str, include_requests: bool = False) -> list:
+        self.stats["lookups"] += 1
+        return [
+            team_id for team_id, role in self._by_user.get(user_id, {}).items()
+            if role == "member" or include_requests
+        ]
+
+    def members_of(self, team_id: str):
+        """Member IDs of a known team, None if the team isn't indexed"""
+        entry = self._teams.get(team_id)
+        return sorted(entry["members"]) if entry else None
+
+    def hackathons_of(self, user_id: str) -> dict:
+        """{hackathon_id: team_id} for every team the user is a member of"""
+        return {
+            self._teams[team_id]["hackathon_id"]: team_id
+            for team_id in self.teams_of(user_id)
+            if self._teams[team_id]["hackathon_id"]
+        }
+
+    # -- rebuild --
+    async def rebuild(self):
+        start = time.perf_counter()
+        self._journal = []
+        try:
+            teams = {}
+            async for page in iter_documents(
+                settings.COLLECTION_TEAMS,
+                [Query.select(['$id', 'hackathon_id', 'members', 'join_requests'])]
+            ):
+                for team in page:
+                    teams[team['$id']] = team
+        except Exception:
+            self._journal = None
+            raise
+
+        journal, self._journal = self._journal, None
+        self._teams, self._by_user = {}, defaultdict(dict)
+        for team in teams.values():
+            self._link(team['$id'], team.get('hackathon_id'), team.get('members') or [], team.get('join_requests') or [])
+        # Route edits that landed while we were paging are newer than what we read
+        for op, team_id, hackathon_id, members, requests in journal:
+            self._apply(op, team_id, hackathon_id, members, requests)
+
+        self.ready = True
+        self.stats["rebuilds"] += 1
+        self.stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.stats["last_rebuild_at"] = time.time()
+
+    def snapshot(self) -> dict:
+        return {"ready": self.ready, "teams": len(self._teams), "users": len(self._by_user), **self.stats}
+
+
+index = MembershipIndex()
+
+
+async def team_members(team_id: str) -> list:
+    """Member IDs of a team: from the index, else one document read"""
+    members = index.members_of(team_id)
+    if members is not None:
+        return members
+    team = await asyncio.to_thread(
+        get_db_service().get_document,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_TEAMS,
+        document_id=team_id
+    )
+    return team.get('members', [])
+
+
+async def note_joined(user_ids, team_id: str):
+    """
+    Read-your-writes for other workers: remember that these users just became
+    members of team_id ("membership_recent"), until every worker's index has
+    been rebuilt since.
+    """
+    cache = get_cache()
+    for uid in user_ids:
+        recent = await asyncio.to_thread(cache.get, "membership_recent", uid) or []
+        recent = list(dict.fromkeys([*recent, team_id]))[-RECENT_MAX:]
+        await asyncio.to_thread(cache.set, "membership_recent", uid, recent, settings.MEMBERSHIP_REFRESH_SECONDS * 2)
+
+
+async def user_teams(user_id: str, select: list = None) -> dict:
+    """
+    {team_id: team} for every team the user is a member of: indexed IDs plus
+    the user's recent joins (note_joined), one batched fetch by ID. Until the
+    index is ready, the members query. `select` must include members.
+    """
+    if not index.ready:
+        index.stats["fallbacks"] += 1
+        queries = [Query.equal("members", user_id)] + ([Query.select(select)] if select else [])
+        return {team['$id']: team async for page in iter_documents(settings.COLLECTION_TEAMS, queries) for team in page}
+
+    team_ids = index.teams_of(user_id)
+    recent = [tid for tid in await asyncio.to_thread(get_cache().get, "membership_recent", user_id) or [] if tid not in team_ids]
+    index.stats["recent_joins"] += len(recent)
+    teams = await get_documents_by_ids(settings.COLLECTION_TEAMS, [*team_ids, *recent], select=select)
+    return {team_id: team for team_id, team in teams.items() if user_id in team.get('members', [])}
+
+
+async def maintain_index():
+    """Lifespan task: build the index at startup, then refresh it periodically"""
+    while True:
+        try:
+            await (index.rebuild() if index.ready else cold_build(index.rebuild))
+        except Exception as e:
+            # Routes fall back to querying Appwrite until a rebuild succeeds
+            print(f"⚠️ membership index rebuild failed: {e}")
+        await asyncio.sleep(settings.MEMBERSHIP_REFRESH_SECONDS if index.ready else 5)
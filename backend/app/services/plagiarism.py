@@ -0,0 +1,334 @@
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import get_db_service, iter_documents
+from app.services.cache import get_cache
+from app.services.similarity import NUM_BINS, signature_of_hashes
+from app.services.warmer import parse_date
+from app.utils.helpers import chunked, is_conflict, process_map
+
+# Near-duplicate / plagiarism check over a hackathon's submissions.
+#
+# Every submission is sketched from its project_title, description and repo_links:
+#   - shingles: word 3-grams of title + description, plus "repo:host/owner/name"
+#     for each normalized repo link
+#   - 32-bit hashes of those shingles, kept for an exact Jaccard check
+#   - a MinHash signature of them (services/similarity.py)
+# LSH over the signatures (BANDS x ROWS: pairs at Jaccard 0.5 become candidates
+# ~94% of the time, at 0.7 ~99.9%) pairs this hackathon's submissions with each
+# other and with the last PLAGIARISM_HISTORY_HACKATHONS hackathons' submissions.
+# Submissions linking the same repo are always paired. Candidates are verified
+# with exact Jaccard; pairs at PLAGIARISM_MIN_SIMILARITY or above, or sharing a
+# repo, make the ranked report for the judging UI.
+#
+# Reports are documents in COLLECTION_PLAGIARISM (ID = hackathon ID), so they
+# survive restarts and every worker reads the same one. The document also
+# carries the run claim (`claimed_until`): creating it, or taking over an
+# expired claim, is how one worker (on any host) gets to run the check; a
+# claim lasts PLAGIARISM_SCAN_SECONDS. Two workers taking over the same
+# expired claim at once both run it (same report, wasted work only).
+#
+# Runs once per hackathon after its deadline (end_date), or on demand from the
+# judging routes. Sketching runs on a process pool from PLAGIARISM_POOL_MIN_DOCS
+# submissions; sketches of ended hackathons are cached ("plagiarism_sketches",
+# recomputed on a miss), so earlier events are usually only sketched once.
+
+ROWS = 3
+BANDS = NUM_BINS // ROWS
+MAX_BUCKET = 200  # more submissions than this in one bucket is a shared template, not a copy
+_WORD = re.compile(r"[a-z0-9]+")
+_SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*://")
+_SELECT = ['$id', 'hackathon_id', 'team_id', 'project_title', 'description', 'repo_links']
+
+
+def normalize_repo(link: str) -> str:
+    """'https://www.GitHub.com/Owner/Repo.git/tree/main?x' -> 'github.com/owner/repo'"""
+    link = _SCHEME.sub("", str(link).strip().lower())
+    link = re.split(r"[?#]", link, maxsplit=1)[0].removeprefix("www.")
+    parts = [p for p in link.split("/") if p][:3]
+    if parts:
+        parts[-1] = parts[-1].removesuffix(".git")
+    return "/".join(parts)
+
+
+def shingles(title: str, description: str, repo_links) -> set:
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())
+    out = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)} if len(words) >= 3 else set(words)
+    out.update("repo:" + repo for repo in filter(None, map(normalize_repo, repo_links or [])))
+    return out
+
+
+def _sketch_chunk(docs: list) -> list:
+    """
+    Process-pool worker: [(id, hackathon_id, team_id, title, description, repo_links)]
+    -> [(id, hackathon_id, team_id, title, shingle hashes bytes, signature bytes, repos)],
+    submissions without any shingle left out
+    """
+    out = []
+    for doc_id, hackathon_id, team_id, title, description, repo_links in docs:
+        shingle_set = shingles(title, description, repo_links)
+        hashes = array("I", sorted({zlib.crc32(s.encode()) for s in shingle_set}))
+        sig = signature_of_hashes(hashes)
+        if sig is None:
+            continue
+        repos = tuple(sorted(set(filter(None, map(normalize_repo, repo_links or [])))))
+        out.append((doc_id, hackathon_id, team_id, title, hashes.tobytes(), sig.tobytes(), repos))
+    return out
+
+
+def _band_keys(sig: array) -> list:
+    return [hash(tuple(sig[i:i + ROWS])) for i in range(0, BANDS * ROWS, ROWS)]
+
+
+def _as_doc(sub: dict) -> tuple:
+    return (sub['$id'], sub.get('hackathon_id'), sub.get('team_id'), sub.get('project_title') or "",
+            sub.get('description') or "", sub.get('repo_links') or [])
+
+
+def find_pairs(current: list, history: list, min_similarity: float, stats: dict) -> list:
+    """
+    Ranked suspicious pairs: each current sketch against the other current
+    sketches and the history. Shared-repo pairs first, then by similarity.
+    """
+    buckets = [defaultdict(list) for _ in range(BANDS)]
+    by_repo = defaultdict(list)
+    for i, sketch in enumerate(current):
+        for band, key in zip(buckets, _band_keys(array("I", sketch[5]))):
+            band[key].append(i)
+        for repo in sketch[6]:
+            by_repo[repo].append(i)
+
+    # (i, j): i indexes current, j indexes current (j > i) or history (j < 0: history[-j - 1])
+    candidates = set()
+    for band in buckets:
+        for members in band.values():
+            if len(members) > MAX_BUCKET:
+                stats["oversized_buckets"] += 1
+                continue
+            for n, i in enumerate(members):
+                candidates.update((i, j) for j in members[n + 1:])
+    for members in by_repo.values():
+        for n, i in enumerate(members):
+            candidates.update((i, j) for j in members[n + 1:])
+    for h, sketch in enumerate(history):
+        found = set()
+        for band, key in zip(buckets, _band_keys(array("I", sketch[5]))):
+            members = band.get(key)
+            if members and len(members) <= MAX_BUCKET:
+                found.update(members)
+        for repo in sketch[6]:
+            found.update(by_repo.get(repo, ()))
+        candidates.update((i, -h - 1) for i in found)
+    stats["candidates"] += len(candidates)
+
+    hash_sets = {}
+
+    def hashes(sketch):
+        key = (sketch[1], sketch[0])
+        if key not in hash_sets:
+            hash_sets[key] = frozenset(array("I", sketch[4]))
+        return hash_sets[key]
+
+    pairs = []
+    for i, j in candidates:
+        a, b = current[i], (current[j] if j >= 0 else history[-j - 1])
+        if a[2] == b[2] or a[0] == b[0]:
+            continue  # a team resubmitting its own project
+        ha, hb = hashes(a), hashes(b)
+        similarity = len(ha & hb) / len(ha | hb)
+        shared = sorted(set(a[6]) & set(b[6]))
+        if similarity >= min_similarity or shared:
+            pairs.append((bool(shared), similarity, a, b, shared))
+    pairs.sort(key=lambda p: (p[0], p[1]), reverse=True)
+    return [
+        {
+            "similarity": round(similarity, 3),
+            "shared_repos": shared,
+            "a": {"submission_id": a[0], "team_id": a[2], "project_title": a[3]},
+            "b": {"submission_id": b[0], "team_id": b[2], "project_title": b[3], "hackathon_id": b[1]},
+        }
+        for _, similarity, a, b, shared in pairs
+    ]
+
+
+class PlagiarismChecker:
+    def __init__(self):
+        self.running = set()  # hackathon_ids being checked in this worker
+        self.stats = {
+            "runs": 0, "errors": 0, "last_run_ms": None, "last_run_pool": False, "sketched": 0,
+            "sketch_cache_hits": 0, "candidates": 0, "pairs_reported": 0, "oversized_buckets": 0, "skipped": 0,
+        }
+
+    async def _sketch(self, docs: list) -> list:
+        workers = settings.PLAGIARISM_WORKERS or os.cpu_count() or 1
+        self.stats["sketched"] += len(docs)
+        pooled = len(docs) >= settings.PLAGIARISM_POOL_MIN_DOCS and workers >= 2
+        self.stats["last_run_pool"] = pooled
+        if pooled:
+            return await process_map(_sketch_chunk, docs, workers)
+        return await asyncio.to_thread(_sketch_chunk, docs)
+
+    async def _history_ids(self, hackathon_id: str) -> list:
+        """The last PLAGIARISM_HISTORY_HACKATHONS hackathons that ended before this one"""
+        ends = {}
+        async for page in iter_documents(settings.COLLECTION_HACKATHONS, [Query.select(['$id', 'end_date'])]):
+            for hackathon in page:
+                ends[hackathon['$id']] = parse_date(hackathon.get('end_date'))
+        cutoff = ends.get(hackathon_id) or datetime.now(timezone.utc)
+        earlier = [(end, hid) for hid, end in ends.items() if hid != hackathon_id and end and end < cutoff]
+        earlier.sort(reverse=True)
+        return [hid for _, hid in earlier[:settings.PLAGIARISM_HISTORY_HACKATHONS]]
+
+    async def build_report(self, hackathon_id: str) -> dict:
+        start = time.perf_counter()
+        cache = get_cache()
+        docs = []
+        async for page in iter_documents(
+            settings.COLLECTION_SUBMISSIONS, [Query.equal('hackathon_id', hackathon_id), Query.select(_SELECT)]
+        ):
+            docs.extend(_as_doc(sub) for sub in page)
+
+        history, missing = [], []
+        for hid in await self._history_ids(hackathon_id):
+            sketches = await asyncio.to_thread(cache.get, "plagiarism_sketches", hid)
+            if sketches is None:
+                missing.append(hid)
+            else:
+                self.stats["sketch_cache_hits"] += 1
+                history.extend(sketches)
+        for ids in chunked(missing, 100):
+            async for page in iter_documents(
+                settings.COLLECTION_SUBMISSIONS, [Query.equal('hackathon_id', ids), Query.select(_SELECT)]
+            ):
+                docs.extend(_as_doc(sub) for sub in page)
+
+        # One pool run for this hackathon and every uncached earlier one
+        sketched = await self._sketch(docs)
+        by_hackathon = defaultdict(list)
+        for sketch in sketched:
+            by_hackathon[sketch[1]].append(sketch)
+        for hid in missing:
+            history.extend(by_hackathon[hid])
+            await asyncio.to_thread(
+                cache.set, "plagiarism_sketches", hid, by_hackathon[hid], settings.PLAGIARISM_SKETCH_TTL_SECONDS
+            )
+        current = by_hackathon[hackathon_id]
+
+        pairs = await asyncio.to_thread(find_pairs, current, history, settings.PLAGIARISM_MIN_SIMILARITY, self.stats)
+        self.stats["pairs_reported"] += len(pairs)
+        build_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.stats["runs"] += 1
+        self.stats["last_run_ms"] = build_ms
+        return {
+            "hackathon_id": hackathon_id,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "submissions": len(current),
+            "compared_with": len(history),
+            "min_similarity": settings.PLAGIARISM_MIN_SIMILARITY,
+            "pair_count": len(pairs),
+            "pairs": pairs[:settings.PLAGIARISM_MAX_PAIRS],
+            "build_ms": build_ms,
+        }
+
+    async def _claim(self, hackathon_id: str, refresh: bool) -> bool:
+        """Take the run claim; False if another worker holds it (or, with refresh=False, a report exists)"""
+        now = time.time()
+        until = now + settings.PLAGIARISM_SCAN_SECONDS
+        try:
+            await _reports("create_document", hackathon_id, {"claimed_until": until})
+            return True
+        except Exception as e:
+            if not is_conflict(e):
+                raise
+        record = await _reports("get_document", hackathon_id, queries=[Query.select(['$id', 'claimed_until', 'generated_at'])])
+        if (record.get('claimed_until') or 0) > now or (record.get('generated_at') and not refresh):
+            return False
+        await _reports("update_document", hackathon_id, {"claimed_until": until})
+        return True
+
+    async def run(self, hackathon_id: str, refresh: bool = True):
+        """Build and store the report; refresh=False skips hackathons that already have one (or another worker's claim)"""
+        if hackathon_id in self.running:
+            return
+        self.running.add(hackathon_id)
+        try:
+            if not await self._claim(hackathon_id, refresh):
+                self.stats["skipped"] += 1
+                return
+            try:
+                report = await self.build_report(hackathon_id)
+            except Exception:
+                await _reports("update_document", hackathon_id, {"claimed_until": 0})
+                raise
+            await _reports("update_document", hackathon_id, {
+                "report": json.dumps(report),
+                "generated_at": report["generated_at"],
+                "claimed_until": 0,
+            })
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ plagiarism check failed for {hackathon_id}: {e}")
+        finally:
+            self.running.discard(hackathon_id)
+
+    async def run_due(self):
+        """Check every hackathon whose deadline passed in the last PLAGIARISM_LOOKBACK_HOURS"""
+        now = datetime.now(timezone.utc)
+        lookback = settings.PLAGIARISM_LOOKBACK_HOURS * 3600
+        due = []
+        async for page in iter_documents(settings.COLLECTION_HACKATHONS, [Query.select(['$id', 'end_date'])]):
+            for hackathon in page:
+                end = parse_date(hackathon.get('end_date'))
+                if end and 0 <= (now - end).total_seconds() <= lookback:
+                    due.append(hackathon['$id'])
+        for hackathon_id in due:
+            await self.run(hackathon_id, refresh=False)
+
+    def snapshot(self) -> dict:
+        return {"running": sorted(self.running), **self.stats}
+
+
+checker = PlagiarismChecker()
+
+
+async def _reports(method: str, *args, **kwargs):
+    return await asyncio.to_thread(
+        getattr(get_db_service(), method), settings.APPWRITE_DATABASE_ID, settings.COLLECTION_PLAGIARISM, *args, **kwargs
+    )
+
+
+async def load_report(hackathon_id: str) -> tuple:
+    """(stored report or None, whether a run is claimed right now)"""
+    try:
+        record = await _reports("get_document", hackathon_id)
+    except Exception as e:
+        if getattr(e, "code", None) == 404:
+            return None, False
+        raise
+    report = json.loads(record['report']) if record.get('report') else None
+    return report, (record.get('claimed_until') or 0) > time.time()
+
+
+async def maintain_plagiarism():
+    """Lifespan task: report on hackathons past their deadline every PLAGIARISM_SCAN_SECONDS"""
+    if not settings.COLLECTION_PLAGIARISM:
+        return
+    first = True
+    while True:
+        try:
+            await (cold_build(checker.run_due) if first else checker.run_due())
+            first = False
+        except Exception as e:
+            print(f"⚠️ plagiarism scan failed: {e}")
+        await asyncio.sleep(settings.PLAGIARISM_SCAN_SECONDS)
@@ -0,0 +1,338 @@
+import asyncio
+import fcntl
+import os
+import time
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.services.appwrite import get_db_service
+from app.services.membership import team_members
+from app.services.resilience import deadline_scope
+
+# XP & reputation engine, fed by an append-only event log.
+#
+# Routes append domain events (emit); nothing is computed on the request path.
+# The log is one tab-separated line per event and per user:
+#
+#   <ts_ms>\t<kind>\t<user_id>\t<ref>\t<value>\n
+#
+# The log is local to a host (its workers share the file), so it never holds a
+# user's whole total: folded, it gives the *change* in xp / reputation recorded
+# on this host, a pure function of the log (recompute() replays it from scratch
+# and always lands on the same numbers). The user documents stay the source of
+# truth. One worker per host (holder of the log's flock) adds the part of those
+# changes not sent yet with Appwrite's atomic increment / decrement, so writers
+# on other hosts and XP already on a document are never overwritten.
+# <log>.flushed records how far the documents have been credited, so a restart
+# only sends events after it. Increments aren't idempotent: a crash between a
+# write-back and that record re-sends the last batch (at most one flush interval).
+
+# kind -> (xp, reputation); score_received also adds `value` XP and value / 30 reputation
+RULES = {
+    "team_joined": (50, 0.0),
+    "team_left": (-50, -2.0),  # ghosting: dropping out of a team costs reputation
+    "team_disbanded": (-50, -5.0),  # leader broke up a team
+    "submission_made": (100, 1.0),
+    "score_received": (0, 0.0),
+}
+
+
+def fold(lines, totals: dict, changes: dict = None) -> int:
+    """
+    Add event lines to totals {user_id: [xp, reputation]} (net changes, unclamped),
+    and to `changes` too if given; returns the number of events applied
+    """
+    rules = RULES
+    applied = 0
+    for line in lines:
+        if not line:
+            continue
+        _, kind, user_id, _, value = line.split("\t")
+        rule = rules.get(kind)
+        if rule is None:
+            continue
+        entry = totals.get(user_id)
+        if entry is None:
+            entry = totals[user_id] = [0, 0.0]
+        xp, rep = rule
+        if kind == "score_received":
+            points = float(value)
+            xp += int(points)
+            rep += points / 30
+        entry[0] += xp
+        entry[1] += rep
+        if changes is not None:
+            change = changes.get(user_id)
+            if change is None:
+                changes[user_id] = [xp, rep]
+            else:
+                change[0] += xp
+                change[1] += rep
+        applied += 1
+    return applied
+
+
+def _add(db, user_id: str, attribute: str, amount):
+    """Atomically add `amount` to a numeric attribute of the user document, never below 0"""
+    ids = {
+        "database_id": settings.APPWRITE_DATABASE_ID,
+        "collection_id": settings.COLLECTION_USERS,
+        "document_id": user_id,
+    }
+    if amount > 0:
+        return db.increment_document_attribute(**ids, attribute=attribute, value=amount)
+    try:
+        return db.decrement_document_attribute(**ids, attribute=attribute, value=-amount, min=0)
+    except Exception as e:
+        code = getattr(e, "code", None)
+        if not isinstance(code, int) or code == 404 or not 400 <= code < 500:
+            raise
+    # Refused: it would go below 0. Take what is left instead.
+    current = db.get_document(**ids, queries=[Query.select([attribute])]).get(attribute) or 0
+    if current > 0:
+        return db.decrement_document_attribute(**ids, attribute=attribute, value=min(current, -amount), min=0)
+
+
+class ReputationEngine:
+    def __init__(self, path: str):
+        self.path = path
+        self.totals = {}  # user_id -> [xp, reputation]: net change recorded in this host's log
+        self.pushed = {}  # user_id -> [xp, reputation]: the part of totals already added to the document (writer)
+        self.dirty = set()
+        self.offset = 0  # bytes of the log folded into totals
+        self.flushed = 0  # bytes of the log credited to the user documents
+        self.writer = False
+        self.listeners = []  # called with {user_id: [xp change, reputation change]} by notify()
+        self._changes = {}  # changes folded since the last notify()
+        self._fd = None
+        self._lock_fd = None
+        self.stats = {"events_emitted": 0, "events_applied": 0, "users_written": 0, "write_errors": 0, "last_flush_ms": None}
+
+    # -- append --
+    def record(self, kind: str, user_ids, ref: str = "", value: float = 0):
+        if kind not in RULES:
+            raise ValueError(f"Unknown event kind '{kind}'")
+        ts = int(time.time() * 1000)
+        lines = "".join(f"{ts}\t{kind}\t{uid}\t{ref}\t{value}\n" for uid in dict.fromkeys(user_ids) if uid)
+        if not lines:
+            return
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(self._fd, lines.encode())  # one O_APPEND write: lines from several workers never interleave
+        self.stats["events_emitted"] += lines.count("\n")
+
+    # -- fold --
+    def _chunks(self, start: int, stop: int = None, size: int = 1 << 22):
+        """Yields (lines, bytes) of whole lines from [start, stop); a half-written last line is left for later"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(start)
+            carry = b""
+            while True:
+                want = size if stop is None else min(size, stop - start)
+                data = f.read(want) if want > 0 else b""
+                if not data:
+                    return
+                start += len(data)
+                data = carry + data
+                end = data.rfind(b"\n") + 1
+                carry = data[end:]
+                if end:
+                    yield data[:end].decode().split("\n"), end
+
+    def catch_up(self) -> int:
+        """Fold lines appended since the last call (by any worker)"""
+        changes = {}
+        applied = 0
+        for lines, consumed in self._chunks(self.offset):
+            applied += fold(lines, self.totals, changes)
+            self.offset += consumed
+        self.stats["events_applied"] += applied
+        if self.writer:
+            self.dirty |= changes.keys()
+        if self.listeners:
+            for user_id, (xp, rep) in changes.items():
+                pending = self._changes.setdefault(user_id, [0, 0.0])
+                pending[0] += xp
+                pending[1] += rep
+        return applied
+
+    def notify(self):
+        """Hand folded changes to listeners (leaderboard); runs on the event loop, not in catch_up's thread"""
+        if not self._changes:
+            return
+        changes, self._changes = self._changes, {}
+        for listener in self.listeners:
+            listener(changes)
+
+    def unsent(self) -> dict:
+        """Changes folded here but not yet in the documents: the log after the last recorded write-back"""
+        changes = {}
+        for lines, _ in self._chunks(min(self._load_flushed(), self.offset), self.offset):
+            fold(lines, changes)
+        return changes
+
+    def recompute(self) -> dict:
+        """Deterministic full replay of the log -> {user_id: [xp, reputation]}"""
+        totals = {}
+        for lines, _ in self._chunks(0):
+            fold(lines, totals)
+        return totals
+
+    # -- write-back --
+    def _state_path(self) -> str:
+        return f"{self.path}.flushed"
+
+    def _load_flushed(self) -> int:
+        try:
+            with open(self._state_path()) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _save_flushed(self, offset: int):
+        tmp = f"{self._state_path()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self._state_path())
+
+    def try_become_writer(self) -> bool:
+        if self.writer:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd, self.writer = fd, True
+        # Taking over from a writer that stopped: the documents hold the log up to
+        # its last recorded flush; users changed after that get the rest
+        self.flushed = min(self._load_flushed(), self.offset)
+        self.pushed = {}
+        for lines, _ in self._chunks(0, self.flushed):
+            fold(lines, self.pushed)
+        for lines, _ in self._chunks(self.flushed, self.offset):
+            self.dirty |= {line.split("\t")[2] for line in lines if line}
+        return True
+
+    def load(self):
+        """Startup: fold the part of the log already in the documents, then mark the rest dirty"""
+        flushed = self._load_flushed()
+        for lines, consumed in self._chunks(0, flushed):
+            self.stats["events_applied"] += fold(lines, self.totals)
+            self.offset += consumed
+        self.flushed = self.offset  # log shorter than recorded (rotated / truncated): trust the log
+        if self.writer:
+            self.pushed = {user_id: list(entry) for user_id, entry in self.totals.items()}
+        self.catch_up()  # marks the unflushed tail dirty (writer only)
+
+    async def flush(self):
+        """Add dirty users' unsent xp / reputation changes to their documents, in parallel batches"""
+        if not self.writer or not self.dirty:
+            return
+        start = time.perf_counter()
+        synced_to = self.offset
+        batch, self.dirty = self.dirty, set()
+        semaphore = asyncio.Semaphore(settings.REPUTATION_WRITE_CONCURRENCY)
+        db = get_db_service()
+
+        async def write(user_id):
+            total = self.totals[user_id]
+            pushed = self.pushed.setdefault(user_id, [0, 0.0])
+            async with semaphore:
+                try:
+                    xp = total[0] - pushed[0]
+                    if xp:
+                        await asyncio.to_thread(_add, db, user_id, "xp", xp)
+                        pushed[0] += xp
+                    rep = round(total[1] - pushed[1], 2)  # sub-cent remainders carry over to the next change
+                    if rep:
+                        await asyncio.to_thread(_add, db, user_id, "reputation_score", rep)
+                        pushed[1] += rep
+                    self.stats["users_written"] += 1
+                    return True
+                except Exception as e:
+                    if getattr(e, "code", None) == 404:
+                        pushed[:] = total  # no profile document (deleted / never created): nothing to credit
+                        return True
+                    self.stats["write_errors"] += 1
+                    self.dirty.add(user_id)
+                    return False
+
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS * 3, reset=True):
+            results = await asyncio.gather(*[write(uid) for uid in batch])
+        if all(results):
+            self.flushed = synced_to
+            await asyncio.to_thread(self._save_flushed, synced_to)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "writer": self.writer,
+            "users": len(self.totals),
+            "dirty": len(self.dirty),
+            "log_offset": self.offset,
+            "flushed_offset": self.flushed,
+            **self.stats
+        }
+
+
+engine = ReputationEngine(settings.REPUTATION_LOG_PATH)
+
+
+async def emit(kind: str, user_ids, ref: str = "", value: float = 0):
+    """Append an event from a route. Never fails the route: XP is best-effort bookkeeping."""
+    try:
+        await asyncio.to_thread(engine.record, kind, user_ids, ref, value)
+    except Exception as e:
+        print(f"⚠️ reputation event '{kind}' dropped: {e}")
+
+
+async def emit_for_team(kind: str, team_id: str, ref: str = "", value: float = 0):
+    """Background task: one event per current member of the team"""
+    try:
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+            members = await team_members(team_id)
+    except Exception as e:
+        print(f"⚠️ reputation event '{kind}' dropped: {e}")
+        return
+    await emit(kind, members, ref or team_id, value)
+
+
+async def emit_for_submission(kind: str, submission_id: str, value: float = 0):
+    """Background task: credit every member of the team behind a submission"""
+    try:
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+            submission = await asyncio.to_thread(
+                get_db_service().get_document,
+                database_id=settings.APPWRITE_DATABASE_ID,
+                collection_id=settings.COLLECTION_SUBMISSIONS,
+                document_id=submission_id
+            )
+    except Exception as e:
+        print(f"⚠️ reputation event '{kind}' dropped: {e}")
+        return
+    await emit_for_team(kind, submission['team_id'], submission_id, value)
+
+
+async def maintain_reputation():
+    """Lifespan task: load the log once, then tail it and flush every REPUTATION_FLUSH_SECONDS"""
+    await asyncio.to_thread(engine.try_become_writer)
+    await asyncio.to_thread(engine.load)
+    engine.notify()
+    while True:
+        await asyncio.sleep(settings.REPUTATION_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(engine.try_become_writer)
+            await asyncio.to_thread(engine.catch_up)
+            engine.notify()
+            await engine.flush()
+        except Exception as e:
+            print(f"⚠️ reputation flush failed: {e}")
@@ -0,0 +1,454 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.profiling import profiling_upstream, record_upstream
+
+# Resilience layer for every Appwrite call.
+#
+# get_db_service() / get_users_service() return a ResilientService proxy, so the
+# existing `asyncio.to_thread(db.get_document, ...)` calls get, transparently:
+#   - a deadline: the request's remaining budget caps every upstream attempt
+#   - jittered retries for idempotent reads (get_document, list_documents, users.get)
+#   - one circuit breaker per collection that fails fast while Appwrite is down
+#   - optional hedging of hot get_document calls (UPSTREAM_HEDGE_DELAY_MS > 0)
+#   - single-flight: identical concurrent reads share one upstream call, plus an
+#     optional micro-cache window (UPSTREAM_MICROCACHE_MS) for a thundering herd
+#
+# The deadline lives in a ContextVar; asyncio.to_thread copies the context, so
+# the budget set by the request middleware is visible in the worker thread.
+#
+# An attempt runs on the thread that made the call (the asyncio.to_thread
+# worker): its budget becomes the HTTP timeout of the SDK's request (connect and
+# each socket read), so a timed-out attempt ends instead of holding a thread.
+# Only hedged reads fan out to the upstream pool, under the same timeout.
+
+_deadline: ContextVar[Optional[float]] = ContextVar("upstream_deadline", default=None)
+_attempt_timeout: ContextVar[Optional[float]] = ContextVar("upstream_attempt_timeout", default=None)
+
+
+# --- ERRORS (HTTPException so routes that re-raise HTTPException surface them as-is) ---
+class UpstreamUnavailable(HTTPException):
+    def __init__(self, detail: str, retry_after: float = 1):
+        super().__init__(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(max(1, int(retry_after)))}
+        )
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, detail: str = "Upstream deadline exceeded"):
+        super().__init__(status_code=504, detail=detail)
+
+
+class _AttemptTimeout(Exception):
+    pass
+
+
+# --- DEADLINES ---
+@contextmanager
+def deadline_scope(seconds: Optional[float], reset: bool = False):
+    """
+    Set the upstream budget for everything called inside. Nested scopes can
+    only shrink it, unless reset=True (long-running streams / jobs that give
+    each unit of work a fresh budget).
+    """
+    current = None if reset else _deadline.get()
+    new = time.monotonic() + seconds if seconds else None
+    if current is not None and (new is None or current < new):
+        new = current
+    token = _deadline.set(new)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (None = no deadline)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+# --- CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive upstream failures.
+    open -> half_open after `reset_timeout`; one trial call decides the next state.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+# --- HTTP TIMEOUTS ---
+def install_http_timeouts():
+    """
+    The Appwrite SDK calls requests without a timeout: requests made inside an
+    attempt get the attempt's budget instead (explicit timeouts are left alone).
+    """
+    from requests.adapters import HTTPAdapter
+
+    send = HTTPAdapter.send
+    if getattr(send, "_attempt_timeout", False):
+        return
+
+    def send_with_timeout(self, request, stream=False, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = _attempt_timeout.get()
+        return send(self, request, stream=stream, timeout=timeout, **kwargs)
+
+    send_with_timeout._attempt_timeout = True
+    HTTPAdapter.send = send_with_timeout
+
+
+def _timed_out(exc: Exception) -> bool:
+    """requests' Timeout, raised as is or wrapped in AppwriteException(message=<the error>)"""
+    from requests.exceptions import Timeout
+
+    return isinstance(exc, Timeout) or isinstance(getattr(exc, "message", None), Timeout)
+
+
+def _run_attempt(budget: float, target, args, kwargs):
+    token = _attempt_timeout.set(budget)
+    try:
+        return target(*args, **kwargs)
+    except Exception as e:
+        if _timed_out(e):
+            raise _AttemptTimeout() from e
+        raise
+    finally:
+        _attempt_timeout.reset(token)
+
+
+def is_transient(exc: Exception) -> bool:
+    """5xx / 429 / network errors are worth retrying; 4xx client errors are not"""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int) and code:
+        return code >= 500 or code == 429
+    # AppwriteException without a code wraps requests' ConnectionError / Timeout
+    return True
+
+
+# --- SINGLE-FLIGHT ---
+def _clone(value):
+    """Copy of a JSON-like result; callers mutate documents (enrichment, member lists)"""
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution. With window > 0
+    the result is also served for `window` seconds after it lands. A write to
+    a collection drops its cached results and stops in-flight ones from being cached.
+    """
+
+    def __init__(self, window: float = 0.0, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._recent = {}  # key -> (expires_at, value)
+        self._by_collection = defaultdict(set)
+        self._generation = defaultdict(int)
+        self.stats = {"leaders": 0, "coalesced": 0, "micro_hits": 0, "invalidations": 0}
+
+    def do(self, key: str, collection: str, fn):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._recent.get(key)
+            if hit and hit[0] > now:
+                self.stats["micro_hits"] += 1
+                return _clone(hit[1])
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation[collection]
+                self.stats["leaders"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            left = remaining()
+            if not flight.event.wait(timeout=None if left is None else max(0.0, left)):
+                raise DeadlineExceeded()
+            if flight.error is not None:
+                raise flight.error
+            return _clone(flight.value)
+
+        try:
+            result = fn()
+            flight.value = _clone(result)  # pristine copy: the leader's caller may mutate `result`
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if self.window and flight.error is None and self._generation[collection] == generation:
+                    if len(self._recent) >= self.max_entries:
+                        self._prune(now)
+                    self._recent[key] = (time.monotonic() + self.window, flight.value)
+                    self._by_collection[collection].add(key)
+            flight.event.set()
+
+    def invalidate(self, collection: str):
+        with self._lock:
+            self._generation[collection] += 1
+            for key in self._by_collection.pop(collection, ()):
+                self._recent.pop(key, None)
+            self.stats["invalidations"] += 1
+
+    def _prune(self, now: float):
+        self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+        if len(self._recent) >= self.max_entries:
+            self._recent.clear()
+        live = set(self._recent)
+        for collection in list(self._by_collection):
+            self._by_collection[collection] &= live
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "in_flight": len(self._flights), "cached": len(self._recent), "window_ms": self.window * 1000}
+
+
+# --- PROXY ---
+class ResilientService:
+    """
+    Wraps an Appwrite service (Databases, Users). Method calls keep their
+    signatures; breaker key is the collection_id (or the service name).
+    """
+
+    READ_METHODS = {"get_document", "list_documents", "get", "list"}
+
+    def __init__(self, service, name: str, executor: ThreadPoolExecutor, hedge_collections=()):
+        self._service = service
+        self._name = name
+        self._executor = executor
+        self._hedge_collections = set(c for c in hedge_collections if c)
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0, "fast_failed": 0}
+        self._flight = SingleFlight(settings.UPSTREAM_MICROCACHE_MS / 1000) if settings.UPSTREAM_SINGLE_FLIGHT else None
+
+    def __getattr__(self, attr):
+        target = getattr(self._service, attr)
+        if not callable(target):
+            return target
+
+        def call(*args, **kwargs):
+            collection = kwargs.get("collection_id") or self._name
+            if self._flight is None:
+                return self._call(attr, target, args, kwargs)
+            if attr in self.READ_METHODS:
+                key = json.dumps([attr, args, kwargs], sort_keys=True, default=str)
+                return self._flight.do(key, collection, lambda: self._call(attr, target, args, kwargs))
+            try:
+                return self._call(attr, target, args, kwargs)
+            finally:
+                self._flight.invalidate(collection)  # even a failed write may have landed
+
+        def timed(*args, **kwargs):
+            # Awaited upstream time of a profiled request (core/profiling.py)
+            start = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                record_upstream(attr, kwargs.get("collection_id") or self._name, time.perf_counter() - start)
+
+        call.__name__ = timed.__name__ = attr
+        if profiling_upstream():
+            return timed
+        return call
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(
+                    f"{self._name}:{key}",
+                    settings.UPSTREAM_BREAKER_THRESHOLD,
+                    settings.UPSTREAM_BREAKER_RESET_SECONDS
+                ))
+        return breaker
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "single_flight": self._flight.snapshot() if self._flight else None,
+            "breakers": {key: b.snapshot() for key, b in self._breakers.items()}
+        }
+
+    def _call(self, method, target, args, kwargs):
+        self.stats["calls"] += 1
+        key = kwargs.get("collection_id") or self._name
+        breaker = self.breaker(key)
+        idempotent = method in self.READ_METHODS
+        hedge = idempotent and method == "get_document" and key in self._hedge_collections
+        attempts = 1 + (settings.UPSTREAM_RETRIES if idempotent else 0)
+
+        for attempt in range(attempts):
+            budget = self._budget()
+            if not breaker.allow():
+                self.stats["fast_failed"] += 1
+                raise CircuitOpenError(f"Upstream '{key}' unavailable (circuit open)", breaker.retry_after())
+
+            try:
+                result = self._attempt(target, args, kwargs, budget, hedge)
+            except _AttemptTimeout:
+                # A stalled call counts against the upstream
+                breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    self.stats["deadline_exceeded"] += 1
+                    raise DeadlineExceeded()
+                self.stats["retries"] += 1
+                continue
+            except Exception as e:
+                if not is_transient(e):
+                    # The upstream answered (404, 409...) - it is healthy
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                self.stats["retries"] += 1
+                self._backoff(attempt)
+                continue
+
+            breaker.record_success()
+            return result
+
+    def _budget(self) -> float:
+        """Time allowed for the next attempt: the request's remaining budget, capped per attempt"""
+        left = remaining()
+        cap = settings.UPSTREAM_ATTEMPT_TIMEOUT_SECONDS
+        if left is None:
+            return cap
+        if left <= 0:
+            self.stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded()
+        return min(left, cap)
+
+    def _attempt(self, target, args, kwargs, budget: float, hedge: bool):
+        hedge_delay = settings.UPSTREAM_HEDGE_DELAY_MS / 1000
+        if not (hedge and hedge_delay and hedge_delay < budget):
+            return _run_attempt(budget, target, args, kwargs)
+
+        # Hedged read: primary and backup race on the upstream pool
+        start = time.monotonic()
+        futures = [self._executor.submit(_run_attempt, budget, target, args, kwargs)]
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            self.stats["hedges"] += 1
+            futures.append(self._executor.submit(_run_attempt, budget - hedge_delay, target, args, kwargs))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            left = budget - (time.monotonic() - start)
+            if left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self.stats["hedge_wins"] += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+
+        if not pending:
+            raise error
+        for future in pending:
+            future.cancel()  # the loser still running ends at its own HTTP timeout
+        raise _AttemptTimeout()
+
+    def _backoff(self, attempt: int):
+        # Full jitter: sleep U(0, base * 2^attempt), never past the deadline
+        delay = random.uniform(0, settings.UPSTREAM_RETRY_BASE_MS / 1000 * (2 ** attempt))
+        left = remaining()
+        if left is not None:
+            delay = min(delay, max(0.0, left))
+        time.sleep(delay)
+
+
+@lru_cache()
+def get_upstream_executor() -> ThreadPoolExecutor:
+    """Pool for hedged reads, so racing attempts don't take threads from asyncio's pool"""
+    return ThreadPoolExecutor(
+        max_workers=settings.UPSTREAM_MAX_WORKERS,
+        thread_name_prefix="upstream"
+    )
@@ -0,0 +1,269 @@
+import asyncio
+import errno
+import selectors
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from app.core.config import settings
+
+# Caching DNS resolver + happy-eyeballs connect for upstream HTTP.
+#
+# Replaces the old force_ipv4() getaddrinfo patch, which made every new Appwrite
+# connection pay a blocking lookup and dropped IPv6 for everyone. install() swaps
+# urllib3's create_connection (what requests / the Appwrite SDK connect through):
+#   - lookups are cached per (host, port) for DNS_TTL_SECONDS; maintain_resolver()
+#     re-resolves hot entries before they expire, so connects never wait on DNS
+#   - a failed lookup keeps serving the last answer for up to DNS_STALE_SECONDS
+#   - connects race address families (RFC 8305): IPv6 first, the next address
+#     starts after HAPPY_EYEBALLS_DELAY_MS or as soon as an attempt fails, first
+#     to connect wins. A family that fails or loses the race is tried second for
+#     DNS_FAMILY_PENALTY_SECONDS, so a broken IPv6 path costs one delay, not 30s.
+#
+# The lookup function is injectable: CachingResolver(resolve=fake) for tests/benchmarks.
+
+_FAMILIES = {socket.AF_INET: "ipv4", socket.AF_INET6: "ipv6"}
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY}
+
+
+class _Entry:
+    __slots__ = ("addrs", "resolved_at", "expires", "used_at")
+
+    def __init__(self, addrs, now: float):
+        self.addrs = addrs
+        self.resolved_at = now
+        self.expires = now + settings.DNS_TTL_SECONDS
+        self.used_at = now
+
+
+class CachingResolver:
+    def __init__(self, resolve=socket.getaddrinfo, max_hosts: int = 256):
+        self._resolve = resolve
+        self.max_hosts = max_hosts
+        self._entries = {}
+        self._key_locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+        self._penalized = {}  # family -> monotonic time the penalty ends
+        self.metrics = defaultdict(lambda: {
+            "resolutions": 0, "hits": 0, "stale_served": 0, "failures": 0, "last_error": None,
+            "resolve_ms": None, "connects": 0, "connect_failures": 0, "connect_ms": None,
+            "fallbacks": 0, "wins": {"ipv6": 0, "ipv4": 0},
+        })
+
+    # --- RESOLUTION ---
+    def _lookup(self, host: str, port: int) -> list:
+        family = socket.AF_INET if settings.DNS_DISABLE_IPV6 else socket.AF_UNSPEC
+        start = time.perf_counter()
+        infos = self._resolve(host, port, family, socket.SOCK_STREAM)
+        elapsed = (time.perf_counter() - start) * 1000
+        addrs = []
+        for af, socktype, proto, _, sockaddr in infos:
+            if af in _FAMILIES and (af, sockaddr) not in [(a[0], a[3]) for a in addrs]:
+                addrs.append((af, socktype, proto, sockaddr))
+        if not addrs:
+            raise socket.gaierror(f"no addresses for {host}")
+        with self._lock:
+            stats = self.metrics[host]
+            stats["resolutions"] += 1
+            stats["resolve_ms"] = round(elapsed, 2)
+        return addrs
+
+    def resolve(self, host: str, port: int, refresh: bool = False) -> list:
+        """Addresses for host:port as (family, type, proto, sockaddr); cached, single lookup per key"""
+        key = (host, port)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry and now < entry.expires and not refresh:
+            entry.used_at = now
+            with self._lock:
+                self.metrics[host]["hits"] += 1
+            return entry.addrs
+
+        with self._key_locks[key]:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() < entry.expires and not refresh:
+                entry.used_at = time.monotonic()
+                with self._lock:
+                    self.metrics[host]["hits"] += 1
+                return entry.addrs
+            try:
+                addrs = self._lookup(host, port)
+            except OSError as e:
+                with self._lock:
+                    stats = self.metrics[host]
+                    stats["failures"] += 1
+                    stats["last_error"] = str(e) or type(e).__name__
+                    if entry and time.monotonic() - entry.expires < settings.DNS_STALE_SECONDS:
+                        stats["stale_served"] += 1
+                        return entry.addrs
+                raise
+            fresh = _Entry(addrs, time.monotonic())
+            if entry:
+                fresh.used_at = entry.used_at
+            with self._lock:
+                if key not in self._entries and len(self._entries) >= self.max_hosts:
+                    oldest = min(self._entries, key=lambda k: self._entries[k].used_at)
+                    del self._entries[oldest]
+                self._entries[key] = fresh
+            return addrs
+
+    def refresh_due(self) -> int:
+        """Re-resolve entries expiring within DNS_REFRESH_AHEAD_SECONDS; drop ones idle past the TTL"""
+        now = time.monotonic()
+        refreshed = 0
+        for key, entry in list(self._entries.items()):
+            if now - entry.used_at > settings.DNS_TTL_SECONDS + settings.DNS_STALE_SECONDS:
+                with self._lock:
+                    self._entries.pop(key, None)
+            elif entry.expires - now <= settings.DNS_REFRESH_AHEAD_SECONDS:
+                try:
+                    self.resolve(*key, refresh=True)
+                    refreshed += 1
+                except OSError:
+                    pass  # counted in metrics; the stale answer stays in place
+        return refreshed
+
+    # --- CONNECT (happy eyeballs) ---
+    def _ordered(self, addrs: list) -> list:
+        now = time.monotonic()
+        families = []
+        for addr in addrs:
+            if addr[0] not in families:
+                families.append(addr[0])
+        # IPv6 first unless it is serving a penalty and IPv4 isn't
+        families.sort(key=lambda af: (self._penalized.get(af, 0) > now, af != socket.AF_INET6))
+        queues = [[a for a in addrs if a[0] == af] for af in families]
+        ordered = []
+        while any(queues):
+            for queue in queues:
+                if queue:
+                    ordered.append(queue.pop(0))
+        return ordered
+
+    def _penalize(self, family: int):
+        self._penalized[family] = time.monotonic() + settings.DNS_FAMILY_PENALTY_SECONDS
+
+    def create_connection(self, address, timeout=None, source_address=None, socket_options=None):
+        """Drop-in for urllib3.util.connection.create_connection"""
+        host, port = address
+        if host.startswith("["):
+            host = host.strip("[]")
+        addrs = self._ordered(self.resolve(host, port))
+        first = addrs[0]
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            timeout = socket.getdefaulttimeout()  # urllib3's "no timeout given" sentinel
+
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        delay = settings.HAPPY_EYEBALLS_DELAY_MS / 1000
+        pending = {}  # socket -> addr
+        selector = selectors.DefaultSelector()
+        next_at = start
+        winner = error = None
+
+        try:
+            while winner is None and (addrs or pending):
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    error = socket.timeout(f"connect to {host} timed out")
+                    break
+                if addrs and (now >= next_at or not pending):
+                    addr = addrs.pop(0)
+                    sock = None
+                    try:
+                        sock = socket.socket(addr[0], addr[1], addr[2])
+                        for opt in socket_options or ():
+                            sock.setsockopt(*opt)
+                        if source_address:
+                            sock.bind(source_address)
+                        sock.setblocking(False)
+                        code = sock.connect_ex(addr[3])
+                        if code not in _IN_PROGRESS and code != 0:
+                            raise OSError(code, errno.errorcode.get(code, str(code)))
+                        pending[sock] = addr
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        next_at = now + delay
+                    except OSError as e:
+                        error = e
+                        self._penalize(addr[0])
+                        if sock is not None:
+                            sock.close()
+                    continue
+
+                waits = [t - now for t in (next_at if addrs else None, deadline) if t is not None]
+                for key, _ in selector.select(max(0.0, min(waits)) if waits else None):
+                    sock = key.fileobj
+                    addr = pending.pop(sock)
+                    selector.unregister(sock)
+                    code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code == 0 and winner is None:
+                        winner = (sock, addr)
+                        continue
+                    error = OSError(code, errno.errorcode.get(code, str(code))) if code else error
+                    self._penalize(addr[0])
+                    sock.close()
+                    next_at = time.monotonic()  # a failure starts the next attempt right away
+        finally:
+            for sock, addr in pending.items():
+                if winner is not None and addr[0] != winner[1][0]:
+                    self._penalize(addr[0])  # still connecting when another family won
+                sock.close()
+            selector.close()
+
+        elapsed = (time.monotonic() - start) * 1000
+        with self._lock:
+            stats = self.metrics[host]
+            stats["connects"] += 1
+            if winner is None:
+                stats["connect_failures"] += 1
+            else:
+                stats["connect_ms"] = round(elapsed, 2)
+                stats["wins"][_FAMILIES[winner[1][0]]] += 1
+                if winner[1] is not first:
+                    stats["fallbacks"] += 1
+        if winner is None:
+            raise error or OSError(f"no address for {host} could be connected")
+
+        sock, addr = winner
+        self._penalized.pop(addr[0], None)
+        sock.settimeout(timeout)
+        return sock
+
+    def install(self):
+        """Route urllib3 (requests, the Appwrite SDK) connections through this resolver"""
+        import urllib3.util.connection
+
+        urllib3.util.connection.create_connection = self.create_connection
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            hosts = {}
+            for (host, port), entry in self._entries.items():
+                hosts[f"{host}:{port}"] = {
+                    "addresses": [addr[3][0] for addr in entry.addrs],
+                    "age_s": round(now - entry.resolved_at, 1),
+                    "expires_in_s": round(entry.expires - now, 1),
+                }
+            return {
+                "ttl_seconds": settings.DNS_TTL_SECONDS,
+                "ipv6_disabled": settings.DNS_DISABLE_IPV6,
+                "penalized": {_FAMILIES[af]: round(until - now, 1) for af, until in self._penalized.items() if until > now},
+                "entries": hosts,
+                "hosts": {host: {**stats, "wins": dict(stats["wins"])} for host, stats in self.metrics.items()},
+            }
+
+
+resolver = CachingResolver()
+
+
+async def maintain_resolver():
+    """Lifespan task: keep cached upstream addresses fresh so connects never block on DNS"""
+    interval = max(1.0, settings.DNS_REFRESH_AHEAD_SECONDS / 2)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(resolver.refresh_due)
+        except Exception as e:
+            print(f"⚠️ DNS refresh failed: {e}")
@@ -0,0 +1,251 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+
+from app.core.config import settings
+from app.services.appwrite import get_db_service
+from app.services.reputation import emit_for_submission
+from app.services.resilience import deadline_scope, is_transient
+from app.utils.helpers import deterministic_id, is_conflict
+
+# Write-behind buffer for judge scores.
+#
+# POST /api/judging/score appends the score to a local write-ahead log and
+# answers at once; a background flusher writes the log to COLLECTION_SCORES in
+# bounded concurrent batches. One JSON line per score:
+#
+#   {"id": "<doc id>", "data": {...score document...}, "ts": 1718000000.0}\n
+#
+# - Idempotent: the document ID is deterministic_id(submission_id, judge_id), so
+#   a replayed line hits 409 and becomes an update. A judge re-scoring the same
+#   submission overwrites their score (last line wins) instead of adding a duplicate.
+# - XP: once a score lands, the team is credited with the change in its total
+#   (the whole total on creation, new - stored on a re-score, 0 on a replay),
+#   so re-scoring never pays XP twice.
+# - Durable: each append is one O_APPEND write (fsync'd with SCORE_WAL_FSYNC);
+#   <wal>.flushed records how far the collection is in sync, so after a crash
+#   the flusher resumes from there.
+# - A write Appwrite rejects for good (4xx other than 409 / 429) is moved to
+#   <wal>.rejected with the error, so it can't hold back the scores after it;
+#   transient failures (5xx, 429, network, deadline) keep the batch for a retry.
+# - Every worker appends; the holder of <wal>.lock flushes. Once the log is fully
+#   flushed and larger than SCORE_WAL_COMPACT_BYTES it is truncated, under an
+#   exclusive flock that appenders respect.
+
+
+def score_id(submission_id: str, judge_id: str) -> str:
+    return deterministic_id(submission_id, judge_id)
+
+
+def _upsert(document_id: str, data: dict) -> tuple:
+    """-> (status, change of the stored total)"""
+    db = get_db_service()
+    try:
+        db.create_document(
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=settings.COLLECTION_SCORES,
+            document_id=document_id,
+            data=data
+        )
+        return "created", data.get("total", 0)
+    except Exception as e:
+        if not is_conflict(e):
+            raise
+    previous = db.get_document(
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_SCORES,
+        document_id=document_id
+    )
+    db.update_document(
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_SCORES,
+        document_id=document_id,
+        data=data
+    )
+    return "updated", data.get("total", 0) - (previous.get("total") or 0)
+
+
+class ScoreWAL:
+    def __init__(self, path: str):
+        self.path = path
+        self.flushed = 0  # bytes of the log reflected in the scores collection
+        self.writer = False
+        self._fd = None
+        self._lock_fd = None
+        self._append_lock = threading.Lock()
+        self._pending = None  # (end_offset, {doc_id: data}) of the batch being written
+        self.stats = {
+            "queued": 0, "created": 0, "updated": 0, "write_errors": 0, "rejected": 0,
+            "corrupt_lines": 0, "compactions": 0, "last_flush_ms": None
+        }
+
+    # -- append (any worker, request path) --
+    def append(self, document_id: str, data: dict):
+        line = json.dumps({"id": document_id, "data": data, "ts": time.time()}, separators=(",", ":")) + "\n"
+        with self._append_lock:  # one flock holder per process: an unlock must not drop another thread's lock
+            if self._fd is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_SH)  # compaction holds LOCK_EX
+            try:
+                os.write(self._fd, line.encode())
+                if settings.SCORE_WAL_FSYNC:
+                    os.fsync(self._fd)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.stats["queued"] += 1
+
+    # -- flusher state --
+    def _state_path(self) -> str:
+        return f"{self.path}.flushed"
+
+    def _save_flushed(self, offset: int):
+        tmp = f"{self._state_path()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self._state_path())
+
+    def _reject(self, document_id: str, data: dict, error: Exception):
+        """Dead-letter a score Appwrite won't accept (kept for a manual look, never retried)"""
+        line = json.dumps({"id": document_id, "data": data, "error": str(error), "ts": time.time()}, separators=(",", ":"))
+        with open(f"{self.path}.rejected", "a") as f:
+            f.write(line + "\n")
+
+    def _size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def try_become_writer(self) -> bool:
+        """Take the flusher role (flock) and resume from the last recorded offset"""
+        if self.writer:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd, self.writer = fd, True
+        try:
+            with open(self._state_path()) as f:
+                self.flushed = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            self.flushed = 0
+        if self.flushed > self._size():
+            self.flushed = 0  # log truncated after the offset was saved: replay it all (idempotent)
+        return True
+
+    def read_batch(self, limit: int):
+        """Up to `limit` whole lines after the flushed offset -> (end_offset, {doc_id: data})"""
+        records, end = {}, self.flushed
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return end, records
+        with f:
+            f.seek(self.flushed)
+            for n, raw in enumerate(f, 1):
+                if not raw.endswith(b"\n"):
+                    break  # half-written line: picked up next time
+                end += len(raw)
+                try:
+                    record = json.loads(raw)
+                    records[record["id"]] = record["data"]  # last write for a key wins
+                except (ValueError, KeyError):
+                    self.stats["corrupt_lines"] += 1
+                if n >= limit:
+                    break
+        return end, records
+
+    def compact(self):
+        """Truncate a fully flushed log; appenders are held off by LOCK_EX"""
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size == self.flushed:
+                # Offset first: a crash before the truncate only replays flushed lines
+                self._save_flushed(0)
+                os.ftruncate(fd, 0)
+                self.flushed = 0
+                self.stats["compactions"] += 1
+        finally:
+            os.close(fd)  # releases the flock
+
+    # -- flush (writer only) --
+    async def flush(self) -> bool:
+        """Write everything appended so far; False if some writes failed (retried next time)"""
+        if not self.writer:
+            return True
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(settings.SCORE_WRITE_CONCURRENCY)
+
+        async def write(document_id, data, records):
+            async with semaphore:
+                try:
+                    status, delta = await asyncio.to_thread(_upsert, document_id, data)
+                except Exception as e:
+                    self.stats["write_errors"] += 1
+                    if is_transient(e):
+                        return  # stays in the batch for the retry
+                    self.stats["rejected"] += 1
+                    print(f"⚠️ score {document_id} rejected, moved to {self.path}.rejected: {e}")
+                    await asyncio.to_thread(self._reject, document_id, data, e)
+                    records.pop(document_id, None)
+                    return
+                records.pop(document_id, None)
+                self.stats[status] += 1
+            if delta:
+                await emit_for_submission("score_received", data["submission_id"], delta)
+
+        while True:
+            if self._pending is None:
+                end, records = await asyncio.to_thread(self.read_batch, settings.SCORE_FLUSH_BATCH)
+                if end == self.flushed:
+                    break
+                self._pending = (end, records)
+            end, records = self._pending
+            # Fresh budget per batch: nobody is waiting on these writes
+            with deadline_scope(settings.REQUEST_DEADLINE_SECONDS * 3, reset=True):
+                await asyncio.gather(*[write(doc_id, data, records) for doc_id, data in list(records.items())])
+            if records:
+                return False  # keep the batch (minus what landed) for the retry
+            self._pending = None
+            self.flushed = end
+            await asyncio.to_thread(self._save_flushed, end)
+
+        if self.flushed >= settings.SCORE_WAL_COMPACT_BYTES:
+            await asyncio.to_thread(self.compact)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "writer": self.writer,
+            "log_bytes": self._size(),
+            "flushed_offset": self.flushed,
+            "in_batch": len(self._pending[1]) if self._pending else 0,
+            **self.stats
+        }
+
+
+wal = ScoreWAL(settings.SCORE_WAL_PATH)
+
+
+async def maintain_score_wal():
+    """Lifespan task: flush every SCORE_FLUSH_MS, backing off (up to 30s) while writes fail"""
+    delay = settings.SCORE_FLUSH_MS / 1000
+    while True:
+        try:
+            await asyncio.to_thread(wal.try_become_writer)
+            ok = await wal.flush()
+        except Exception as e:
+            print(f"⚠️ score flush failed: {e}")
+            ok = False
+        delay = settings.SCORE_FLUSH_MS / 1000 if ok else min(delay * 2, 30)
+        await asyncio.sleep(delay)
@@ -0,0 +1,301 @@
+import asyncio
+import bisect
+import os
+import random
+import re
+import time
+import zlib
+from array import array
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import iter_documents
+from app.utils.helpers import process_map
+
+# "Similar events": MinHash signatures + LSH banding over hackathon tags and descriptions.
+#
+# Comparing every hackathon with every other is O(n^2). Each hackathon gets a
+# NUM_BINS-value signature of its shingles (tags, counted twice, plus the words
+# of name + description); two signatures agree on a position with probability
+# ~= the Jaccard similarity of the shingle sets. Signatures are cut into BANDS
+# bands of ROWS values; hackathons sharing any band bucket become candidates,
+# and only those are scored. Events on the same topic share words, not phrases
+# (Jaccard ~0.2-0.4), so the bands are narrow: with 32 x 2, pairs at Jaccard 0.2
+# are found ~73% of the time, at 0.3 ~95%.
+#
+# Signatures use one-permutation hashing (one hash per shingle, the bin taken
+# from its top bits) with densification for empty bins: the same estimator as
+# k independent permutations at 1/k of the hashing work, which is what lets a
+# pure-Python build handle 100k hackathons. zlib.crc32 is the shingle hash, so
+# signatures are the same in every process (str hash() is salted per process).
+#
+# Upkeep: create / update write through; a full rebuild runs at startup and every
+# SIMILARITY_REFRESH_SECONDS. Catalogues of SIMILARITY_POOL_MIN_DOCS or more are
+# signed on a process pool.
+
+NUM_BINS = 64
+BANDS = 32
+ROWS = NUM_BINS // BANDS
+_BIN_SHIFT = 64 - (NUM_BINS.bit_length() - 1)
+_MASK64 = (1 << 64) - 1
+_EMPTY = 1 << 32  # above any 32-bit minimum
+# A band entry is one int64: 40 bits of band key, 23 bits of slot (8M hackathons).
+# Key collisions only add a candidate, which scoring then discards.
+_SLOT_BITS = 23
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+_KEY_MASK = (1 << 40) - 1
+_PROBES = [random.Random(j).sample(range(NUM_BINS), NUM_BINS) for j in range(NUM_BINS)]  # fixed: same in every process
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "the and for with you your our are will this that from have all can has its into about more who "
+    "their them they was were not but any one two get join build team teams hackathon hackathons event".split()
+)
+
+
+def shingles(doc: dict) -> set:
+    """Tags (weighted x2) + the words of name and description"""
+    out = set()
+    for tag in doc.get("tags") or []:
+        tag = " ".join(_WORD.findall(str(tag).lower()))
+        if tag:
+            out.add("#" + tag)
+            out.add("##" + tag)
+    for field in ("name", "description"):
+        out.update(w for w in _WORD.findall(str(doc.get(field) or "").lower()) if len(w) > 2 and w not in _STOPWORDS)
+    return out
+
+
+def _mix(crc: int) -> tuple:
+    # (bin from the top bits, 32-bit value from the bottom ones)
+    h = (crc * 0x9E3779B97F4A7C15 + 0x632BE59BD9B4E019) & _MASK64
+    return h >> _BIN_SHIFT, h & 0xFFFFFFFF
+
+
+def _shingle_hash(shingle: str) -> tuple:
+    return _mix(zlib.crc32(shingle.encode()))
+
+
+def _densify(sig: list) -> array:
+    if _EMPTY in sig:
+        filled = [v != _EMPTY for v in sig]
+        for j in [j for j in range(NUM_BINS) if not filled[j]]:
+            for k in _PROBES[j]:
+                if filled[k]:
+                    sig[j] = sig[k]
+                    break
+    return array("I", sig)
+
+
+def signature(shingle_set, memo: dict = None) -> array:
+    """
+    One-permutation MinHash with densification; None for an empty set.
+    `memo` caches shingle hashes across a batch: descriptions share most words.
+    """
+    if not shingle_set:
+        return None
+    if memo is None:
+        memo = {}
+    get = memo.get
+    sig = [_EMPTY] * NUM_BINS
+    for shingle in shingle_set:
+        hv = get(shingle)
+        if hv is None:
+            hv = memo[shingle] = _shingle_hash(shingle)
+        b, v = hv
+        if v < sig[b]:
+            sig[b] = v
+    return _densify(sig)
+
+
+def signature_of_hashes(hashes) -> array:
+    """signature() of shingles already hashed with zlib.crc32"""
+    if not hashes:
+        return None
+    sig = [_EMPTY] * NUM_BINS
+    for crc in hashes:
+        b, v = _mix(crc)
+        if v < sig[b]:
+            sig[b] = v
+    return _densify(sig)
+
+
+def _band_keys(sig) -> list:
+    # Tuples of ints hash the same in every process
+    return [hash(band) & _KEY_MASK for band in zip(*[iter(sig)] * ROWS)]
+
+
+def _sign_chunk(docs: list) -> list:
+    """
+    Process-pool worker: [(id, name, tags, description)] -> [(id, name, signature bytes, band keys bytes)],
+    documents without any shingle left out
+    """
+    out, memo = [], {}
+    for doc_id, name, tags, description in docs:
+        sig = signature(shingles({"name": name, "tags": tags, "description": description}), memo)
+        if sig is not None:
+            out.append((doc_id, name, sig.tobytes(), array("q", _band_keys(sig)).tobytes()))
+    return out
+
+
+class _State:
+    """
+    Flat arrays instead of dicts of buckets: 8 bytes per band entry instead of
+    ~70, so 100k hackathons x 32 bands fit in ~50 MB with the signatures. Slot i
+    holds one signature; each band is a sorted array of key << 23 | slot
+    (bisect to look up). A changed or deleted hackathon only loses its slot
+    (tombstone) until the next rebuild compacts everything.
+    """
+    __slots__ = ("ids", "names", "sigs", "slot_of", "bands")
+
+    def __init__(self):
+        self.ids = []  # slot -> hackathon_id, None once replaced / deleted
+        self.names = []
+        self.sigs = array("I")  # NUM_BINS values per slot
+        self.slot_of = {}  # hackathon_id -> live slot
+        self.bands = [array("q") for _ in range(BANDS)]
+
+    def _append(self, doc_id: str, name: str, raw: bytes) -> int:
+        slot = len(self.ids)
+        self.ids.append(doc_id)
+        self.names.append(name)
+        self.sigs.frombytes(raw)
+        self.slot_of[doc_id] = slot
+        return slot
+
+    def signature(self, slot: int):
+        return self.sigs[slot * NUM_BINS:(slot + 1) * NUM_BINS]
+
+    def link(self, doc_id: str, name: str, sig: array):
+        slot = self._append(doc_id, name, sig.tobytes())
+        for band, key in zip(self.bands, _band_keys(sig)):
+            bisect.insort(band, key << _SLOT_BITS | slot)
+
+    def unlink(self, doc_id: str):
+        slot = self.slot_of.pop(doc_id, None)
+        if slot is not None:
+            self.ids[slot] = None
+
+    def candidates(self, slot: int) -> set:
+        found = set()
+        for band, key in zip(self.bands, _band_keys(self.signature(slot))):
+            i, n = bisect.bisect_left(band, key << _SLOT_BITS), len(band)
+            while i < n and band[i] >> _SLOT_BITS == key:
+                found.add(band[i] & _SLOT_MASK)
+                i += 1
+        found.discard(slot)
+        return {s for s in found if self.ids[s] is not None}
+
+    @classmethod
+    def bulk(cls, signed: list) -> "_State":
+        state = cls()
+        keys = array("q")  # BANDS keys per slot
+        for doc_id, name, sig, band_keys in signed:
+            state._append(doc_id, name, sig)
+            keys.frombytes(band_keys)
+        for b in range(BANDS):
+            state.bands[b] = array("q", sorted([key << _SLOT_BITS | slot for slot, key in enumerate(keys[b::BANDS])]))
+        return state
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.ready = False
+        self._state = _State()
+        self._journal = None
+        self.stats = {"rebuilds": 0, "last_rebuild_ms": None, "last_rebuild_pool": False, "queries": 0, "candidates": 0}
+
+    # -- writes (called by the hackathon routes after a successful upstream write) --
+    def put(self, doc: dict):
+        self._apply(doc["$id"], doc)
+
+    def drop(self, doc_id: str):
+        self._apply(doc_id, None)
+
+    def _apply(self, doc_id: str, doc):
+        if self._journal is not None:
+            self._journal.append((doc_id, doc))
+        self._state.unlink(doc_id)
+        sig = signature(shingles(doc)) if doc is not None else None
+        if sig is not None:
+            self._state.link(doc_id, doc.get("name"), sig)
+
+    # -- reads --
+    def similar(self, doc_id: str, k: int = 5, min_similarity: float = 0.0):
+        """[(hackathon_id, name, estimated Jaccard)] best first; None if the hackathon isn't indexed"""
+        state = self._state
+        slot = state.slot_of.get(doc_id)
+        if slot is None:
+            return None
+        self.stats["queries"] += 1
+        candidates = state.candidates(slot)
+        self.stats["candidates"] += len(candidates)
+
+        sig = state.signature(slot)
+        scored = []
+        for other in candidates:
+            score = sum(1 for a, b in zip(sig, state.signature(other)) if a == b) / NUM_BINS
+            if score >= min_similarity:
+                scored.append((-score, state.ids[other], state.names[other]))
+        scored.sort()
+        return [(other, name, -neg) for neg, other, name in scored[:k]]
+
+    # -- rebuild --
+    async def rebuild(self):
+        start = time.perf_counter()
+        self._journal = []
+        try:
+            docs = []
+            async for page in iter_documents(
+                settings.COLLECTION_HACKATHONS, [Query.select(['$id', 'name', 'tags', 'description'])]
+            ):
+                docs.extend((d['$id'], d.get('name'), d.get('tags') or [], d.get('description') or "") for d in page)
+            signed, pooled = await _sign_all(docs)
+            state = await asyncio.to_thread(_State.bulk, signed)
+        except Exception:
+            self._journal = None
+            raise
+
+        journal, self._journal = self._journal, None
+        self._state = state
+        # Route edits that landed while we were paging / signing are newer than what we read
+        for doc_id, doc in journal:
+            self._apply(doc_id, doc)
+
+        self.ready = True
+        self.stats["rebuilds"] += 1
+        self.stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.stats["last_rebuild_pool"] = pooled
+
+    def snapshot(self) -> dict:
+        state = self._state
+        return {
+            "ready": self.ready,
+            "hackathons": len(state.slot_of),
+            "tombstones": len(state.ids) - len(state.slot_of),
+            "index_bytes": state.sigs.itemsize * len(state.sigs) + sum(8 * len(band) for band in state.bands),
+            "bins": NUM_BINS, "bands": BANDS, "rows": ROWS,
+            **self.stats,
+        }
+
+
+async def _sign_all(docs: list):
+    """(signed docs, used the process pool?)"""
+    workers = settings.SIMILARITY_WORKERS or os.cpu_count() or 1
+    if len(docs) < settings.SIMILARITY_POOL_MIN_DOCS or workers < 2:
+        return await asyncio.to_thread(_sign_chunk, docs), False
+    return await process_map(_sign_chunk, docs, workers), True
+
+
+index = SimilarityIndex()
+
+
+async def maintain_similarity():
+    """Lifespan task: build the index at startup, then refresh it periodically"""
+    while True:
+        try:
+            await (index.rebuild() if index.ready else cold_build(index.rebuild))
+        except Exception as e:
+            print(f"⚠️ similarity index rebuild failed: {e}")
+        await asyncio.sleep(settings.SIMILARITY_REFRESH_SECONDS if index.ready else 5)
@@ -0,0 +1,274 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+
+from appwrite.query import Query
+
+from app.core.config import settings
+from app.core.startup import cold_build
+from app.services.appwrite import get_db_service, iter_documents
+
+# Skill -> open-team inverted index ("teams that need me").
+#
+# The lobby used to pull every team (plus member lookups) and filter on
+# `looking_for` in the browser. Here, per hackathon, every normalized
+# `looking_for` role maps to the set of open teams asking for it, and every
+# user maps to their normalized skills + tech_stack (and back). A query is one posting-list
+# merge over the user's skills; the ranked list is kept per (hackathon, user)
+# until a team of that hackathon changes, so paging through it is a slice.
+#
+# Same upkeep as the membership index: the team / profile routes write through,
+# a rebuild from Appwrite runs at startup and every SKILL_INDEX_REFRESH_SECONDS,
+# and route edits made while a rebuild is paging are replayed after the swap.
+
+DEFAULT_CAPACITY = 4  # HackathonBase.max_team_size default
+RANKED_CACHE_ENTRIES = 1024
+
+
+def normalize(skill: str) -> str:
+    """Case, "-" / "_" and extra spaces don't matter: " Machine-Learning" -> "machine learning" """
+    return " ".join(str(skill).lower().replace("-", " ").replace("_", " ").split())
+
+
+class SkillIndex:
+    def __init__(self):
+        self.ready = False
+        self._teams = {}  # team_id -> {"hackathon_id", "name", "roles": {norm: label}, "members", "requests", "open"}
+        self._postings = defaultdict(lambda: defaultdict(set))  # hackathon_id -> role -> {team_id}
+        self._users = {}  # user_id -> frozenset of normalized skills + tech_stack
+        self._skill_users = defaultdict(set)  # normalized skill -> {user_id}
+        self._capacity = {}  # hackathon_id -> max_team_size
+        self._versions = defaultdict(int)  # hackathon_id -> bumped on any team change
+        self._ranked = OrderedDict()  # (hackathon_id, user_id) -> (version, skills, sorted rank keys)
+        self._journal = None
+        self._user_listeners = []  # called with a user_id after that user's skills change
+        self.generation = 0  # bumped by every rebuild
+        self.stats = {"rebuilds": 0, "last_rebuild_ms": None, "queries": 0, "ranked_hits": 0, "fallbacks": 0}
+
+    # -- writes (called by the routes after a successful upstream write) --
+    def put_team(self, team: dict):
+        self._apply("team", team["$id"], team)
+
+    def drop_team(self, team_id: str):
+        self._apply("team", team_id, None)
+
+    def put_user(self, user_id: str, skills=(), tech_stack=()):
+        self._apply("user", user_id, {"skills": list(skills or []), "tech_stack": list(tech_stack or [])})
+
+    def set_capacity(self, hackathon_id: str, max_team_size):
+        self._apply("capacity", hackathon_id, max_team_size)
+
+    def _apply(self, kind, key, value):
+        if self._journal is not None:
+            self._journal.append((kind, key, value))
+        if kind == "team":
+            self._unlink(key)
+            if value is not None:
+                self._link(value)
+        elif kind == "user":
+            skills = frozenset(normalize(s) for s in value["skills"] + value["tech_stack"] if normalize(s))
+            old = self._users.get(key)
+            if old != skills:
+                for skill in (old or frozenset()) - skills:
+                    self._skill_users[skill].discard(key)
+                    if not self._skill_users[skill]:
+                        del self._skill_users[skill]
+                for skill in skills - (old or frozenset()):
+                    self._skill_users[skill].add(key)
+                self._users[key] = skills
+                for listener in self._user_listeners:
+                    listener(key)
+        elif value:
+            self._capacity[key] = int(value)
+
+    def _link(self, team: dict):
+        hackathon_id = team.get("hackathon_id")
+        roles = {}
+        for label in team.get("looking_for") or []:
+            role = normalize(label)
+            if role:
+                roles.setdefault(role, label)
+        entry = {
+            "hackathon_id": hackathon_id,
+            "name": team.get("name"),
+            "leader_id": team.get("leader_id"),
+            "roles": roles,
+            "members": frozenset(team.get("members") or []),
+            "requests": frozenset(team.get("join_requests") or []),
+            "open": team.get("status", "open") == "open",
+        }
+        self._teams[team["$id"]] = entry
+        if entry["open"]:
+            postings = self._postings[hackathon_id]
+            for role in roles:
+                postings[role].add(team["$id"])
+        self._versions[hackathon_id] += 1
+
+    def _unlink(self, team_id: str):
+        entry = self._teams.pop(team_id, None)
+        if not entry:
+            return
+        postings = self._postings.get(entry["hackathon_id"])
+        if postings is not None:
+            for role in entry["roles"]:
+                teams = postings.get(role)
+                if teams is not None:
+                    teams.discard(team_id)
+                    if not teams:
+                        del postings[role]
+        self._versions[entry["hackathon_id"]] += 1
+
+    def on_user_change(self, listener):
+        self._user_listeners.append(listener)
+
+    # -- reads --
+    def team(self, team_id: str):
+        """The indexed entry of a team (replaced, not mutated, on every change), None if unknown"""
+        return self._teams.get(team_id)
+
+    def users(self):
+        """(user_id, normalized skills) for every indexed user"""
+        return self._users.items()
+
+    def users_with(self, skill: str):
+        """IDs of users listing a normalized skill"""
+        return self._skill_users.get(skill, ())
+
+    def skills_of(self, user_id: str):
+        """Normalized skills of a known user, None if the user isn't indexed"""
+        return self._users.get(user_id)
+
+    def capacity(self, hackathon_id: str) -> int:
+        return self._capacity.get(hackathon_id, DEFAULT_CAPACITY)
+
+    def _rank(self, hackathon_id: str, user_id: str, skills) -> list:
+        postings = self._postings.get(hackathon_id, {})
+        counts = defaultdict(int)
+        for skill in skills:
+            for team_id in postings.get(skill, ()):
+                counts[team_id] += 1
+
+        capacity, teams = self.capacity(hackathon_id), self._teams
+        ranked = []
+        for team_id, count in counts.items():
+            entry = teams[team_id]
+            if len(entry["members"]) >= capacity or user_id in entry["members"] or user_id in entry["requests"]:
+                continue
+            ranked.append((-count, len(entry["roles"]) - count, team_id))
+        ranked.sort()
+        return ranked
+
+    def _describe(self, team_id: str, skills, capacity: int) -> dict:
+        entry = self._teams[team_id]
+        return {
+            "team_id": team_id,
+            "name": entry["name"],
+            "fills": sorted(label for role, label in entry["roles"].items() if role in skills),
+            "still_looking_for": sorted(label for role, label in entry["roles"].items() if role not in skills),
+            "members": len(entry["members"]),
+            "capacity": capacity,
+        }
+
+    def needs_me(self, hackathon_id: str, user_id: str, skills, offset: int = 0, limit: int = 20):
+        """(total, page) of open, non-full teams ranked by how many of their missing roles `skills` fill"""
+        self.stats["queries"] += 1
+        key = (hackathon_id, user_id)
+        version = self._versions.get(hackathon_id, 0)
+        cached = self._ranked.get(key)
+        if cached and cached[0] == version and cached[1] == skills:
+            self._ranked.move_to_end(key)
+            self.stats["ranked_hits"] += 1
+            ranked = cached[2]
+        else:
+            ranked = self._rank(hackathon_id, user_id, skills)
+            self._ranked[key] = (version, skills, ranked)
+            if len(self._ranked) > RANKED_CACHE_ENTRIES:
+                self._ranked.popitem(last=False)
+        # Only the requested page is materialized
+        capacity = self.capacity(hackathon_id)
+        return len(ranked), [self._describe(team_id, skills, capacity) for _, _, team_id in ranked[offset:offset + limit]]
+
+    # -- rebuild --
+    async def rebuild(self):
+        start = time.perf_counter()
+        self._journal = []
+
+        async def collect(collection, select):
+            docs = []
+            async for page in iter_documents(collection, [Query.select(select)]):
+                docs.extend(page)
+            return docs
+
+        try:
+            teams, users, hackathons = await asyncio.gather(
+                collect(settings.COLLECTION_TEAMS, ['$id', 'hackathon_id', 'name', 'leader_id', 'looking_for', 'members', 'join_requests', 'status']),
+                collect(settings.COLLECTION_USERS, ['$id', 'skills', 'tech_stack']),
+                collect(settings.COLLECTION_HACKATHONS, ['$id', 'max_team_size']),
+            )
+        except Exception:
+            self._journal = None
+            raise
+
+        journal, self._journal = self._journal, None
+        self._teams, self._postings, self._users, self._capacity = {}, defaultdict(lambda: defaultdict(set)), {}, {}
+        self._skill_users = defaultdict(set)
+        self._ranked.clear()
+        for hackathon in hackathons:
+            self._apply("capacity", hackathon['$id'], hackathon.get('max_team_size'))
+        for user in users:
+            # Direct assignment: listeners aren't told, the generation bump below invalidates everything
+            skills = self._users[user['$id']] = frozenset(
+                normalize(s) for s in (user.get('skills') or []) + (user.get('tech_stack') or []) if normalize(s)
+            )
+            for skill in skills:
+                self._skill_users[skill].add(user['$id'])
+        for team in teams:
+            self._link(team)
+        # Route edits that landed while we were paging are newer than what we read
+        for kind, key, value in journal:
+            self._apply(kind, key, value)
+
+        self.ready = True
+        self.generation += 1
+        self.stats["rebuilds"] += 1
+        self.stats["last_rebuild_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "teams": len(self._teams),
+            "open_roles": sum(len(postings) for postings in self._postings.values()),
+            "users": len(self._users),
+            "ranked_cached": len(self._ranked),
+            **self.stats,
+        }
+
+
+index = SkillIndex()
+
+
+async def user_skills(user_id: str):
+    """Normalized skills of a user: from the index, else one profile read"""
+    skills = index.skills_of(user_id)
+    if skills is not None:
+        return skills
+    index.stats["fallbacks"] += 1
+    doc = await asyncio.to_thread(
+        get_db_service().get_document,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_USERS,
+        document_id=user_id,
+        queries=[Query.select(['$id', 'skills', 'tech_stack'])]
+    )
+    index.put_user(user_id, doc.get('skills'), doc.get('tech_stack'))
+    return index.skills_of(user_id)
+
+
+async def maintain_skill_index():
+    """Lifespan task: build the index at startup, then refresh it periodically"""
+    while True:
+        try:
+            await (index.rebuild() if index.ready else cold_build(index.rebuild))
+        except Exception as e:
+            print(f"⚠️ skill index rebuild failed: {e}")
+        await asyncio.sleep(settings.SKILL_INDEX_REFRESH_SECONDS if index.ready else 5)
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from appwrite.query import Query
+
+from app.core.admission import TokenBucket, controller
+from app.core.config import settings
+from app.services import member_snapshots
+from app.services.appwrite import get_db_service, get_documents_by_ids, iter_documents
+from app.services.cache import get_cache
+from app.services.resilience import deadline_scope
+
+# Predictive cache warmer.
+#
+# Traffic on a hackathon spikes around its start and its submission deadline
+# (end_date), and stays high while it's live. The first wave used to land on
+# cold caches. Every WARM_INTERVAL_SECONDS this reads the hackathons' dates
+# and statuses, and for each one inside an event window (WARM_LEAD_MINUTES
+# either side of start / end, or status live) refreshes:
+#   hackathon             -> GET /api/hackathons/{id}
+#   hackathon_teams       -> GET /api/hackathons/{id}/teams
+#   hackathon_submissions -> GET /api/submissions/{id}
+#   user_names            -> members missing from the teams' member snapshots
+#
+# Warming needs a shared backend (CACHE_BACKEND=sqlite / network): a warmed
+# entry has to be one that every worker reads and that an update or status
+# change deletes for all of them. With the per-worker memory backend the
+# warmer doesn't start (the team and submission lists aren't cached there
+# either: judge_list reads them from Appwrite on every request).
+#
+# Warming never competes with live traffic: upstream loads are paced by a
+# token bucket (WARM_RATE_PER_SECOND), and the warmer pauses whenever
+# in-flight requests reach WARM_YIELD_LOAD of the browsing (low) admission limit.
+# Warm-hit ratios per namespace are in GET /api/system/cache.
+
+HACKATHON_TTL = 30
+TEAMS_TTL = 30
+SUBMISSIONS_TTL = 30
+LIVE_STATUSES = {"live", "ongoing"}
+
+
+# --- HOT READS (read-through loaders shared by the routes and the warmer) ---
+async def load_hackathon(hackathon_id: str) -> dict:
+    return await asyncio.to_thread(
+        get_db_service().get_document,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_HACKATHONS,
+        document_id=hackathon_id
+    )
+
+
+async def load_hackathon_teams(hackathon_id: str, select: Optional[list] = None) -> list:
+    queries = [Query.equal('hackathon_id', hackathon_id)]
+    if select:
+        queries.append(Query.select(select))
+    result = await asyncio.to_thread(
+        get_db_service().list_documents,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_TEAMS,
+        queries=queries
+    )
+    return result['documents']
+
+
+async def load_hackathon_submissions(hackathon_id: str) -> list:
+    """Newest first, each with `team_name` (team names batch-fetched by ID)"""
+    result = await asyncio.to_thread(
+        get_db_service().list_documents,
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.COLLECTION_SUBMISSIONS,
+        queries=[
+            Query.equal('hackathon_id', hackathon_id),
+            Query.order_desc('$createdAt')
+        ]
+    )
+    submissions = result['documents']
+    team_ids = list(set(sub['team_id'] for sub in submissions))
+    if team_ids:
+        # Fetch only names to save bandwidth
+        teams = await get_documents_by_ids(settings.COLLECTION_TEAMS, team_ids, select=['$id', 'name'])
+        team_map = {tid: t['name'] for tid, t in teams.items()}
+        for sub in submissions:
+            sub['team_name'] = team_map.get(sub['team_id'], "Unknown Team")
+    return submissions
+
+
+async def judge_list(namespace: str, hackathon_id: str, loader, ttl: float) -> list:
+    """hackathon_teams / hackathon_submissions: read-through on a shared cache, else straight from Appwrite"""
+    cache = get_cache()
+    if not cache.shared:
+        return await loader()
+    return await cache.get_or_set(namespace, hackathon_id, loader, ttl=ttl)
+
+
+async def forget_judge_list(namespace: str, hackathon_id: Optional[str]):
+    """Drop a cached team / submission list after a write that changes it"""
+    if hackathon_id:
+        await asyncio.to_thread(get_cache().delete, namespace, hackathon_id)
+
+
+# --- EVENT WINDOWS ---
+def parse_date(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        at = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+def event_window(hackathon: dict, now: datetime) -> Optional[str]:
+    """"live" / "start" / "deadline" if the hackathon is in (or about to enter) a traffic burst, else None"""
+    if hackathon.get('status') in LIVE_STATUSES:
+        return "live"
+    lead = timedelta(minutes=settings.WARM_LEAD_MINUTES)
+    for window, field in (("start", "start_date"), ("deadline", "end_date")):
+        at = parse_date(hackathon.get(field))
+        if at and at - lead <= now <= at + lead:
+            return window
+    return None
+
+
+# --- WARMER ---
+class CacheWarmer:
+    def __init__(self):
+        self.rate = settings.WARM_RATE_PER_SECOND
+        self.bucket = TokenBucket(self.rate)  # burst: one second's worth of loads
+        self.windows = {}  # hackathon_id -> window, from the last cycle
+        self.stats = {"cycles": 0, "loads": 0, "skipped": 0, "yields": 0, "errors": 0, "last_cycle_ms": None}
+
+    async def _throttle(self):
+        while (wait := self.bucket.take(self.rate, self.rate)) > 0:
+            await asyncio.sleep(wait)
+        # Live traffic first: wait for in-flight requests to drop below the yield threshold
+        while controller.in_flight >= controller.limits["low"] * settings.WARM_YIELD_LOAD:
+            self.stats["yields"] += 1
+            await asyncio.sleep(0.25)
+
+    async def _warm(self, namespace: str, key: str, loader, ttl: float, refresh: bool = True):
+        await self._throttle()
+        try:
+            with deadline_scope(settings.REQUEST_DEADLINE_SECONDS, reset=True):
+                value = await get_cache().warm(
+                    namespace, key, loader, ttl,
+                    refresh=refresh, claim_ttl=settings.WARM_INTERVAL_SECONDS / 2
+                )
+        except Exception:
+            self.stats["errors"] += 1
+            return None
+        self.stats["loads" if value is not None else "skipped"] += 1
+        return value
+
+    async def warm_hackathon(self, hackathon_id: str):
+        await self._warm("hackathon", hackathon_id, lambda: load_hackathon(hackathon_id), HACKATHON_TTL)
+        teams = await self._warm("hackathon_teams", hackathon_id, lambda: load_hackathon_teams(hackathon_id), TEAMS_TTL)
+        await self._warm(
+            "hackathon_submissions", hackathon_id, lambda: load_hackathon_submissions(hackathon_id), SUBMISSIONS_TTL
+        )
+        # Team views render names from member snapshots; only users missing there are looked up
+        missing = {
+            uid for team in teams or []
+            for uid in (team.get('members') or []) + (team.get('join_requests') or [])
+            if uid not in member_snapshots.parse(team)
+        }
+        for uid in missing:
+            await self._warm(
+                "user_names", uid, lambda uid=uid: member_snapshots.load_user_name(uid),
+                member_snapshots.USER_NAME_TTL, refresh=False
+            )
+
+    async def run_cycle(self):
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        windows = {}
+        with deadline_scope(settings.REQUEST_DEADLINE_SECONDS * 3, reset=True):
+            async for page in iter_documents(
+                settings.COLLECTION_HACKATHONS,
+                [Query.select(['$id', 'status', 'start_date', 'end_date'])]
+            ):
+                for hackathon in page:
+                    window = event_window(hackathon, now)
+                    if window:
+                        windows[hackathon['$id']] = window
+        self.windows = windows
+        for hackathon_id in windows:
+            await self.warm_hackathon(hackathon_id)
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def snapshot(self) -> dict:
+        return {"enabled": settings.WARM_ENABLED and get_cache().shared, "in_window": self.windows, **self.stats}
+
+
+warmer = CacheWarmer()
+
+
+async def maintain_warmer():
+    """Lifespan task: a warm cycle every WARM_INTERVAL_SECONDS (shared cache backends only)"""
+    if not get_cache().shared:
+        print("⚠️ cache warmer off: CACHE_BACKEND=memory is per worker, warming needs sqlite or network")
+        return
+    while True:
+        try:
+            await warmer.run_cycle()
+        except Exception as e:
+            print(f"⚠️ cache warm cycle failed: {e}")
+        await asyncio.sleep(settings.WARM_INTERVAL_SECONDS)
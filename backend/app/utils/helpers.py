@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Optional
+
+# `fields=` query parameter: comma-separated attribute names
+FIELDS_PATTERN = r"^[A-Za-z0-9_$]+(,[A-Za-z0-9_$]+)*$"
+
+# Pool workers must not fork the running server (its event loop, threads, locks
+# and sockets): forkserver starts them from a clean process, spawn where it's missing
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def chunked(iterable, size: int):
+    """Yield lists of at most `size` items (Appwrite caps Query.equal arrays at 100 values)"""
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+async def process_map(fn, items: list, workers: int) -> list:
+    """
+    fn(chunk) -> list over ~4 chunks per worker on a process pool, results
+    concatenated in order. fn must be a module-level function (picklable,
+    importable by a fresh interpreter: workers don't inherit the server's state).
+    """
+    size = max(1, -(-len(items) // (workers * 4)))
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT) as pool:
+        parts = await asyncio.gather(*[loop.run_in_executor(pool, fn, chunk) for chunk in chunked(items, size)])
+    return [item for part in parts for item in part]
+
+
+def deterministic_id(*parts) -> str:
+    """
+    Stable Appwrite document ID derived from `parts`. Replaying the same write
+    hits the same ID -> 409 instead of a duplicate document.
+    Appwrite IDs: max 36 chars, [a-zA-Z0-9._-], must not start with a special char.
+    """
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+    return "d" + digest[:35]
+
+
+def is_conflict(e: Exception) -> bool:
+    """Appwrite 409: the document ID already exists (AppwriteException.code, never the message text)"""
+    return getattr(e, "code", None) == 409
+
+
+def select_fields(fields: Optional[str], *required: str) -> Optional[list]:
+    """
+    `fields=name,status` -> attribute list for Query.select, with $id and
+    `required` always included. None (no projection) when fields is empty.
+    """
+    if not fields:
+        return None
+    return list(dict.fromkeys(["$id", *required, *fields.split(",")]))
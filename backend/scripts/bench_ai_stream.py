@@ -0,0 +1,108 @@
+"""
+Time-to-first-byte benchmark for the streaming AI summaries (SSE).
+
+Serves app.main.app with uvicorn on a local port (lifespan off: no Appwrite
+needed) with AI_SUMMARY_PROVIDER=stub, a local generator emitting --tokens
+words, one every --token-ms. Over real HTTP it measures, per request:
+  - TTFB:  time to the first `token` event
+  - total: time to the `done` event, i.e. what a blocking endpoint would make
+           the client wait before showing anything
+  - cached replay of a finished summary (served from the summary cache)
+  - disconnect: the client drops the stream after the first token; reports
+                how many tokens the generator still produced afterwards and
+                whether the stream was counted as cancelled (not cached)
+
+Usage (from backend/):
+    python scripts/bench_ai_stream.py --runs 5 --tokens 60 --token-ms 30
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import gemini  # noqa: E402
+
+
+def serve():
+    from app.main import app
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def summarize(client, text, stop_after_first=False):
+    """(ttfb_ms, total_ms, done event)"""
+    start = time.perf_counter()
+    ttfb, event = None, None
+    with client.stream("POST", "/api/ai/summarize", json={"text": text}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: ") and event == "token" and ttfb is None:
+                ttfb = (time.perf_counter() - start) * 1000
+                if stop_after_first:
+                    return ttfb, None, None
+            elif line.startswith("data: ") and event == "done":
+                return ttfb, (time.perf_counter() - start) * 1000, json.loads(line[6:])
+    raise RuntimeError("stream ended without a done event")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--token-ms", type=float, default=30)
+    args = parser.parse_args()
+    settings.AI_SUMMARY_PROVIDER = "stub"
+    settings.AI_STUB_TOKENS, settings.AI_STUB_TOKEN_MS = args.tokens, args.token_ms
+    settings.RATE_LIMIT_PER_SECOND = 0
+
+    produced = [0]
+    stub = gemini._stub_chunks
+
+    def counting(text):
+        for part in stub(text):
+            produced[0] += 1
+            yield part
+    gemini._stub_chunks = counting
+
+    text = lambda i: " ".join(f"word{i}_{k}" for k in range(args.tokens))
+    with httpx.Client(base_url=serve(), timeout=30) as client:
+        fresh = [summarize(client, text(i)) for i in range(args.runs)]
+        print(f"stream ({args.tokens} tokens x {args.token_ms:g} ms): "
+              f"TTFB p50={statistics.median(r[0] for r in fresh):6.1f} ms, "
+              f"done p50={statistics.median(r[1] for r in fresh):7.1f} ms (a blocking endpoint answers only then)")
+        cached = [summarize(client, text(i)) for i in range(args.runs)]
+        print(f"cached replay: TTFB p50={statistics.median(r[0] for r in cached):6.1f} ms, "
+              f"cached={all(r[2]['cached'] for r in cached)}")
+
+        before = produced[0]
+        summarize(client, text(args.runs), stop_after_first=True)
+        time.sleep(args.token_ms * 10 / 1000)
+        after_drop = produced[0] - before
+        time.sleep(args.token_ms * args.tokens / 1000)
+        ttfb, _, done = summarize(client, text(args.runs))
+        print(f"disconnect after the first token: generator produced {after_drop} tokens, "
+              f"{produced[0] - before - after_drop - args.tokens} more after that; "
+              f"cancelled={gemini.streamer.stats['cancelled']}, re-request cached={done['cached']}")
+        print(gemini.streamer.snapshot())
+
+
+if __name__ == "__main__":
+    main()
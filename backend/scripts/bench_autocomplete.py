@@ -0,0 +1,106 @@
+"""
+Benchmark for the typeahead index (sorted keys + precomputed heavy-prefix top lists).
+
+Generates --terms distinct synthetic skill-like terms (letters drawn with
+English-like frequencies, so short prefixes are very uneven) with Zipf
+popularity weights. Measures:
+  - build:   sort + top lists for every prefix matching more than
+             AUTOCOMPLETE_SCAN_LIMIT terms
+  - query:   Autocomplete.complete() for --queries prefixes of 1-4 characters
+             taken from random terms (the path behind GET /api/autocomplete/{kind}
+             minus HTTP); p50 / p99 / max
+  - writes:  incremental weight changes (+1 / -1 on existing terms, new terms)
+             as the profile / team / hackathon routes apply them, followed by
+             queries that have to recompute an invalidated top list
+  - scan:    the same query as a filter over every term + top-k, for comparison
+
+Usage (from backend/):
+    python scripts/bench_autocomplete.py --terms 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services import autocomplete as ac  # noqa: E402
+
+_LETTERS = string.ascii_lowercase
+_FREQ = [8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.2, 0.8, 4.0, 2.4,
+         6.7, 7.5, 1.9, 0.1, 6.0, 6.3, 9.1, 2.8, 1.0, 2.4, 0.2, 2.0, 0.1]
+
+
+def synthetic(n, rng):
+    terms = set()
+    while len(terms) < n:
+        word = "".join(rng.choices(_LETTERS, _FREQ, k=rng.randint(3, 12)))
+        if rng.random() < 0.2:
+            word += " " + "".join(rng.choices(_LETTERS, _FREQ, k=rng.randint(2, 8)))
+        terms.add(word)
+    terms = list(terms)
+    rng.shuffle(terms)
+    return {term: max(1, int(100000 / (rank + 1) ** 0.9)) for rank, term in enumerate(terms)}
+
+
+def percentiles(latencies):
+    latencies.sort()
+    return (f"p50={statistics.median(latencies) * 1000:6.1f} us  "
+            f"p99={latencies[int(0.99 * len(latencies))] * 1000:6.1f} us  max={latencies[-1] * 1000:7.1f} us")
+
+
+def timed(fn, args):
+    latencies = []
+    for a in args:
+        t = time.perf_counter()
+        fn(*a)
+        latencies.append((time.perf_counter() - t) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    weights = synthetic(args.terms, rng)
+
+    index = ac.Autocomplete()
+    vocab = index._vocabs["skills"]
+    start = time.perf_counter()
+    vocab.weights = weights
+    vocab.labels = {term: term for term in weights}
+    vocab.keys = sorted(weights)
+    vocab.build_tops()
+    print(f"build {args.terms} terms: {time.perf_counter() - start:5.2f}s, "
+          f"{len(vocab.tops)} heavy prefixes (> {settings.AUTOCOMPLETE_SCAN_LIMIT} terms)")
+
+    keys = vocab.keys
+    prefixes = [(rng.choice(keys)[:rng.randint(1, 4)],) for _ in range(args.queries)]
+    complete = lambda prefix: index.complete("skills", prefix, args.limit)
+    timed(complete, prefixes[:1000])  # warm up
+    print(f"query ({args.queries} prefixes of 1-4 chars): {percentiles(timed(complete, prefixes))}")
+
+    existing = [rng.choice(keys) for _ in range(args.writes)]
+    changes = [(key, None, rng.choice((1, -1))) for key in existing]
+    changes += [("".join(rng.choices(_LETTERS, k=rng.randint(4, 10))), None, 1) for _ in range(args.writes // 5)]
+    rng.shuffle(changes)
+    print(f"writes ({len(changes)}: +-1 on existing terms, new terms): {percentiles(timed(vocab.add, changes))}")
+    print(f"query after writes: {percentiles(timed(complete, prefixes))}")
+
+    def scan(prefix):
+        ac.heapq.nsmallest(args.limit, [k for k in keys if k.startswith(prefix)], key=vocab._rank)
+
+    sample = prefixes[:50]
+    print(f"full scan ({len(sample)} prefixes): {percentiles(timed(scan, sample))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cold-start benchmark: wall time from spawning the server process to the
+first successfully served request.
+
+Each run starts a fresh `uvicorn app.main:app` process, polls `GET /` until it
+answers 200 and records:
+  - spawn_to_first_ms : measured here, from Popen() to the first 200
+  - app_uptime_ms     : reported by the app (from `import app.main` to the response)
+
+The Appwrite endpoint defaults to an unroutable local port so the numbers
+measure our own startup path rather than network latency; pass --real-upstream
+to use the values from .env instead.
+
+Usage (from backend/):
+    python scripts/bench_cold_start.py --runs 10
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_once(real_upstream: bool, timeout: float = 30.0):
+    port = _free_port()
+    env = dict(os.environ)
+    if not real_upstream:
+        env["APPWRITE_ENDPOINT"] = "http://127.0.0.1:9/v1"
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    body = json.loads(resp.read())
+                    return (time.perf_counter() - start) * 1000, body.get("uptime_ms")
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError("server did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--real-upstream", action="store_true")
+    args = parser.parse_args()
+
+    spawn, uptime = [], []
+    for i in range(args.runs):
+        total_ms, app_ms = run_once(args.real_upstream)
+        spawn.append(total_ms)
+        uptime.append(app_ms or 0.0)
+        print(f"run {i + 1}: spawn_to_first={total_ms:.1f} ms  app_uptime={app_ms:.1f} ms")
+
+    print()
+    print(f"spawn_to_first_ms  median={statistics.median(spawn):.1f}  max={max(spawn):.1f}")
+    print(f"app_uptime_ms      median={statistics.median(uptime):.1f}  max={max(uptime):.1f}")
+
+
+if __name__ == "__main__":
+    main()
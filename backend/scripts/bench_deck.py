@@ -0,0 +1,81 @@
+"""
+Benchmark for the lobby swipe deck.
+
+Indexes --users synthetic users (2-8 of --roles skills each) and --teams teams,
+then measures:
+  - deck build: rank every user for one team (first lobby view / after a team change)
+  - page:       next 10 cards past --swiped swipes (Bloom filter lookups)
+  - rescore:    one profile change applied to every kept deck
+  - Bloom filter size and measured false-positive rate at --swiped swipes,
+    next to a plain set of the same swipe keys
+
+Usage (from backend/):
+    python scripts/bench_deck.py --users 50000 --teams 200 --swiped 1000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.deck import BloomFilter, DeckService  # noqa: E402
+from app.services.skill_index import index  # noqa: E402
+
+
+def timed(fn, runs):
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--roles", type=int, default=40)
+    parser.add_argument("--swiped", type=int, default=1000)
+    args = parser.parse_args()
+    rng = random.Random(11)
+    roles = [f"Skill {i}" for i in range(args.roles)]
+
+    for u in range(args.users):
+        index.put_user(f"user{u}", rng.sample(roles, rng.randint(2, 8)))
+    for t in range(args.teams):
+        index.put_team({
+            "$id": f"team{t}", "hackathon_id": "h1", "leader_id": f"user{t}",
+            "members": [f"user{t}"], "looking_for": rng.sample(roles, rng.randint(1, 3)),
+        })
+    deck = DeckService()
+    index.on_user_change(deck.on_user_change)
+
+    p50, worst = timed(lambda t: deck.deck(f"team{t}"), args.teams)
+    print(f"deck build ({args.users} users)   p50={p50:8.2f} ms  max={worst:8.2f} ms  (DECK_SIZE={settings.DECK_SIZE})")
+
+    seen = BloomFilter(settings.DECK_SEEN_CAPACITY, settings.DECK_SEEN_ERROR_RATE)
+    for _, uid in deck.deck("team0").ranked[:args.swiped]:
+        seen.add(f"team0:{uid}")
+    for i in range(args.swiped - len(seen)):
+        seen.add(f"team0:other{i}")
+    p50, worst = timed(lambda _: deck.next_cards("team0", seen, 10), 200)
+    print(f"next page past {len(seen)} swipes  p50={p50:8.2f} ms  max={worst:8.2f} ms")
+
+    p50, worst = timed(lambda i: index.put_user(f"user{args.teams + i}", rng.sample(roles, 4)), 200)
+    print(f"rescore in {len(deck._decks)} decks       p50={p50:8.2f} ms  max={worst:8.2f} ms")
+
+    probes = 100000
+    false_positives = sum(f"team0:probe{i}" in seen for i in range(probes))
+    plain = {f"team0:user{i}" for i in range(len(seen))}
+    print(f"bloom: {len(seen)} swipes in {len(seen.dumps())} bytes "
+          f"(set: {len(json.dumps(sorted(plain)))} bytes), false positives {false_positives / probes:.3%}")
+
+
+if __name__ == "__main__":
+    main()
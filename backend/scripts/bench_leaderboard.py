@@ -0,0 +1,71 @@
+"""
+Benchmark for the in-memory XP leaderboard at 1M users.
+
+Builds the Fenwick-tree leaderboard from a skewed xp distribution (most
+builders have little XP, a long tail has a lot), checks it against a full
+sort, then times rank-of-user, top-N pages, around-me windows and updates.
+
+Usage (from backend/):
+    python scripts/bench_leaderboard.py --users 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.leaderboard import Leaderboard  # noqa: E402
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return f"p50 {statistics.median(samples):6.1f} µs   p99 {samples[int(len(samples) * 0.99)]:6.1f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--max-xp", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    users = [
+        (f"u{i:07d}", int(rng.paretovariate(1.2) * 50) - 50, round(rng.uniform(0, 20), 2))
+        for i in range(args.users)
+    ]
+
+    board = Leaderboard(args.max_xp)
+    start = time.perf_counter()
+    board.load(users)
+    print(f"build: {len(board):,} users in {time.perf_counter() - start:.2f}s")
+
+    expected = sorted(users, key=lambda u: (-u[1], -u[2], u[0]))
+    sample = rng.sample(range(len(expected)), 1000)
+    assert all(board.rank(expected[i][0]) == i + 1 for i in sample), "rank mismatch"
+    assert [e["user_id"] for e in board.page(12_345, 50)] == [u[0] for u in expected[12_345:12_395]], "page mismatch"
+    print("correctness vs full sort: ok")
+
+    ids = [rng.choice(users)[0] for _ in range(args.queries)]
+    print(f"rank(user):         {timed(board.rank, [(uid,) for uid in ids])}")
+    print(f"top 50 (page 1):    {timed(board.page, [(0, 50)] * 2000)}")
+    print(f"page 50 @ random:   {timed(board.page, [(rng.randrange(len(users)), 50) for _ in range(2000)])}")
+    print(f"around-me (±5):     {timed(board.around, [(uid, 5) for uid in ids[:5000]])}")
+    print(f"update (xp change): {timed(board.update, [(uid, rng.randint(0, 5000), 1.0) for uid in ids])}")
+
+    start = time.perf_counter()
+    ranked = sorted(users, key=lambda u: (-u[1], -u[2], u[0]))
+    [u[0] for u in ranked].index(ids[0])
+    print(f"baseline (sort per request): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for the "teams that need me" skill index.
+
+Builds a SkillIndex over --teams synthetic teams in one hackathon (each looking
+for 1-4 of --roles roles) and --users users with 2-8 skills each, then times
+needs_me() for --queries random users:
+  - cold:  first page, ranked list computed (posting-list merge + sort)
+  - warm:  a later page of the same user, served from the ranked-list cache
+and, for comparison, the old path: filter every team document in Python.
+
+Usage (from backend/):
+    python scripts/bench_needs_me.py --teams 5000 --users 50000 --roles 40
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.skill_index import SkillIndex, normalize  # noqa: E402
+
+
+def timed(fn, runs):
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--roles", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    roles = [f"Role {i}" for i in range(args.roles)]
+
+    teams = [
+        {
+            "$id": f"team{i}", "hackathon_id": "h1", "name": f"Team {i}",
+            "looking_for": rng.sample(roles, rng.randint(1, 4)),
+            "members": [f"m{i}_{j}" for j in range(rng.randint(1, 4))],
+            "status": "open" if rng.random() < 0.8 else "closed",
+        }
+        for i in range(args.teams)
+    ]
+    index = SkillIndex()
+    start = time.perf_counter()
+    index.set_capacity("h1", 4)
+    for team in teams:
+        index.put_team(team)
+    for u in range(args.users):
+        index.put_user(f"user{u}", rng.sample(roles, rng.randint(2, 8)))
+    print(f"built index: {args.teams} teams, {args.users} users in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    picks = [f"user{rng.randrange(args.users)}" for _ in range(args.queries)]
+
+    def old(i):
+        skills = index.skills_of(picks[i])
+        matches = []
+        for team in teams:
+            fills = [r for r in team["looking_for"] if normalize(r) in skills]
+            if team["status"] == "open" and len(team["members"]) < 4 and fills:
+                matches.append((-len(fills), team["$id"]))
+        sorted(matches)[:20]
+
+    p50, p99 = timed(old, args.queries)
+    print(f"scan all teams   p50={p50:7.3f} ms  p99={p99:7.3f} ms")
+    p50, p99 = timed(lambda i: index.needs_me("h1", picks[i], index.skills_of(picks[i]), 0, 20), args.queries)
+    print(f"index (cold)     p50={p50:7.3f} ms  p99={p99:7.3f} ms")
+    p50, p99 = timed(lambda i: index.needs_me("h1", picks[i], index.skills_of(picks[i]), 20, 20), args.queries)
+    print(f"index (page 2)   p50={p50:7.3f} ms  p99={p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark for the submission plagiarism pipeline (MinHash + LSH).
+
+Generates --submissions synthetic submissions for the current hackathon and
+--history for earlier ones (60-150 words from a Zipf-like vocabulary), then
+plants --planted copies of random submissions with 5-40% of their words
+replaced, plus --shared-repos pairs that only share a repo link. Measures:
+  - sketching: inline, or on the process pool with --pool
+  - LSH + exact verification (find_pairs)
+  - recall: planted copies at Jaccard >= PLAGIARISM_MIN_SIMILARITY that were
+            reported, and planted repo pairs reported
+  - brute force: exact Jaccard over every current x (current + history) pair,
+                 timed on a sample and extrapolated
+
+Usage (from backend/):
+    python scripts/bench_plagiarism.py --submissions 1000 --history 20000
+    python scripts/bench_plagiarism.py --submissions 1000 --history 20000 --pool   # multi-core hosts
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services import plagiarism  # noqa: E402
+
+
+def synthetic(args, rng):
+    vocab = [f"w{i}" for i in range(5000)]
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+
+    def text():
+        return " ".join(rng.choices(vocab, weights, k=rng.randint(60, 150)))
+
+    docs = [(f"h{i}", f"old{i % 50}", f"ht{i}", f"Project {i}", text(), []) for i in range(args.history)]
+    docs += [(f"c{i}", "cur", f"t{i}", f"Entry {i}", text(), []) for i in range(args.submissions)]
+    planted, repos = [], []
+    for p in range(args.planted):
+        source = rng.choice(docs)
+        words = source[4].split()
+        for k in rng.sample(range(len(words)), int(len(words) * rng.uniform(0.05, 0.4))):
+            words[k] = rng.choice(vocab)
+        docs.append((f"copy{p}", "cur", f"copier{p}", f"Copy {p}", " ".join(words), []))
+        planted.append((f"copy{p}", source[0], source[4]))
+    for p in range(args.shared_repos):
+        a, b = f"repo_a{p}", f"repo_b{p}"
+        docs.append((a, "cur", f"ra{p}", "Repo A", text(), [f"https://github.com/team{p}/app"]))
+        docs.append((b, "cur", f"rb{p}", "Repo B", text(), [f"github.com/Team{p}/app.git"]))
+        repos.append((a, b))
+    return docs, planted, repos
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--planted", type=int, default=100)
+    parser.add_argument("--shared-repos", type=int, default=20)
+    parser.add_argument("--pool", action="store_true", help="sketch on the process pool (PLAGIARISM_WORKERS / cpu_count)")
+    args = parser.parse_args()
+    rng = random.Random(5)
+    docs, planted, repos = synthetic(args, rng)
+    settings.PLAGIARISM_POOL_MIN_DOCS = 0 if args.pool else len(docs) + 1
+    checker = plagiarism.PlagiarismChecker()
+
+    start = time.perf_counter()
+    sketched = asyncio.run(checker._sketch(docs))
+    sketch_s = time.perf_counter() - start
+    current = [s for s in sketched if s[1] == "cur"]
+    history = [s for s in sketched if s[1] != "cur"]
+
+    start = time.perf_counter()
+    pairs = plagiarism.find_pairs(current, history, settings.PLAGIARISM_MIN_SIMILARITY, checker.stats)
+    pairs_s = time.perf_counter() - start
+    print(f"sketch {len(docs)} submissions: {sketch_s:5.2f}s ({'pool' if checker.stats['last_run_pool'] else 'inline'}), "
+          f"LSH + verify: {pairs_s * 1000:6.0f} ms, candidates={checker.stats['candidates']}, reported={len(pairs)}")
+
+    reported = defaultdict(set)
+    for pair in pairs:
+        reported[pair["a"]["submission_id"]].add(pair["b"]["submission_id"])
+        reported[pair["b"]["submission_id"]].add(pair["a"]["submission_id"])
+    shingle = {d[0]: plagiarism.shingles(d[3], d[4], d[5]) for d in docs}
+    due = [(c, s) for c, s, _ in planted if jaccard(shingle[c], shingle[s]) >= settings.PLAGIARISM_MIN_SIMILARITY]
+    found = sum(1 for c, s in due if s in reported[c])
+    print(f"planted copies at Jaccard >= {settings.PLAGIARISM_MIN_SIMILARITY}: {found}/{len(due)} reported; "
+          f"shared repos: {sum(1 for a, b in repos if b in reported[a])}/{len(repos)} reported")
+
+    sample = [d[0] for d in docs if d[1] == "cur"][:20]
+    start = time.perf_counter()
+    for c in sample:
+        for d in docs:
+            if d[0] != c:
+                jaccard(shingle[c], shingle[d[0]])
+    per_query = (time.perf_counter() - start) / len(sample)
+    print(f"brute force: {per_query * 1000:.0f} ms per submission -> "
+          f"{per_query * len(current):.1f}s for the hackathon")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Memory benchmark: raw Appwrite documents vs compact records (app/models/records.py).
+
+Generates --docs synthetic users, teams and hackathons shaped like Appwrite
+documents (system keys, permissions, skills / tags from a shared vocabulary)
+and parses each from its own JSON text, as the SDK does. Measures with
+tracemalloc, per document:
+  - raw:     the parsed dicts, kept resident
+  - record:  the same documents as records (raw dicts dropped)
+  - pickled: bytes stored per document in the cache (pickle), raw vs record
+plus from_document() / to_api() time per document, and checks every record
+round-trips to the same API dict.
+
+Usage (from backend/):
+    python scripts/bench_records.py --docs 100000
+"""
+import argparse
+import gc
+import json
+import os
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.records import HackathonRecord, TeamRecord, UserRecord  # noqa: E402
+
+SKILLS = [f"skill-{i}" for i in range(300)]
+TAGS = ["ai", "web3", "climate", "health", "fintech", "edtech", "open source", "gaming", "iot", "security"]
+
+
+def system(rng, collection, i):
+    doc_id = f"{rng.getrandbits(80):020x}"
+    return {
+        "$id": doc_id, "$sequence": i, "$collectionId": collection, "$databaseId": "hackconnect",
+        "$createdAt": f"2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T12:{rng.randint(10, 59)}:00.000+00:00",
+        "$updatedAt": f"2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T13:{rng.randint(10, 59)}:00.000+00:00",
+        "$permissions": [f'read("user:{doc_id}")', f'update("user:{doc_id}")', f'delete("user:{doc_id}")'],
+    }
+
+
+def user(rng, i):
+    return {**system(rng, "users", i),
+            "username": f"user{i}", "account_id": f"{rng.getrandbits(80):020x}", "role": "participant",
+            "bio": f"Hi! I'm user {i}, I like building things with friends.",
+            "avatar_url": f"https://cdn.example.com/avatars/{i}.png", "github_url": f"https://github.com/user{i}",
+            "portfolio_url": None, "skills": rng.sample(SKILLS, rng.randint(3, 8)),
+            "tech_stack": rng.sample(SKILLS, rng.randint(2, 6)), "xp": rng.randint(0, 5000),
+            "reputation_score": round(rng.random() * 100, 2), "email": f"user{i}@example.com", "name": f"User {i}"}
+
+
+def team(rng, i, hackathon_ids, user_ids):
+    members = rng.sample(user_ids, rng.randint(1, 4))
+    return {**system(rng, "teams", i),
+            "hackathon_id": rng.choice(hackathon_ids), "name": f"Team {i}",
+            "description": "We are building a tool that helps students find teammates.",
+            "leader_id": members[0], "members": members, "join_requests": rng.sample(user_ids, rng.randint(0, 2)),
+            "looking_for": rng.sample(SKILLS, rng.randint(1, 3)), "tech_stack": rng.sample(SKILLS, rng.randint(2, 5)),
+            "status": rng.choice(["open", "closed", "full"]), "project_repo": f"https://github.com/team{i}/app"}
+
+
+def hackathon(rng, i):
+    return {**system(rng, "hackathons", i),
+            "name": f"Hack {i}", "description": "Build something great in 48 hours. " * 4,
+            "start_date": "2025-06-01T09:00:00.000+00:00", "end_date": "2025-06-03T18:00:00.000+00:00",
+            "location": rng.choice(["Online", "Pune", "Bangalore", "Delhi"]), "tags": rng.sample(TAGS, 3),
+            "organizer_id": f"{rng.getrandbits(80):020x}", "prize_pool": "$10,000",
+            "registration_link": f"https://example.com/hack{i}", "image_url": f"https://cdn.example.com/h/{i}.png",
+            "status": rng.choice(["draft", "open", "closed"]), "min_team_size": 1, "max_team_size": 4,
+            "mode": rng.choice(["online", "offline", "hybrid"]), "tagline": "Code. Ship. Win."}
+
+
+def resident_bytes(build):
+    """(object, bytes still allocated for it) - the JSON texts are freed before measuring"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000, help="documents per type")
+    args = parser.parse_args()
+    rng = random.Random(11)
+    hackathon_ids = [f"{rng.getrandbits(80):020x}" for _ in range(max(1, args.docs // 50))]
+    user_ids = [f"{rng.getrandbits(80):020x}" for _ in range(args.docs)]
+    texts = {
+        "users": [json.dumps(user(rng, i)) for i in range(args.docs)],
+        "teams": [json.dumps(team(rng, i, hackathon_ids, user_ids)) for i in range(args.docs)],
+        "hackathons": [json.dumps(hackathon(rng, i)) for i in range(args.docs)],
+    }
+    record_types = {"users": UserRecord, "teams": TeamRecord, "hackathons": HackathonRecord}
+
+    print(f"{'':>10} {'raw B/doc':>10} {'record B/doc':>13} {'ratio':>6} {'pickle raw':>11} {'pickle rec':>11} "
+          f"{'from_document':>14} {'to_api':>8}")
+    for kind, docs in texts.items():
+        cls = record_types[kind]
+        raw, raw_bytes = resident_bytes(lambda: [json.loads(t) for t in docs])
+        del raw
+        records, record_bytes = resident_bytes(lambda: [cls.from_document(json.loads(t)) for t in docs])
+
+        parsed = [json.loads(t) for t in docs[:10000]]
+        start = time.perf_counter()
+        converted = [cls.from_document(d) for d in parsed]
+        from_us = (time.perf_counter() - start) / len(parsed) * 1e6
+        start = time.perf_counter()
+        api = [r.to_api() for r in converted]
+        to_us = (time.perf_counter() - start) / len(parsed) * 1e6
+        assert all(cls.from_document(a) == r for a, r in zip(api, converted)), "round trip changed a record"
+
+        pickled_raw = sum(len(pickle.dumps(d, pickle.HIGHEST_PROTOCOL)) for d in parsed) / len(parsed)
+        pickled_rec = sum(len(pickle.dumps(r, pickle.HIGHEST_PROTOCOL)) for r in converted) / len(parsed)
+        n = len(docs)
+        print(f"{kind:>10} {raw_bytes / n:10.0f} {record_bytes / n:13.0f} {raw_bytes / record_bytes:5.1f}x "
+              f"{pickled_raw:11.0f} {pickled_rec:11.0f} {from_us:11.1f} us {to_us:5.1f} us")
+        del records
+
+
+if __name__ == "__main__":
+    main()
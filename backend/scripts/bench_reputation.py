@@ -0,0 +1,84 @@
+"""
+Throughput benchmark for the XP & reputation engine.
+
+Writes a synthetic event log (mixed team / submission / score events over a
+pool of users) through ReputationEngine.record, then times:
+  - a full deterministic recompute (replay of the whole log)
+  - incremental catch_up over a freshly appended tail
+and checks that incremental folding and recompute agree.
+
+Usage (from backend/):
+    python scripts/bench_reputation.py --events 2000000 --users 80000
+    python scripts/bench_reputation.py --log /tmp/hackconnect/reputation.log --recompute-only
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.reputation import RULES, ReputationEngine  # noqa: E402
+
+KINDS = list(RULES)
+WEIGHTS = [30, 5, 1, 10, 54]  # scores dominate: several judges per submission
+
+
+def generate(engine, events, users, seed=11, batch=1000):
+    rng = random.Random(seed)
+    user_ids = [f"u{i:07d}" for i in range(users)]
+    written = 0
+    while written < events:
+        n = min(batch, events - written)
+        kinds = rng.choices(KINDS, WEIGHTS, k=n)
+        # record() takes one kind per call; group a batch per kind to keep writes large
+        for kind in KINDS:
+            ids = [rng.choice(user_ids) for k in kinds if k == kind]
+            for uid in ids:
+                value = rng.randint(0, 30) if kind == "score_received" else 0
+                engine.record(kind, [uid], ref="t1", value=value)
+        written += n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=80_000)
+    parser.add_argument("--log", help="existing log to replay instead of a synthetic one")
+    parser.add_argument("--recompute-only", action="store_true")
+    args = parser.parse_args()
+
+    path = args.log or os.path.join(tempfile.mkdtemp(prefix="reputation-bench-"), "reputation.log")
+    engine = ReputationEngine(path)
+
+    if not args.log:
+        start = time.perf_counter()
+        generate(engine, args.events, args.users)
+        print(f"generated {args.events:,} events in {time.perf_counter() - start:.1f}s ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    start = time.perf_counter()
+    totals = engine.recompute()
+    elapsed = time.perf_counter() - start
+    events = sum(1 for _ in open(path))
+    print(f"recompute: {events:,} events, {len(totals):,} users in {elapsed:.2f}s "
+          f"-> {events / elapsed * 60 / 1e6:.1f}M events/min")
+    if args.recompute_only:
+        return
+
+    # Incremental: fold the first part, append a tail, catch_up again
+    start = time.perf_counter()
+    engine.catch_up()
+    print(f"catch_up (cold, whole log): {time.perf_counter() - start:.2f}s")
+    generate(engine, 10_000, args.users, seed=99)
+    start = time.perf_counter()
+    applied = engine.catch_up()
+    print(f"catch_up (10k new events): {applied:,} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    assert engine.totals == engine.recompute(), "incremental totals diverged from recompute"
+    print("incremental == recompute: ok")
+
+
+if __name__ == "__main__":
+    main()
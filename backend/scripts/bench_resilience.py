@@ -0,0 +1,117 @@
+"""
+Fault-injection benchmark for the upstream resilience layer.
+
+A local stand-in for Appwrite's Databases service answers most reads in
+~20 ms but stalls for seconds on a fraction of calls and fails others with
+503s. A stall ends at the attempt's HTTP timeout, as a socket read would. The same workload runs against the raw stand-in and through
+ResilientService (deadline + retries + hedging); the tail latency of the
+resilient path is bounded by the request deadline.
+
+Usage (from backend/):
+    python scripts/bench_resilience.py --calls 400 --stall-rate 0.05 --error-rate 0.05
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from requests.exceptions import ReadTimeout  # noqa: E402
+
+from app.services.resilience import ResilientService, _attempt_timeout, deadline_scope  # noqa: E402
+
+
+class FakeAppwriteError(Exception):
+    def __init__(self, code):
+        super().__init__(f"fake upstream error {code}")
+        self.code = code
+
+
+class FlakyDatabases:
+    def __init__(self, latency_ms, stall_s, stall_rate, error_rate, seed=7):
+        self.latency = latency_ms / 1000
+        self.stall = stall_s
+        self.stall_rate = stall_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    def get_document(self, database_id, collection_id, document_id):
+        roll = self.rng.random()
+        if roll < self.stall_rate:
+            timeout = _attempt_timeout.get()
+            if timeout is not None and timeout < self.stall:
+                time.sleep(timeout)
+                raise ReadTimeout()
+            time.sleep(self.stall)
+        elif roll < self.stall_rate + self.error_rate:
+            time.sleep(self.latency)
+            raise FakeAppwriteError(503)
+        time.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        return {"$id": document_id}
+
+
+def run(label, service, calls, concurrency, deadline):
+    latencies, errors = [], 0
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            with deadline_scope(deadline):
+                service.get_document(database_id="db", collection_id="hackathons", document_id=f"h{i}")
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for latency, ok in pool.map(one, range(calls)):
+            latencies.append(latency * 1000)
+            errors += not ok
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(
+        f"{label:<28} p50={statistics.median(latencies):7.1f} ms  p95={p(0.95):7.1f} ms  "
+        f"p99={p(0.99):7.1f} ms  max={latencies[-1]:7.1f} ms  errors={errors}/{calls}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--stall-s", type=float, default=3.0)
+    parser.add_argument("--stall-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--deadline", type=float, default=1.0)
+    parser.add_argument("--hedge-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    # Trip the breaker only on a real outage, not on injected noise
+    settings.UPSTREAM_BREAKER_THRESHOLD = 50
+    settings.UPSTREAM_ATTEMPT_TIMEOUT_SECONDS = args.deadline / 2
+    fake = lambda: FlakyDatabases(args.latency_ms, args.stall_s, args.stall_rate, args.error_rate)
+    executor = ThreadPoolExecutor(args.concurrency * 4)
+
+    run("raw", fake(), args.calls, args.concurrency, None)
+
+    settings.UPSTREAM_HEDGE_DELAY_MS = 0
+    run("deadline+retries", ResilientService(fake(), "bench", executor), args.calls, args.concurrency, args.deadline)
+
+    settings.UPSTREAM_HEDGE_DELAY_MS = args.hedge_ms
+    run(
+        f"deadline+retries+hedge@{args.hedge_ms:g}ms",
+        ResilientService(fake(), "bench", executor, hedge_collections=("hackathons",)),
+        args.calls, args.concurrency, args.deadline,
+    )
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
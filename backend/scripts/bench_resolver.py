@@ -0,0 +1,108 @@
+"""
+Benchmark for the caching DNS resolver + happy-eyeballs connects.
+
+A fake resolver answers every lookup after --dns-ms with two addresses for
+"appwrite.test": an IPv6 one that blackholes SYNs (a full accept queue on ::1)
+and a working IPv4 listener on 127.0.0.1. --connects sequential connects with:
+  - ipv4-only:  lookup per connect, IPv4 addresses only (the old force_ipv4 patch)
+  - sequential: lookup per connect, addresses tried in order (stock urllib3)
+  - resolver:   CachingResolver - cached lookup, families raced
+Needs IPv6 on loopback.
+
+Usage (from backend/):
+    python scripts/bench_resolver.py --connects 50 --dns-ms 30 --timeout 2
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.resolver import CachingResolver  # noqa: E402
+
+
+def serve_ipv4():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(128)
+
+    def accept():
+        while True:
+            conn, _ = server.accept()
+            conn.close()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return server
+
+
+def blackhole_ipv6():
+    # listen(0) + one unaccepted connection: the kernel drops further SYNs
+    server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    server.bind(("::1", 0))
+    server.listen(0)
+    filler = socket.create_connection(("::1", server.getsockname()[1]))
+    return server, filler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connects", type=int, default=50)
+    parser.add_argument("--dns-ms", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=2, help="connect timeout per attempt (s)")
+    args = parser.parse_args()
+
+    v4 = serve_ipv4()
+    v6, _filler = blackhole_ipv6()
+    answers = [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", v6.getsockname()[1], 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", v4.getsockname()[1])),
+    ]
+    lookups = {"count": 0}
+
+    def fake_getaddrinfo(host, port, family=0, type=0, *rest):
+        lookups["count"] += 1
+        time.sleep(args.dns_ms / 1000)
+        return [a for a in answers if family in (0, a[0])]
+
+    def stock(family):
+        # urllib3.util.connection.create_connection, minus the option handling
+        def connect(address, timeout):
+            err = None
+            for af, socktype, proto, _, sockaddr in fake_getaddrinfo(*address, family):
+                sock = socket.socket(af, socktype, proto)
+                sock.settimeout(timeout)
+                try:
+                    sock.connect(sockaddr)
+                    return sock
+                except OSError as e:
+                    err = e
+                    sock.close()
+            raise err
+        return connect
+
+    resolver = CachingResolver(resolve=fake_getaddrinfo)
+    scenarios = [
+        ("ipv4-only", stock(socket.AF_INET)),
+        ("sequential", stock(socket.AF_UNSPEC)),
+        ("resolver", resolver.create_connection),
+    ]
+    for label, connect in scenarios:
+        lookups["count"] = 0
+        latencies = []
+        for _ in range(args.connects):
+            start = time.perf_counter()
+            connect(("appwrite.test", 443), args.timeout).close()
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<11} connect p50={statistics.median(latencies):8.2f} ms  max={max(latencies):8.2f} ms  "
+              f"total={sum(latencies) / 1000:6.2f}s  lookups={lookups['count']}")
+
+    stats = resolver.snapshot()["hosts"]["appwrite.test"]
+    print(f"resolver: hits={stats['hits']} wins={stats['wins']} fallbacks={stats['fallbacks']}")
+
+
+if __name__ == "__main__":
+    main()
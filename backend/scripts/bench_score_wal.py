@@ -0,0 +1,97 @@
+"""
+Benchmark for the judge score write-behind buffer.
+
+--judges concurrent judges each submit --scores scores. Compares:
+  - sync:  one create_document per score on the request path (the old submit_score)
+  - wal:   ScoreWAL.append on the request path, then the flusher drains the log
+against a local stand-in for Appwrite that takes --latency-ms per write and
+allows at most --quota concurrent writes (the upstream write quota).
+
+Usage (from backend/):
+    python scripts/bench_score_wal.py --judges 40 --scores 25 --latency-ms 40 --quota 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services import score_wal  # noqa: E402
+
+
+class QuotaDatabases:
+    def __init__(self, latency_ms, quota):
+        self.latency = latency_ms / 1000
+        self.slots = threading.Semaphore(quota)
+        self.docs = {}
+
+    def create_document(self, database_id, collection_id, document_id, data):
+        with self.slots:
+            time.sleep(self.latency)
+            if document_id in self.docs:
+                raise Exception("409 document already exists")
+            self.docs[document_id] = data
+
+    def update_document(self, database_id, collection_id, document_id, data):
+        with self.slots:
+            time.sleep(self.latency)
+            self.docs[document_id] = data
+
+
+def report(label, latencies, elapsed, extra=""):
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"{label:<6} ack p50={statistics.median(latencies):7.2f} ms  p99={p(0.99):7.2f} ms  "
+          f"all acked in {elapsed:5.2f}s{extra}")
+
+
+def run(judges, scores, fn):
+    latencies = []
+
+    def judge(j):
+        for s in range(scores):
+            start = time.perf_counter()
+            fn(f"sub{s}", f"judge{j}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(judges) as pool:
+        list(pool.map(judge, range(judges)))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--judges", type=int, default=40)
+    parser.add_argument("--scores", type=int, default=25)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--quota", type=int, default=8)
+    args = parser.parse_args()
+    data = lambda sub, judge: {"submission_id": sub, "judge_id": judge, "total": 20, "comment": "solid demo"}
+
+    fake = QuotaDatabases(args.latency_ms, args.quota)
+    sync = lambda sub, judge: fake.create_document("db", "scores", score_wal.score_id(sub, judge), data(sub, judge))
+    report("sync", *run(args.judges, args.scores, sync))
+
+    fake = QuotaDatabases(args.latency_ms, args.quota)
+    score_wal.get_db_service = lambda: fake
+    settings.SCORE_WRITE_CONCURRENCY = args.quota
+    wal = score_wal.ScoreWAL(os.path.join(tempfile.mkdtemp(prefix="score-wal-bench-"), "scores.wal"))
+    latencies, elapsed = run(args.judges, args.scores, lambda sub, judge: wal.append(score_wal.score_id(sub, judge), data(sub, judge)))
+    wal.try_become_writer()
+    start = time.perf_counter()
+    asyncio.run(wal.flush())
+    drained = time.perf_counter() - start
+    assert len(fake.docs) == args.judges * args.scores
+    report("wal", latencies, elapsed, f"  (flusher drained {len(fake.docs)} scores in {drained:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
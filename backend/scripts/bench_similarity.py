@@ -0,0 +1,98 @@
+"""
+Benchmark for the similar-hackathons index (MinHash + LSH).
+
+Generates --docs synthetic hackathons: each picks a theme (a topic-specific tag
+and word pool) so that same-theme events genuinely overlap, plus noise words.
+Measures:
+  - build:  signing (inline, or on the process pool with --pool) + bucketing
+  - query:  top-5 similar for --queries random hackathons
+  - recall: share of the true top-5 (exact Jaccard over the same shingles,
+            brute force against every hackathon) found by the index, and how
+            similar the returned events really are compared to the true top-5
+            (same-theme events tie a lot, so the second number matters more)
+  - memory: the index arrays (signatures + sorted band keys) and the resident
+            set growth while building (includes the synthetic docs)
+
+Usage (from backend/):
+    python scripts/bench_similarity.py --docs 100000
+    python scripts/bench_similarity.py --docs 100000 --pool   # multi-core hosts
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services import similarity  # noqa: E402
+
+
+def synthetic(n, rng):
+    vocab = [f"w{i}" for i in range(20000)]
+    themes = [(f"topic{t}", rng.sample(vocab, 40)) for t in range(n // 20 + 1)]
+    docs = []
+    for i in range(n):
+        tag, pool = rng.choice(themes)
+        words = rng.sample(pool, 20) + rng.sample(vocab, 10)
+        rng.shuffle(words)
+        docs.append((f"h{i}", f"Hack {i}", [tag, rng.choice(["ai", "web3", "climate", "health", "fintech"])], " ".join(words)))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--recall-sample", type=int, default=50)
+    parser.add_argument("--pool", action="store_true", help="sign on the process pool (SIMILARITY_WORKERS / cpu_count)")
+    args = parser.parse_args()
+    rng = random.Random(3)
+    docs = synthetic(args.docs, rng)
+    settings.SIMILARITY_POOL_MIN_DOCS = 0 if args.pool else args.docs + 1
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    signed, pooled = asyncio.run(similarity._sign_all(docs))
+    signed_at = time.perf_counter()
+    state = similarity._State.bulk(signed)
+    built_at = time.perf_counter()
+    grown = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024
+    print(f"build {args.docs} hackathons: sign {signed_at - start:5.2f}s ({'pool' if pooled else 'inline'}), "
+          f"bucket {built_at - signed_at:5.2f}s, RSS +{grown:.0f} MiB")
+
+    index = similarity.SimilarityIndex()
+    index._state, index.ready = state, True
+    print(f"index arrays: {index.snapshot()['index_bytes'] / 2**20:.1f} MiB")
+    picks = [rng.choice(docs)[0] for _ in range(args.queries)]
+    latencies = []
+    for doc_id in picks:
+        t = time.perf_counter()
+        index.similar(doc_id, 5)
+        latencies.append((time.perf_counter() - t) * 1000)
+    latencies.sort()
+    print(f"top-5 query: p50={statistics.median(latencies):6.2f} ms  p99={latencies[int(0.99 * len(latencies))]:6.2f} ms  "
+          f"avg candidates={index.stats['candidates'] / args.queries:.0f}")
+
+    sets = {d[0]: similarity.shingles({"name": d[1], "tags": d[2], "description": d[3]}) for d in docs}
+    jaccard = lambda a, b: len(sets[a] & sets[b]) / len(sets[a] | sets[b])
+    found = total = exact_sum = got_sum = 0
+    t = time.perf_counter()
+    for doc_id in picks[:args.recall_sample]:
+        exact = sorted(((jaccard(doc_id, o), o) for o in sets if o != doc_id), reverse=True)[:5]
+        got = [o for o, _, _ in index.similar(doc_id, 5)]
+        found += sum(1 for _, o in exact if o in got)
+        total += len(exact)
+        exact_sum += sum(j for j, _ in exact)
+        got_sum += sum(jaccard(doc_id, o) for o in got)
+    brute = (time.perf_counter() - t) / args.recall_sample * 1000
+    print(f"recall@5 vs exact Jaccard: {found / total:.0%}, exact Jaccard of results vs true top-5: "
+          f"{got_sum / exact_sum:.0%}  (brute force: {brute:.0f} ms per query)")
+
+
+if __name__ == "__main__":
+    main()
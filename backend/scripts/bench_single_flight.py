@@ -0,0 +1,94 @@
+"""
+Thundering-herd benchmark for single-flight reads.
+
+Simulates a hackathon page going live: --clients requests arrive within
+--spread-ms, each reading the hackathon document and its team list from a
+local stand-in for Appwrite's Databases service (~--latency-ms per call).
+The same herd runs through ResilientService with single-flight off, on, and
+on with a micro-cache window, and reports how many calls reached upstream.
+
+Usage (from backend/):
+    python scripts/bench_single_flight.py --clients 2000 --spread-ms 1000 --window-ms 250
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.services.resilience import ResilientService  # noqa: E402
+
+
+class CountingDatabases:
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _hit(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def get_document(self, database_id, collection_id, document_id):
+        self._hit()
+        return {"$id": document_id, "name": "Live Hack", "tags": ["ai", "web"]}
+
+    def list_documents(self, database_id, collection_id, queries=None):
+        self._hit()
+        return {"total": 25, "documents": [{"$id": f"t{i}", "members": ["u1", "u2"]} for i in range(25)]}
+
+
+def run(label, clients, spread, concurrency, latency_ms, single_flight, window_ms):
+    settings.UPSTREAM_SINGLE_FLIGHT = single_flight
+    settings.UPSTREAM_MICROCACHE_MS = window_ms
+    fake = CountingDatabases(latency_ms)
+    executor = ThreadPoolExecutor(concurrency)
+    service = ResilientService(fake, "bench", executor)
+    arrivals = sorted(random.Random(3).uniform(0, spread) for _ in range(clients))
+    t0 = time.perf_counter()
+
+    def client(at):
+        delay = at - (time.perf_counter() - t0)
+        if delay > 0:
+            time.sleep(delay)
+        start = time.perf_counter()
+        service.get_document(database_id="db", collection_id="hackathons", document_id="h1")
+        service.list_documents(database_id="db", collection_id="teams", queries=['equal("hackathon_id", ["h1"])'])
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = sorted(pool.map(client, arrivals))
+    executor.shutdown()
+
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    reads = clients * 2
+    print(
+        f"{label:<26} upstream={fake.calls:6d}/{reads} ({100 * (1 - fake.calls / reads):5.1f}% saved)  "
+        f"p50={statistics.median(latencies):6.1f} ms  p99={p(0.99):6.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--spread-ms", type=float, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--window-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    common = (args.clients, args.spread_ms / 1000, args.concurrency, args.latency_ms)
+    run("no single-flight", *common, single_flight=False, window_ms=0)
+    run("single-flight", *common, single_flight=True, window_ms=0)
+    run(f"single-flight+{args.window_ms:g}ms cache", *common, single_flight=True, window_ms=args.window_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Load-test harness for admission control (app/core/admission.py).
+
+Runs an app in a separate uvicorn process whose handlers hold a worker
+thread for ~100 ms (the shape of an Appwrite round-trip) with a bounded
+thread pool, then drives an open-loop spike of catalogue GETs (above
+capacity) plus a steady stream of judging writes, with and without the
+admission middleware.
+
+Reported per class: served count, shed/limited count, and latency of the
+requests that WERE served. With admission control the served latency stays
+close to the unloaded service time and judging writes are not starved.
+
+Usage (from backend/):
+    python scripts/loadtest_admission.py --duration 10 --browse-rate 120 --judging-rate 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core import admission  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+# Capacity = POOL_SIZE / SERVICE_TIME = 80 req/s
+SERVICE_TIME = 0.1
+POOL_SIZE = 8
+
+
+def build_app(with_admission: bool, rate: float) -> FastAPI:
+    admission.controller = admission.AdmissionController(
+        max_in_flight=POOL_SIZE * 2,
+        shares={"critical": 1.0, "normal": 0.85, "low": 0.6},
+        rate=rate, burst=rate * 2, critical_wait=0.25,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(POOL_SIZE))
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+
+    if with_admission:
+        settings.TRUSTED_PROXY_HOPS = 1  # the load generator plays the proxy: one X-Forwarded-For entry per client
+        app.add_middleware(admission.AdmissionMiddleware)
+
+    @app.get("/api/hackathons/")
+    async def browse():
+        await asyncio.to_thread(time.sleep, SERVICE_TIME)
+        return {"ok": True}
+
+    @app.post("/api/judging/score")
+    async def score():
+        await asyncio.to_thread(time.sleep, SERVICE_TIME)
+        return {"ok": True}
+
+    return app
+
+
+def serve(port: int, with_admission: bool, rate: float):
+    uvicorn.run(build_app(with_admission, rate), port=port, log_level="error")
+
+
+def pct(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+async def drive(port: int, args):
+    """Open-loop load: arrivals keep coming at a fixed rate whether or not the server keeps up"""
+    results = {"browse": [], "judging": []}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+        async def fire(kind, method, url, ip):
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, url, headers={"x-forwarded-for": ip})
+                code = resp.status_code
+            except httpx.HTTPError:
+                code = 0  # connection refused / reset / timed out
+            results[kind].append((code, time.perf_counter() - start))
+
+        async def arrivals(kind, method, url, rate, ip_for):
+            tasks = []
+            total = int(rate * args.duration)
+            start = time.perf_counter()
+            for i in range(total):
+                tasks.append(asyncio.create_task(fire(kind, method, url, ip_for(i))))
+                await asyncio.sleep(max(0.0, start + (i + 1) / rate - time.perf_counter()))
+            await asyncio.gather(*tasks)
+
+        # Spike of browsers, 1 in 5 requests from one abusive poller (~24 req/s)
+        browse_ip = lambda i: "10.0.0.1" if i % 5 == 0 else f"10.1.{i // 250 % 250}.{i % 250}"
+        judge_ip = lambda i: f"10.9.0.{i % 20}"
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            arrivals("browse", "GET", "/api/hackathons/", args.browse_rate, browse_ip),
+            arrivals("judging", "POST", "/api/judging/score", args.judging_rate, judge_ip),
+        )
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def scenario(label, with_admission, args):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    cmd = [sys.executable, __file__, "--serve", str(port), "--rate", str(args.rate)]
+    if with_admission:
+        cmd.append("--with-admission")
+    server = subprocess.Popen(cmd)
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.05)
+        results, elapsed = asyncio.run(drive(port, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{label}  (wall {elapsed:.1f}s)")
+    for kind, rows in results.items():
+        served = [t for code, t in rows if code == 200]
+        shed = sum(1 for code, _ in rows if code == 503)
+        limited = sum(1 for code, _ in rows if code == 429)
+        failed = sum(1 for code, _ in rows if code not in (200, 429, 503))
+        print(
+            f"  {kind:<8} served={len(served):>5}  shed(503)={shed:>5}  limited(429)={limited:>5}  failed={failed:>4}  "
+            f"served p50={pct(served, 0.5):6.0f} ms  p99={pct(served, 0.99):6.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--browse-rate", type=float, default=120, help="catalogue GETs per second")
+    parser.add_argument("--judging-rate", type=float, default=10, help="judge writes per second")
+    parser.add_argument("--rate", type=float, default=10, help="per-client token bucket rate")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--with-admission", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.with_admission, args.rate)
+        return
+
+    scenario("WITHOUT admission control", False, args)
+    scenario("WITH admission control", True, args)
+
+
+if __name__ == "__main__":
+    main()
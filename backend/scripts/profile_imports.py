@@ -0,0 +1,55 @@
+"""
+Import-time profile of the FastAPI app.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+prints the slowest modules by cumulative import time.
+
+Usage (from backend/):
+    python scripts/profile_imports.py            # top 25
+    python scripts/profile_imports.py --top 50
+    python scripts/profile_imports.py --module app.services.gemini
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    total = next((cum for cum, _, name in rows if name == args.module), 0)
+
+    print(f"{args.module}: {total / 1000:.1f} ms total import time\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()